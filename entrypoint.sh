@@ -81,7 +81,43 @@ except Exception as e:
 PY
 fi
 
-exec gunicorn heatmap.wsgi:application \
+# SERVER_INTERFACE=asgi serves heatmap/asgi.py through uvicorn workers (async views run natively)
+if [ "${SERVER_INTERFACE:-wsgi}" = "asgi" ]; then
+  set -- gunicorn heatmap.asgi:application --worker-class uvicorn_worker.UvicornWorker
+else
+  set -- gunicorn heatmap.wsgi:application
+fi
+set -- "$@" \
   --bind 0.0.0.0:8000 \
   --workers ${GUNICORN_WORKERS:-3} \
   --timeout 60
+
+# Optionally run the background quote ingestor alongside the web workers. Set
+# QUOTE_INGESTOR_EMBEDDED=0 when it runs as a separate service from the same image.
+case "${QUOTE_INGESTOR_ENABLED:-}:${QUOTE_INGESTOR_EMBEDDED:-1}" in
+  1:1|true:1|TRUE:1|yes:1|on:1)
+    ;;
+  *)
+    exec "$@"
+    ;;
+esac
+
+# This shell stays PID 1 so that stop signals reach both children: forward TERM/INT to
+# gunicorn and the ingestor, and stop the ingestor too if gunicorn exits on its own
+echo "Starting background quote ingestor..."
+python manage.py quote_ingestor &
+ingestor_pid=$!
+"$@" &
+gunicorn_pid=$!
+trap 'kill -TERM "$gunicorn_pid" "$ingestor_pid" 2>/dev/null || true' TERM INT
+
+status=0
+wait "$gunicorn_pid" || status=$?
+# A trapped signal interrupts wait; keep waiting while gunicorn shuts down gracefully
+while kill -0 "$gunicorn_pid" 2>/dev/null; do
+  status=0
+  wait "$gunicorn_pid" || status=$?
+done
+kill -TERM "$ingestor_pid" 2>/dev/null || true
+wait "$ingestor_pid" || true
+exit "$status"
@@ -118,10 +118,73 @@ FINNHUB_BASE_URL = os.environ.get('FINNHUB_BASE_URL', 'https://finnhub.io/api/v1
 FINNHUB_TIMEOUT_SECONDS = int(os.environ.get('FINNHUB_TIMEOUT_SECONDS', '10'))
 FINNHUB_MAX_RETRIES = int(os.environ.get('FINNHUB_MAX_RETRIES', '3'))
 FINNHUB_BACKOFF_FACTOR = float(os.environ.get('FINNHUB_BACKOFF_FACTOR', '0.75'))
+# Total seconds one quote refresh may spend upstream (0 disables); pending symbols fall back to the cache
+FINNHUB_REQUEST_DEADLINE_SECONDS = float(os.environ.get('FINNHUB_REQUEST_DEADLINE_SECONDS', '8'))
+# Per-endpoint circuit breaker: consecutive failures before failing fast, and seconds before a probe
+FINNHUB_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('FINNHUB_CIRCUIT_FAILURE_THRESHOLD', '5'))
+FINNHUB_CIRCUIT_RESET_SECONDS = float(os.environ.get('FINNHUB_CIRCUIT_RESET_SECONDS', '30'))
 FINNHUB_METRICS_TTL_SECONDS = int(os.environ.get('FINNHUB_METRICS_TTL_SECONDS', '21600'))
+# Adaptive (AIMD) in-flight limit for Finnhub calls: starts at FINNHUB_MAX_CONCURRENCY and moves
+# between MIN and MAX; successes slower than LATENCY_MS stop it from growing
 FINNHUB_MAX_CONCURRENCY = int(os.environ.get('FINNHUB_MAX_CONCURRENCY', '4'))
+FINNHUB_CONCURRENCY_MIN = int(os.environ.get('FINNHUB_CONCURRENCY_MIN', '1'))
+FINNHUB_CONCURRENCY_MAX = int(os.environ.get('FINNHUB_CONCURRENCY_MAX', '16'))
+FINNHUB_CONCURRENCY_LATENCY_MS = float(os.environ.get('FINNHUB_CONCURRENCY_LATENCY_MS', '1500'))
+# Process-wide fetch thread pool (0 = FINNHUB_CONCURRENCY_MAX threads) and how many tasks may queue
+FINNHUB_EXECUTOR_WORKERS = int(os.environ.get('FINNHUB_EXECUTOR_WORKERS', '0'))
+FINNHUB_EXECUTOR_QUEUE_SIZE = int(os.environ.get('FINNHUB_EXECUTOR_QUEUE_SIZE', '256'))
+# In-flight request cap per event loop for AsyncFinnhubClient (/api/quotes/async)
+FINNHUB_ASYNC_MAX_CONCURRENCY = int(os.environ.get('FINNHUB_ASYNC_MAX_CONCURRENCY', '32'))
+# Keep-alive connection pool shared by all FinnhubClient instances in a process
+FINNHUB_POOL_MAXSIZE = int(os.environ.get('FINNHUB_POOL_MAXSIZE', '8'))
+FINNHUB_POOL_IDLE_SECONDS = float(os.environ.get('FINNHUB_POOL_IDLE_SECONDS', '30'))
 FINNHUB_QUOTE_TTL_SECONDS = int(os.environ.get('FINNHUB_QUOTE_TTL_SECONDS', '10'))
+# Quote TTL during pre-/post-market; when closed, quotes fetched after the last session stay fresh
+FINNHUB_QUOTE_TTL_EXTENDED_SECONDS = int(os.environ.get('FINNHUB_QUOTE_TTL_EXTENDED_SECONDS', '120'))
+# Past the TTL, quotes younger than this are served at once and refreshed in the background (0 disables)
+FINNHUB_QUOTE_HARD_TTL_SECONDS = int(os.environ.get('FINNHUB_QUOTE_HARD_TTL_SECONDS', '300'))
+# Per-process LRU of decoded CachedQuote rows (0 disables) and how often it checks the table for changes
+QUOTE_L1_MAX_ENTRIES = int(os.environ.get('QUOTE_L1_MAX_ENTRIES', '2048'))
+QUOTE_L1_CHECK_SECONDS = float(os.environ.get('QUOTE_L1_CHECK_SECONDS', '1'))
+# Shared-memory quote table for all workers on a host: auto (on with the ingestor), 1/0; slots are fixed at creation
+QUOTE_SHM_ENABLED = os.environ.get('QUOTE_SHM_ENABLED', 'auto').strip().lower()
+QUOTE_SHM_NAME = os.environ.get('QUOTE_SHM_NAME', 'heatmap-quotes')
+QUOTE_SHM_SLOTS = int(os.environ.get('QUOTE_SHM_SLOTS', '2048'))
+# Intraday quote history (QuoteTick): recorded on every refresh, thinned and expired by prune_quote_history
+QUOTE_HISTORY_ENABLED = os.environ.get('QUOTE_HISTORY_ENABLED', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+QUOTE_HISTORY_RETENTION_DAYS = float(os.environ.get('QUOTE_HISTORY_RETENTION_DAYS', '30'))
+QUOTE_HISTORY_COMPACT_AFTER_DAYS = float(os.environ.get('QUOTE_HISTORY_COMPACT_AFTER_DAYS', '2'))
+QUOTE_HISTORY_COMPACT_SECONDS = int(os.environ.get('QUOTE_HISTORY_COMPACT_SECONDS', '60'))
+# Quota planner: per-symbol refresh intervals from movement, holdings and the per-minute budget
+QUOTE_PLAN_BUDGET_SHARE = float(os.environ.get('QUOTE_PLAN_BUDGET_SHARE', '0.8'))
+QUOTE_PLAN_MAX_INTERVAL_SECONDS = float(os.environ.get('QUOTE_PLAN_MAX_INTERVAL_SECONDS', '900'))
+QUOTE_PLAN_HELD_WEIGHT = float(os.environ.get('QUOTE_PLAN_HELD_WEIGHT', '2'))
+QUOTE_PLAN_EVERY_SECONDS = float(os.environ.get('QUOTE_PLAN_EVERY_SECONDS', '60'))
 FINNHUB_RATE_LIMIT_PER_MIN = int(os.environ.get('FINNHUB_RATE_LIMIT_PER_MIN', '60'))
+# Token bucket shared across workers: 'database' (default), 'redis' or 'memory' (per process)
+FINNHUB_RATE_LIMIT_BACKEND = os.environ.get('FINNHUB_RATE_LIMIT_BACKEND', 'database')
+FINNHUB_RATE_LIMIT_REDIS_URL = os.environ.get('FINNHUB_RATE_LIMIT_REDIS_URL', '')
+# Bucket capacity (max burst); defaults to FINNHUB_RATE_LIMIT_PER_MIN
+FINNHUB_RATE_LIMIT_BURST = int(os.environ.get('FINNHUB_RATE_LIMIT_BURST', '0'))
+# Tokens kept back for higher-priority calls: interactive (search/profile) > quote > background (metrics)
+FINNHUB_QUOTA_RESERVE_INTERACTIVE = int(os.environ.get('FINNHUB_QUOTA_RESERVE_INTERACTIVE', '5'))
+FINNHUB_QUOTA_RESERVE_QUOTE = int(os.environ.get('FINNHUB_QUOTA_RESERVE_QUOTE', '10'))
+# Minimum seconds between syncs of the bucket from Finnhub's X-Ratelimit-* headers (per process)
+FINNHUB_UPSTREAM_SYNC_SECONDS = float(os.environ.get('FINNHUB_UPSTREAM_SYNC_SECONDS', '1'))
+# Request coalescing: 'local' (per process) or 'redis' (also across processes/hosts)
+FINNHUB_SINGLEFLIGHT_BACKEND = os.environ.get('FINNHUB_SINGLEFLIGHT_BACKEND', 'local')
+FINNHUB_SINGLEFLIGHT_REDIS_URL = os.environ.get('FINNHUB_SINGLEFLIGHT_REDIS_URL', '')
+
+# Background quote ingestion: when enabled, `manage.py quote_ingestor` keeps CachedQuote
+# fresh and /api/quotes only reads the cache.
+QUOTE_INGESTOR_ENABLED = os.environ.get('QUOTE_INGESTOR_ENABLED', '').strip().lower() in ('1', 'true', 'yes', 'on')
+QUOTE_INGESTOR_INTERVAL_SECONDS = float(os.environ.get('QUOTE_INGESTOR_INTERVAL_SECONDS', '5'))
+
+# Live updates over SSE (/api/quotes/stream). 'auto' offers the stream to the dashboard only when
+# the ingestor is on and the app is served over ASGI; a stream pins a whole sync worker under WSGI.
+QUOTE_STREAM_ENABLED = os.environ.get('QUOTE_STREAM_ENABLED', 'auto').strip().lower()
+QUOTE_STREAM_POLL_SECONDS = float(os.environ.get('QUOTE_STREAM_POLL_SECONDS', '1'))
+QUOTE_STREAM_MAX_SECONDS = float(os.environ.get('QUOTE_STREAM_MAX_SECONDS', '300'))
 
 # CSRF in local dev
 def _parse_list_env(name: str) -> list[str]:
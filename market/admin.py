@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Sector, Ticker, PurchaseLot, CachedQuote
+from .models import Sector, Ticker, PurchaseLot, CachedQuote, QuoteRefreshState
 
 
 @admin.register(Sector)
@@ -24,6 +24,14 @@ class PurchaseLotAdmin(admin.ModelAdmin):
 
 @admin.register(CachedQuote)
 class CachedQuoteAdmin(admin.ModelAdmin):
-    list_display = ("symbol", "fetched_at")
+    list_display = ("symbol", "price", "change_pct", "fetched_at")
     search_fields = ("symbol",)
+    # Derived from `data` on save
+    readonly_fields = tuple(CachedQuote.COLUMNS.values())
 
+
+@admin.register(QuoteRefreshState)
+class QuoteRefreshStateAdmin(admin.ModelAdmin):
+    list_display = ("symbol", "priority", "last_attempt_at", "last_success_at", "failures")
+    list_editable = ("priority",)
+    search_fields = ("symbol",)
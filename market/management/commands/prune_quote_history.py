@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from market.services.history import compact_ticks, prune_ticks
+from market.services.rollups import prune_bars
+
+
+DAY = 86400
+
+
+class Command(BaseCommand):
+    help = "Thin out and expire intraday quote history (QuoteTick) and expire old OHLC bars; run it from cron, e.g. hourly"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=float,
+            default=None,
+            help="Delete ticks older than this (default: QUOTE_HISTORY_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--compact-after-days",
+            type=float,
+            default=None,
+            help="Thin out ticks older than this (default: QUOTE_HISTORY_COMPACT_AFTER_DAYS)",
+        )
+        parser.add_argument(
+            "--bucket-seconds",
+            type=int,
+            default=None,
+            help="Keep one tick per bucket of this many seconds when thinning (default: QUOTE_HISTORY_COMPACT_SECONDS)",
+        )
+        parser.add_argument(
+            "--window-days",
+            type=float,
+            default=1.0,
+            help="How far back from the compaction cutoff to thin; the job must run at least this often (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        retention = options["retention_days"]
+        if retention is None:
+            retention = float(getattr(settings, "QUOTE_HISTORY_RETENTION_DAYS", 30))
+        compact_after = options["compact_after_days"]
+        if compact_after is None:
+            compact_after = float(getattr(settings, "QUOTE_HISTORY_COMPACT_AFTER_DAYS", 2))
+        bucket = options["bucket_seconds"]
+        if bucket is None:
+            bucket = int(getattr(settings, "QUOTE_HISTORY_COMPACT_SECONDS", 60))
+
+        now = int(time.time())
+        expire_before = now - int(retention * DAY)
+        compacted = 0
+        if compact_after < retention:
+            compact_end = now - int(compact_after * DAY)
+            compact_start = max(expire_before, compact_end - int(options["window_days"] * DAY))
+            compacted = compact_ticks(compact_start, compact_end, bucket)
+        deleted = prune_ticks(expire_before)
+        bars = prune_bars(now)
+        self.stdout.write(self.style.SUCCESS(
+            f"Quote history: {compacted} ticks compacted, {deleted} expired; {bars} bars expired."
+        ))
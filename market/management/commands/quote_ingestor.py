@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from market.services.quotes import refresh_quotes, tracked_symbols
+
+
+class Command(BaseCommand):
+    help = "Continuously refresh cached quotes from Finnhub so /api/quotes can serve straight from the cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Seconds between refresh cycles (default: QUOTE_INGESTOR_INTERVAL_SECONDS)",
+        )
+        parser.add_argument("--once", action="store_true", help="Run a single refresh cycle and exit")
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        if interval is None:
+            interval = float(getattr(settings, "QUOTE_INGESTOR_INTERVAL_SECONDS", 5))
+        interval = max(0.5, interval)
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Quote ingestor started (every {interval:g}s)"))
+        while not self._stopping:
+            started = time.monotonic()
+            close_old_connections()
+            try:
+                self._run_cycle()
+            except Exception as exc:  # keep the loop alive through transient DB/network failures
+                self.stderr.write(self.style.ERROR(f"Refresh cycle failed: {exc}"))
+            if options["once"]:
+                break
+            self._sleep(max(0.0, interval - (time.monotonic() - started)))
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS("Quote ingestor stopped."))
+
+    def _run_cycle(self) -> None:
+        symbols = tracked_symbols()
+        if not symbols:
+            return
+        started = time.monotonic()
+        # The ingestor is the background refresh, so nothing is deferred past the cycle
+        result = refresh_quotes(symbols, revalidate_in_background=False)
+        took_ms = int((time.monotonic() - started) * 1000)
+        rate = result.rate_limit or {}
+        self.stdout.write(
+            f"[{result.as_of}] symbols={len(symbols)} fetched={result.fetched} "
+            f"errors={len(result.errors)} skipped={rate.get('skipped', 0)} "
+            f"remaining={rate.get('remaining', '-')} session={rate.get('session', '-')} "
+            f"saved={rate.get('savedBySchedule', 0)} took={took_ms}ms"
+        )
+
+    def _sleep(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while not self._stopping and time.monotonic() < deadline:
+            time.sleep(min(0.25, deadline - time.monotonic()))
+
+    def _request_stop(self, signum, frame) -> None:
+        self._stopping = True
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from market.models import QuoteBar, QuoteTick
+from market.services.rollups import apply_ticks
+
+
+CHUNK_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = "Rebuild OHLC bars (QuoteBar) from stored quote history, e.g. after enabling rollups on existing ticks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbol", help="Only rebuild this symbol")
+
+    def handle(self, *args, **options):
+        ticks = QuoteTick.objects.all()
+        bars = QuoteBar.objects.all()
+        if options["symbol"]:
+            symbol = options["symbol"].strip().upper()
+            ticks = ticks.filter(symbol=symbol)
+            bars = bars.filter(symbol=symbol)
+        bars.delete()
+
+        total = 0
+        chunk = []
+        for tick in ticks.order_by("symbol", "t").values_list("symbol", "t", "c").iterator(chunk_size=CHUNK_SIZE):
+            chunk.append(tick)
+            if len(chunk) >= CHUNK_SIZE:
+                apply_ticks(chunk)
+                total += len(chunk)
+                chunk = []
+        apply_ticks(chunk)
+        total += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Rolled {total} ticks into {QuoteBar.objects.count()} bars."))
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0004_siteconfig_preferences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.FloatField(help_text='Unix timestamp of the last refill')),
+            ],
+        ),
+    ]
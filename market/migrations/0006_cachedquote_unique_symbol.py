@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+
+def drop_duplicate_symbols(apps, schema_editor):
+    # Keep the most recently fetched row per symbol so the constraint can be added
+    CachedQuote = apps.get_model('market', 'CachedQuote')
+    seen = set()
+    stale_ids = []
+    for pk, symbol in CachedQuote.objects.order_by('symbol', '-fetched_at', '-id').values_list('id', 'symbol'):
+        if symbol in seen:
+            stale_ids.append(pk)
+        else:
+            seen.add(symbol)
+    for start in range(0, len(stale_ids), 500):
+        CachedQuote.objects.filter(id__in=stale_ids[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0005_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_symbols, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cachedquote',
+            constraint=models.UniqueConstraint(fields=('symbol',), name='unique_cached_symbol'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_changed_at(apps, schema_editor):
+    CachedQuote = apps.get_model('market', 'CachedQuote')
+    CachedQuote.objects.filter(changed_at__isnull=True).update(changed_at=F('fetched_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0006_cachedquote_unique_symbol'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cachedquote',
+            name='changed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_changed_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0007_cachedquote_changed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuoteRefreshState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=10, unique=True)),
+                ('priority', models.IntegerField(default=0, help_text='Higher values are refreshed sooner when the quota is short')),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_success_at', models.DateTimeField(blank=True, null=True)),
+                ('failures', models.PositiveIntegerField(default=0, help_text='Consecutive failed fetches')),
+            ],
+            options={
+                'ordering': ['symbol'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0008_quoterefreshstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quoterefreshstate',
+            name='actual_interval',
+            field=models.FloatField(blank=True, help_text='EWMA of observed seconds between successful refreshes', null=True),
+        ),
+        migrations.AddField(
+            model_name='quoterefreshstate',
+            name='planned_interval',
+            field=models.FloatField(blank=True, help_text='Seconds between refreshes assigned by the quota planner', null=True),
+        ),
+        migrations.AddField(
+            model_name='quoterefreshstate',
+            name='volatility',
+            field=models.FloatField(blank=True, help_text='EWMA of |price move| in % per sqrt(minute)', null=True),
+        ),
+        migrations.AddField(
+            model_name='quoterefreshstate',
+            name='weight',
+            field=models.FloatField(blank=True, help_text='Planner weight from movement, holdings and priority', null=True),
+        ),
+    ]
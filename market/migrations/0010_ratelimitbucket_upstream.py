@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0009_quoterefreshstate_planner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ratelimitbucket',
+            name='upstream_limit',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ratelimitbucket',
+            name='upstream_remaining',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ratelimitbucket',
+            name='upstream_reset_at',
+            field=models.FloatField(blank=True, help_text='Unix timestamp when the upstream window resets', null=True),
+        ),
+        migrations.AddField(
+            model_name='ratelimitbucket',
+            name='upstream_seen_at',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
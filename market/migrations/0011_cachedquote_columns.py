@@ -0,0 +1,99 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:25
+
+from django.db import migrations, models
+
+
+# Frozen copy of CachedQuote.COLUMNS; historical models do not carry class attributes
+COLUMNS = {
+    'c': 'price',
+    'pc': 'prev_close',
+    'h': 'high',
+    'l': 'low',
+    'd': 'change',
+    'dp': 'change_pct',
+    't': 'quote_time',
+    'week52High': 'week52_high',
+    'week52Low': 'week52_low',
+    'metricsAsOf': 'metrics_as_of',
+}
+INT_COLUMNS = {'quote_time', 'metrics_as_of'}
+
+
+def _number(value, integer):
+    try:
+        number = float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+    return int(number) if integer and number is not None else number
+
+
+def backfill_columns(apps, schema_editor):
+    CachedQuote = apps.get_model('market', 'CachedQuote')
+    rows = []
+    for quote in CachedQuote.objects.only('id', 'data').iterator(chunk_size=500):
+        data = quote.data if isinstance(quote.data, dict) else {}
+        for key, column in COLUMNS.items():
+            setattr(quote, column, _number(data.get(key), column in INT_COLUMNS))
+        rows.append(quote)
+    CachedQuote.objects.bulk_update(rows, list(COLUMNS.values()), batch_size=250)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0010_ratelimitbucket_upstream'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cachedquote',
+            name='change',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='change_pct',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='high',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='low',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='metrics_as_of',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='prev_close',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='price',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='quote_time',
+            field=models.BigIntegerField(blank=True, help_text='Unix timestamp of the quote', null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='week52_high',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cachedquote',
+            name='week52_low',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_columns, migrations.RunPython.noop),
+    ]
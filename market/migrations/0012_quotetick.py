@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0011_cachedquote_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuoteTick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=10)),
+                ('t', models.BigIntegerField(help_text='Unix timestamp of the quote')),
+                ('c', models.FloatField(blank=True, null=True)),
+                ('pc', models.FloatField(blank=True, null=True)),
+                ('h', models.FloatField(blank=True, null=True)),
+                ('l', models.FloatField(blank=True, null=True)),
+                ('d', models.FloatField(blank=True, null=True)),
+                ('dp', models.FloatField(blank=True, null=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['t'], name='market_quotetick_t_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='quotetick',
+            constraint=models.UniqueConstraint(fields=('symbol', 't'), name='unique_tick_symbol_t'),
+        ),
+    ]
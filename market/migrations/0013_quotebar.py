@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0012_quotetick'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuoteBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=10)),
+                ('resolution', models.CharField(choices=[('1m', '1 minute'), ('5m', '5 minutes'), ('1h', '1 hour'), ('1d', '1 day')], max_length=3)),
+                ('start', models.BigIntegerField(help_text='Unix timestamp where the bar begins')),
+                ('open', models.FloatField()),
+                ('high', models.FloatField()),
+                ('low', models.FloatField()),
+                ('close', models.FloatField()),
+                ('first_t', models.BigIntegerField(help_text='Quote time of the tick behind `open`')),
+                ('last_t', models.BigIntegerField(help_text='Quote time of the tick behind `close`')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resolution', 'start'], name='market_quotebar_res_start_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='quotebar',
+            constraint=models.UniqueConstraint(fields=('symbol', 'resolution', 'start'), name='unique_bar_symbol_resolution_start'),
+        ),
+    ]
@@ -82,15 +82,152 @@ class PurchaseLot(models.Model):
         return f"{self.ticker.symbol} {self.quantity}@{self.price} on {self.trade_date}"
 
 
+def _as_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_int(value):
+    number = _as_float(value)
+    return int(number) if number is not None else None
+
+
 class CachedQuote(models.Model):
+    # Payload key -> typed column, so prices can be sorted and filtered in SQL
+    COLUMNS = {
+        "c": "price",
+        "pc": "prev_close",
+        "h": "high",
+        "l": "low",
+        "d": "change",
+        "dp": "change_pct",
+        "t": "quote_time",
+        "week52High": "week52_high",
+        "week52Low": "week52_low",
+        "metricsAsOf": "metrics_as_of",
+    }
+    INT_COLUMNS = frozenset({"quote_time", "metrics_as_of"})
+
     symbol = models.CharField(max_length=10)
     data = models.JSONField()
     fetched_at = models.DateTimeField(auto_now=True)
+    # Moves only when `data` actually changes; drives `since=` deltas, ETags and the SSE stream
+    changed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Typed copies of `data`, kept in step by `sync_columns`
+    price = models.FloatField(null=True, blank=True, db_index=True)
+    prev_close = models.FloatField(null=True, blank=True)
+    high = models.FloatField(null=True, blank=True)
+    low = models.FloatField(null=True, blank=True)
+    change = models.FloatField(null=True, blank=True)
+    change_pct = models.FloatField(null=True, blank=True, db_index=True)
+    quote_time = models.BigIntegerField(null=True, blank=True, help_text="Unix timestamp of the quote")
+    week52_high = models.FloatField(null=True, blank=True)
+    week52_low = models.FloatField(null=True, blank=True)
+    metrics_as_of = models.BigIntegerField(null=True, blank=True)
 
     class Meta:
         indexes = [models.Index(fields=["symbol"])]
-        # Uniqueness enforced by migration-level UniqueConstraint
-        
+        constraints = [models.UniqueConstraint(fields=["symbol"], name="unique_cached_symbol")]
+
+    def sync_columns(self) -> None:
+        """Copy the numeric fields of `data` into their typed columns."""
+        data = self.data if isinstance(self.data, dict) else {}
+        for key, column in self.COLUMNS.items():
+            convert = _as_int if column in self.INT_COLUMNS else _as_float
+            setattr(self, column, convert(data.get(key)))
+
+    def save(self, *args, **kwargs):
+        self.sync_columns()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "data" in update_fields:
+            kwargs["update_fields"] = list(dict.fromkeys([*update_fields, *self.COLUMNS.values()]))
+        super().save(*args, **kwargs)
+
+
+class QuoteTick(models.Model):
+    """One observed quote per symbol and Finnhub quote time; append-only intraday history."""
+
+    symbol = models.CharField(max_length=10)
+    t = models.BigIntegerField(help_text="Unix timestamp of the quote")
+    c = models.FloatField(null=True, blank=True)
+    pc = models.FloatField(null=True, blank=True)
+    h = models.FloatField(null=True, blank=True)
+    l = models.FloatField(null=True, blank=True)
+    d = models.FloatField(null=True, blank=True)
+    dp = models.FloatField(null=True, blank=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # The unique index doubles as the (symbol, t) index behind time-range reads
+        constraints = [models.UniqueConstraint(fields=["symbol", "t"], name="unique_tick_symbol_t")]
+        indexes = [models.Index(fields=["t"], name="market_quotetick_t_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.symbol}@{self.t}"
+
+
+class QuoteBar(models.Model):
+    """OHLC bar of one symbol at one resolution, maintained incrementally from `QuoteTick` inserts."""
+
+    RESOLUTIONS = [("1m", "1 minute"), ("5m", "5 minutes"), ("1h", "1 hour"), ("1d", "1 day")]
+
+    symbol = models.CharField(max_length=10)
+    resolution = models.CharField(max_length=3, choices=RESOLUTIONS)
+    start = models.BigIntegerField(help_text="Unix timestamp where the bar begins")
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+    close = models.FloatField()
+    first_t = models.BigIntegerField(help_text="Quote time of the tick behind `open`")
+    last_t = models.BigIntegerField(help_text="Quote time of the tick behind `close`")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["symbol", "resolution", "start"], name="unique_bar_symbol_resolution_start"),
+        ]
+        indexes = [models.Index(fields=["resolution", "start"], name="market_quotebar_res_start_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.symbol} {self.resolution}@{self.start}"
+
+
+class QuoteRefreshState(models.Model):
+    """Per-symbol refresh bookkeeping so a short quota is shared fairly across the watchlist."""
+
+    symbol = models.CharField(max_length=10, unique=True)
+    priority = models.IntegerField(default=0, help_text="Higher values are refreshed sooner when the quota is short")
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    failures = models.PositiveIntegerField(default=0, help_text="Consecutive failed fetches")
+    volatility = models.FloatField(null=True, blank=True, help_text="EWMA of |price move| in % per sqrt(minute)")
+    weight = models.FloatField(null=True, blank=True, help_text="Planner weight from movement, holdings and priority")
+    planned_interval = models.FloatField(null=True, blank=True, help_text="Seconds between refreshes assigned by the quota planner")
+    actual_interval = models.FloatField(null=True, blank=True, help_text="EWMA of observed seconds between successful refreshes")
+
+    class Meta:
+        ordering = ["symbol"]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.symbol
+
+
+class RateLimitBucket(models.Model):
+    """Token-bucket state shared by every process that calls Finnhub."""
+
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField(help_text="Unix timestamp of the last refill")
+    # Last quota Finnhub itself reported (X-Ratelimit-* response headers)
+    upstream_limit = models.IntegerField(null=True, blank=True)
+    upstream_remaining = models.IntegerField(null=True, blank=True)
+    upstream_reset_at = models.FloatField(null=True, blank=True, help_text="Unix timestamp when the upstream window resets")
+    upstream_seen_at = models.FloatField(null=True, blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.name}: {self.tokens:.2f}"
+
 
 class SiteConfig(models.Model):
     finnhub_api_key = models.CharField(max_length=128, blank=True, default="")
@@ -0,0 +1,108 @@
+"""Per-endpoint circuit breakers for Finnhub calls.
+
+After `FINNHUB_CIRCUIT_FAILURE_THRESHOLD` consecutive failures (network errors, timeouts, 5xx)
+on one endpoint the circuit opens: calls fail immediately with ``CIRCUIT_OPEN`` instead of
+waiting on timeouts and backoff, and callers fall back to `CachedQuote`. After
+`FINNHUB_CIRCUIT_RESET_SECONDS` a single probe call is let through (half-open); its outcome
+closes the circuit or opens it for another period. Any HTTP response other than a 5xx counts as
+success, since it shows the endpoint is reachable.
+
+Breakers are per process, like the in-process single-flight layer.
+"""
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int, reset_seconds: float):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.reset_seconds = max(0.0, reset_seconds)
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+        self._stats = {"trips": 0, "rejected": 0}
+
+    def _current(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.reset_seconds:
+            self._state = HALF_OPEN
+            self._probe_at = None
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open only one probe at a time is allowed."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._current(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.reset_seconds):
+                # A probe that never reported back (e.g. its worker died) is replaced after a period
+                self._probe_at = now
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_at = None
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.threshold):
+                self._state = OPEN
+                self._opened_at = now
+                self._probe_at = None
+                self._stats["trips"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current(now)
+            out: Dict[str, Any] = {"state": state, "failures": self._failures, **self._stats}
+            if state == OPEN:
+                out["retryIn"] = round(max(0.0, self.reset_seconds - (now - self._opened_at)), 1)
+        return out
+
+
+_breakers_lock = Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            try:
+                threshold = int(getattr(settings, "FINNHUB_CIRCUIT_FAILURE_THRESHOLD", 5))
+            except (TypeError, ValueError):
+                threshold = 5
+            try:
+                reset_seconds = float(getattr(settings, "FINNHUB_CIRCUIT_RESET_SECONDS", 30))
+            except (TypeError, ValueError):
+                reset_seconds = 30.0
+            breaker = CircuitBreaker(endpoint, threshold, reset_seconds)
+            _breakers[endpoint] = breaker
+        return breaker
+
+
+def circuit_stats() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.stats() for b in breakers}
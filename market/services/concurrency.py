@@ -0,0 +1,161 @@
+"""Adaptive (AIMD) limit on in-flight Finnhub requests, shared by every caller in the process.
+
+The limit starts at `FINNHUB_MAX_CONCURRENCY` and moves between `FINNHUB_CONCURRENCY_MIN` and
+`FINNHUB_CONCURRENCY_MAX`:
+
+- additive increase: each request that finishes healthy (no 429/5xx/network error, latency
+  under `FINNHUB_CONCURRENCY_LATENCY_MS`) while the limit was actually in use adds 1/limit, so
+  the limit grows by about one per round of requests;
+- multiplicative decrease: a 429, 5xx, timeout or network error halves it. Only requests started
+  after the previous decrease can trigger the next one, so one burst of failures from the same
+  round counts once.
+
+Slow but successful requests hold the limit where it is. The quote and metrics fetches of one
+refresh, concurrent refreshes in other threads and the asyncio client all draw from this single
+limiter instead of each sizing their own pool.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Condition, Lock
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from django.conf import settings
+
+
+DECREASE_FACTOR = 0.5
+LATENCY_ALPHA = 0.2
+HISTORY_SIZE = 120
+
+
+@dataclass
+class Slot:
+    started: float
+    saturated: bool  # the limit was fully used when this request started
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial: float, minimum: int, maximum: int, latency_target: float):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.latency_target = latency_target
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._cond = Condition(Lock())
+        self._in_flight = 0
+        self._waiting = 0
+        self._last_decrease = 0.0
+        self._latency: Optional[float] = None
+        self._stats = {"acquired": 0, "timedOut": 0, "increases": 0, "decreases": 0}
+        self._history: Deque[Tuple[int, int]] = deque(maxlen=HISTORY_SIZE)
+        self._history.append((int(time.time()), int(self._limit)))
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _take(self) -> Optional[Slot]:
+        if self._in_flight >= int(self._limit):
+            return None
+        self._in_flight += 1
+        self._stats["acquired"] += 1
+        return Slot(time.monotonic(), self._in_flight >= int(self._limit))
+
+    def acquire(self, timeout: float) -> Optional[Slot]:
+        """Block up to `timeout` seconds for a slot; None when none freed up in time."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    slot = self._take()
+                    if slot is not None:
+                        return slot
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        self._stats["timedOut"] += 1
+                        return None
+                    self._cond.wait(left)
+            finally:
+                self._waiting -= 1
+
+    async def acquire_async(self, timeout: float, poll: float = 0.01) -> Optional[Slot]:
+        """`acquire` for event loops: polls instead of blocking the loop on the condition."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            with self._cond:
+                slot = self._take()
+                if slot is None and time.monotonic() >= deadline:
+                    self._stats["timedOut"] += 1
+            if slot is not None or time.monotonic() >= deadline:
+                return slot
+            await asyncio.sleep(poll)
+
+    def release(self, slot: Slot, congested: bool) -> None:
+        now = time.monotonic()
+        latency = now - slot.started
+        with self._cond:
+            self._in_flight -= 1
+            before = int(self._limit)
+            if congested:
+                if slot.started >= self._last_decrease:
+                    self._limit = max(float(self.minimum), self._limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+                    self._stats["decreases"] += 1
+            else:
+                self._latency = latency if self._latency is None else LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self._latency
+                if slot.saturated and latency <= self.latency_target and self._limit < self.maximum:
+                    self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+                    self._stats["increases"] += 1
+            if int(self._limit) != before:
+                self._history.append((int(time.time()), int(self._limit)))
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out: Dict[str, Any] = dict(self._stats)
+            out.update({
+                "limit": round(self._limit, 2),
+                "inFlight": self._in_flight,
+                "waiting": self._waiting,
+                "min": self.minimum,
+                "max": self.maximum,
+                "latencyMs": round(self._latency * 1000) if self._latency is not None else None,
+                "latencyTargetMs": round(self.latency_target * 1000),
+                "history": [list(point) for point in self._history],
+            })
+        return out
+
+
+def _int_setting(name: str, default: int) -> int:
+    try:
+        return int(getattr(settings, name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+_limiter_lock = Lock()
+_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_concurrency_limiter() -> AdaptiveLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            try:
+                latency_ms = float(getattr(settings, "FINNHUB_CONCURRENCY_LATENCY_MS", 1500))
+            except (TypeError, ValueError):
+                latency_ms = 1500.0
+            _limiter = AdaptiveLimiter(
+                initial=_int_setting("FINNHUB_MAX_CONCURRENCY", 4),
+                minimum=_int_setting("FINNHUB_CONCURRENCY_MIN", 1),
+                maximum=_int_setting("FINNHUB_CONCURRENCY_MAX", 16),
+                latency_target=max(0.0, latency_ms) / 1000.0,
+            )
+        return _limiter
+
+
+def concurrency_stats() -> Dict[str, Any]:
+    return get_concurrency_limiter().stats()
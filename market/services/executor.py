@@ -0,0 +1,118 @@
+"""Process-wide thread pool for upstream fetches.
+
+One `ThreadPoolExecutor` of `FINNHUB_EXECUTOR_WORKERS` threads (default: the adaptive
+concurrency ceiling) lives for the life of the worker process, so a refresh no longer pays for
+pool setup and teardown. At most `FINNHUB_EXECUTOR_QUEUE_SIZE` tasks may wait for a thread. When
+the queue is full, the submitting thread runs the task itself, which slows the producer instead
+of growing the backlog.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .concurrency import get_concurrency_limiter
+
+
+WAIT_ALPHA = 0.2
+
+
+class FetchExecutor:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="finnhub-fetch")
+        # Capacity = running + queued, so the queue bound holds whatever the threads are doing
+        self._slots = BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = Lock()
+        self._queued = 0
+        self._active = 0
+        self._wait: Optional[float] = None
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "callerRuns": 0, "maxQueued": 0}
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["callerRuns"] += 1
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        queued_at = time.monotonic()
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._queued += 1
+            self._stats["maxQueued"] = max(self._stats["maxQueued"], self._queued)
+        try:
+            return self._pool.submit(self._run, queued_at, fn, args)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+
+    def _run(self, queued_at: float, fn: Callable[..., Any], args: tuple) -> Any:
+        waited = time.monotonic() - queued_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait = waited if self._wait is None else WAIT_ALPHA * waited + (1 - WAIT_ALPHA) * self._wait
+        ok = False
+        try:
+            result = fn(*args)
+            ok = True
+            return result
+        finally:
+            # Pool threads outlive requests, so release DB connections the way a request would
+            close_old_connections()
+            with self._lock:
+                self._active -= 1
+                self._stats["completed" if ok else "failed"] += 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out.update({
+                "workers": self.workers,
+                "queueSize": self.queue_size,
+                "active": self._active,
+                "queued": self._queued,
+                "waitMs": round(self._wait * 1000, 1) if self._wait is not None else None,
+            })
+        return out
+
+
+_executor_lock = Lock()
+_executor: Optional[FetchExecutor] = None
+_executor_pid: Optional[int] = None
+
+
+def get_fetch_executor() -> FetchExecutor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        # Threads do not survive fork, so a pool inherited from a preloading parent is rebuilt
+        if _executor is None or _executor_pid != os.getpid():
+            try:
+                workers = int(getattr(settings, "FINNHUB_EXECUTOR_WORKERS", 0) or 0)
+            except (TypeError, ValueError):
+                workers = 0
+            try:
+                queue_size = int(getattr(settings, "FINNHUB_EXECUTOR_QUEUE_SIZE", 256))
+            except (TypeError, ValueError):
+                queue_size = 256
+            _executor = FetchExecutor(workers or get_concurrency_limiter().maximum, queue_size)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def executor_stats() -> Dict[str, Any]:
+    return get_fetch_executor().stats()
@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import http.client
 import json
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from ..models import SiteConfig
+from .circuit import CircuitBreaker, get_breaker
+from .concurrency import Slot, get_concurrency_limiter
+from .ratelimit import acquire, observe_upstream, upstream_sync_due
+from .singleflight import AsyncSingleFlight, get_flight_group
+from .trading_calendar import trading_day
+
+try:  # Optional dependency for AsyncFinnhubClient; falls back to threads without it
+    import httpx  # type: ignore
+except Exception:  # pragma: no cover - optional
+    httpx = None
 
 
 class FinnhubError(Exception):
@@ -33,7 +47,112 @@ class Quote:
     post: Optional[float] = None  # post-market (if available)
 
 
-class FinnhubClient:
+PoolKey = Tuple[str, str, Optional[int]]
+# What a reused keep-alive socket raises when the server closed it while it sat idle
+STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine)
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP(S) connections, keyed by (scheme, host, port).
+
+    At most `maxsize` idle connections are kept per key; connections idle for longer than
+    `idle_timeout` seconds are closed instead of reused.
+    """
+
+    def __init__(self, maxsize: int = 8, idle_timeout: float = 30.0):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._lock = Lock()
+        self._idle: Dict[PoolKey, Deque[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._stats = {"hits": 0, "misses": 0, "discarded": 0, "expired": 0}
+
+    def acquire(self, key: PoolKey, timeout: float, fresh: bool = False) -> Tuple[http.client.HTTPConnection, bool]:
+        """A connection for `key` and whether it was reused; `fresh` skips the idle ones."""
+        now = time.monotonic()
+        expired: List[http.client.HTTPConnection] = []
+        conn = None
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle and not fresh:
+                candidate, last_used = idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    conn = candidate
+                    break
+                expired.append(candidate)
+            # Anything left behind the newest connection is older still
+            if idle and self.idle_timeout >= 0:
+                while idle and now - idle[0][1] > self.idle_timeout:
+                    expired.append(idle.popleft()[0])
+            self._stats["expired"] += len(expired)
+            self._stats["hits" if conn is not None else "misses"] += 1
+        for old in expired:
+            old.close()
+        if conn is not None:
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.timeout = timeout
+            return conn, True
+        scheme, host, port = key
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return conn_cls(host, port, timeout=timeout), False
+
+    def release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.maxsize:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def discard(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._stats["discarded"] += 1
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["idle"] = sum(len(v) for v in self._idle.values())
+        requests = out["hits"] + out["misses"]
+        out["hitRatio"] = round(out["hits"] / requests, 4) if requests else None
+        out["maxSize"] = self.maxsize
+        out["idleTimeout"] = self.idle_timeout
+        return out
+
+
+_pool_lock = Lock()
+_pool: Optional[ConnectionPool] = None
+
+
+def get_connection_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                maxsize=max(1, int(getattr(settings, "FINNHUB_POOL_MAXSIZE", 8))),
+                idle_timeout=float(getattr(settings, "FINNHUB_POOL_IDLE_SECONDS", 30)),
+            )
+        return _pool
+
+
+def connection_pool_stats() -> Dict[str, Any]:
+    return get_connection_pool().stats()
+
+
+def resolve_api_key() -> Optional[str]:
+    """API key saved through /api/config, if any (falls back to settings in the clients)."""
+    try:
+        cfg = SiteConfig.objects.first()
+        if cfg and cfg.finnhub_api_key:
+            return cfg.finnhub_api_key.strip()
+    except Exception:
+        return None
+    return None
+
+
+class _FinnhubBase:
+    """Configuration, URL building and response parsing shared by the sync and async clients."""
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -41,67 +160,130 @@ class FinnhubClient:
         timeout: Optional[int] = None,
         max_retries: Optional[int] = None,
         backoff_factor: Optional[float] = None,
+        deadline: Optional[float] = None,
     ):
-        db_key = None
-        try:
-            cfg = SiteConfig.objects.first()
-            if cfg and cfg.finnhub_api_key:
-                db_key = cfg.finnhub_api_key.strip()
-        except Exception:
-            db_key = None
+        """`deadline` bounds, in seconds from now, everything this client does: every call,
+        retry and backoff made through it. Calls left when it passes fail with ``DEADLINE``."""
+        db_key = None if api_key else resolve_api_key()
         self.api_key = api_key or db_key or settings.FINNHUB_API_KEY
         self.base_url = base_url or settings.FINNHUB_BASE_URL
         self.timeout = timeout or settings.FINNHUB_TIMEOUT_SECONDS
         self.max_retries = max_retries or settings.FINNHUB_MAX_RETRIES
         self.backoff_factor = backoff_factor or settings.FINNHUB_BACKOFF_FACTOR
+        self.deadline_at = time.monotonic() + deadline if deadline else None
 
-    def _request(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare(self, path: str, params: Dict[str, Any]) -> Tuple[PoolKey, str]:
         if not self.api_key:
             raise FinnhubError("Missing Finnhub API key", code="NO_API_KEY")
 
         # Always include token
         q = {"token": self.api_key}
         q.update(params)
-        url = f"{self.base_url}{path}?{urllib.parse.urlencode(q)}"
+        base = urllib.parse.urlsplit(self.base_url)
+        key: PoolKey = (base.scheme or "https", base.hostname or "", base.port)
+        target = f"{base.path.rstrip('/')}{path}?{urllib.parse.urlencode(q)}"
+        return key, target
 
-        last_exc: Optional[Exception] = None
-        for attempt in range(self.max_retries + 1):
+    @staticmethod
+    def _interpret(status: int, raw: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[FinnhubError]]:
+        """Return (data, None) on success or (None, retryable_error); raise on fatal errors."""
+        if status < 400:
+            return json.loads(raw.decode("utf-8") or '{}'), None
+        # Map known error statuses
+        if status == 401:
+            raise FinnhubError("Invalid API key", status=401, code="INVALID_KEY")
+        if status == 429:
+            # rate limited; fall-through to retry with backoff
+            return None, FinnhubError("Rate limited", status=429, code="RATE_LIMIT")
+        if 500 <= status < 600:
+            return None, FinnhubError(f"Server error {status}", status=status, code="SERVER_ERROR")
+        raise FinnhubError(f"HTTP error {status}", status=status)
+
+    def _time_left(self) -> Optional[float]:
+        return None if self.deadline_at is None else self.deadline_at - time.monotonic()
+
+    def _attempt_timeout(self, breaker: CircuitBreaker, last_exc: Optional[Exception]) -> float:
+        """Socket timeout for the next attempt, after checking the deadline and the circuit."""
+        left = self._time_left()
+        if left is not None and left <= 0:
+            raise last_exc or FinnhubError("Request deadline exceeded", code="DEADLINE")
+        if not breaker.allow():
+            raise FinnhubError(f"Circuit open for {breaker.name}", status=503, code="CIRCUIT_OPEN")
+        return self.timeout if left is None else min(self.timeout, left)
+
+    @classmethod
+    def _settle(cls, breaker: CircuitBreaker, status: int, raw: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[FinnhubError]]:
+        """`_interpret` plus circuit bookkeeping; a 429 is raised at once rather than retried."""
+        if 500 <= status < 600:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        data, exc = cls._interpret(status, raw)
+        if exc is not None and exc.code == "RATE_LIMIT":
+            # Retrying cannot help until the window resets and only burns more quota
+            raise exc
+        return data, exc
+
+    def _network_failure(self, breaker: CircuitBreaker, exc: Exception, timeout: float) -> FinnhubError:
+        timed_out = isinstance(exc, TimeoutError) or (httpx is not None and isinstance(exc, httpx.TimeoutException))
+        # A timeout cut short by the deadline says nothing about the endpoint's health
+        if not (timed_out and timeout < self.timeout):
+            breaker.record_failure()
+        return FinnhubError(f"Network error: {exc}", code="NETWORK")
+
+    @staticmethod
+    def _slot_wait_failed() -> FinnhubError:
+        return FinnhubError("Timed out waiting for an upstream request slot", code="DEADLINE")
+
+    @staticmethod
+    def _congested(status: Optional[int]) -> bool:
+        """Outcome signal for the adaptive limiter: no response, a 429 or a 5xx."""
+        return status is None or status == 429 or status >= 500
+
+    def _retry_delay(self, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None when it would run past the deadline."""
+        if attempt >= self.max_retries:
+            return None
+        delay = self._backoff(attempt)
+        left = self._time_left()
+        if left is not None and delay >= left:
+            return None
+        return delay
+
+    @staticmethod
+    def _take_quota(quota_class: str, last_exc: Optional[Exception]) -> None:
+        """Draw one call from the shared quota; a denied retry surfaces the previous failure."""
+        granted, _ = acquire(quota_class)
+        if not granted:
+            raise last_exc or FinnhubError("Finnhub quota exhausted", status=429, code="RATE_LIMIT")
+
+    @staticmethod
+    def _upstream_quota(status: int, headers: Any) -> Optional[Tuple[Optional[int], Optional[int], Optional[float]]]:
+        """(limit, remaining, reset_at) from the X-Ratelimit-* headers when the bucket should be synced."""
+
+        def header(name: str) -> Optional[float]:
             try:
-                req = urllib.request.Request(url, headers={"User-Agent": "HeatmapApp/1.0"})
-                with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                    status = resp.getcode()
-                    raw = resp.read().decode("utf-8")
-                    if status >= 400:
-                        raise FinnhubError(f"HTTP {status}", status=status)
-                    data = json.loads(raw or '{}')
-                    return data
-            except urllib.error.HTTPError as e:
-                # Map known error statuses
-                status = e.code
-                if status == 401:
-                    raise FinnhubError("Invalid API key", status=401, code="INVALID_KEY")
-                if status == 429:
-                    # rate limited; fall-through to retry with backoff
-                    last_exc = FinnhubError("Rate limited", status=429, code="RATE_LIMIT")
-                elif 500 <= status < 600:
-                    last_exc = FinnhubError(f"Server error {status}", status=status, code="SERVER_ERROR")
-                else:
-                    raise FinnhubError(f"HTTP error {status}", status=status)
-            except urllib.error.URLError as e:
-                last_exc = FinnhubError(f"Network error: {e}", code="NETWORK")
-
-            # Retry with exponential backoff
-            delay = (self.backoff_factor) * (2 ** attempt)
-            time.sleep(min(delay, 5))
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
 
-        if last_exc:
-            raise last_exc
-        raise FinnhubError("Unknown error")
+        limit, remaining, reset_at = header("X-Ratelimit-Limit"), header("X-Ratelimit-Remaining"), header("X-Ratelimit-Reset")
+        if status == 429 and remaining is None:
+            remaining = 0
+        if limit is None and remaining is None:
+            return None
+        remaining_int = max(0, int(remaining)) if remaining is not None else None
+        if not upstream_sync_due(remaining_int, throttled=status == 429):
+            return None
+        return (int(limit) if limit is not None else None), remaining_int, reset_at
 
-    # Public API methods
-    def search(self, query: str, exchange: Optional[str] = None) -> List[Dict[str, Any]]:
-        params: Dict[str, Any] = {"q": query}
-        data = self._request("/search", params)
+    def _backoff(self, attempt: int) -> float:
+        # Retry with exponential backoff
+        delay = (self.backoff_factor) * (2 ** attempt)
+        return min(delay, 5)
+
+    @staticmethod
+    def _filter_search(data: Dict[str, Any], exchange: Optional[str]) -> List[Dict[str, Any]]:
         results = data.get("result", [])
         # Filter to common stock-esque types and US by default if possible
         filtered: List[Dict[str, Any]] = []
@@ -115,8 +297,8 @@ class FinnhubClient:
                 filtered.append(r)
         return filtered
 
-    def quote(self, symbol: str) -> Quote:
-        data = self._request("/quote", {"symbol": symbol})
+    @staticmethod
+    def _parse_quote(symbol: str, data: Dict[str, Any]) -> Quote:
         q = Quote(
             symbol=symbol,
             c=data.get("c"),
@@ -130,11 +312,8 @@ class FinnhubClient:
         # Finnhub quote endpoint does not explicitly include pre/post, keep None
         return q
 
-    def profile(self, symbol: str) -> Dict[str, Any]:
-        return self._request("/stock/profile2", {"symbol": symbol})
-
-    def metrics(self, symbol: str) -> Dict[str, Any]:
-        data = self._request("/stock/metric", {"symbol": symbol, "metric": "all"})
+    @staticmethod
+    def _parse_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
         metric = data.get("metric") or {}
         out = {
             "week52High": metric.get("52WeekHigh"),
@@ -143,9 +322,256 @@ class FinnhubClient:
         return out
 
 
+class FinnhubClient(_FinnhubBase):
+    def _request(self, path: str, params: Dict[str, Any], quota_class: str = "interactive", reserved: bool = False) -> Dict[str, Any]:
+        """GET `path` with retries; every attempt is charged to `quota_class` unless the first was `reserved`."""
+        key, target = self._prepare(path, params)
+        breaker = get_breaker(path)
+
+        last_exc: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            timeout = self._attempt_timeout(breaker, last_exc)
+            if attempt or not reserved:
+                self._take_quota(quota_class, last_exc)
+            try:
+                status, raw, headers = self._limited_send(key, target, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                last_exc = self._network_failure(breaker, e, timeout)
+            else:
+                upstream = self._upstream_quota(status, headers)
+                if upstream:
+                    observe_upstream(*upstream)
+                data, last_exc = self._settle(breaker, status, raw)
+                if data is not None:
+                    return data
+
+            delay = self._retry_delay(attempt)
+            if delay is None:
+                break
+            time.sleep(delay)
+
+        if last_exc:
+            raise last_exc
+        raise FinnhubError("Unknown error")
+
+    def _limited_send(self, key: PoolKey, target: str, timeout: float) -> Tuple[int, bytes, Any]:
+        """`_send` inside a slot of the process-wide adaptive concurrency limit."""
+        limiter = get_concurrency_limiter()
+        slot = limiter.acquire(timeout)
+        if slot is None:
+            raise self._slot_wait_failed()
+        status: Optional[int] = None
+        try:
+            status, raw, headers = self._send(key, target, max(0.1, timeout - (time.monotonic() - slot.started)))
+        finally:
+            limiter.release(slot, self._congested(status))
+        return status, raw, headers
+
+    def _send(self, key: PoolKey, target: str, timeout: float) -> Tuple[int, bytes, Any]:
+        """GET `target` over a pooled keep-alive connection and return (status, body, headers).
+
+        A reused connection the server already closed fails before any response arrives; that
+        request is retried once on a fresh connection within what is left of `timeout`. Timeouts
+        and every other failure propagate to the caller's retry policy.
+        """
+        pool = get_connection_pool()
+        headers = {"User-Agent": "HeatmapApp/1.0", "Connection": "keep-alive"}
+        started = time.monotonic()
+        conn, reused = pool.acquire(key, timeout)
+        try:
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                left = timeout - (time.monotonic() - started)
+                if not reused or left <= 0:
+                    raise
+                pool.discard(conn)
+                conn, _ = pool.acquire(key, left, fresh=True)
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            pool.discard(conn)
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            pool.release(key, conn)
+        return resp.status, body, resp.headers
+
+    # Public API methods
+    def search(self, query: str, exchange: Optional[str] = None) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"q": query}
+        data = self._request("/search", params)
+        return self._filter_search(data, exchange)
+
+    def quote(self, symbol: str, reserved: bool = False) -> Quote:
+        # Concurrent callers for the same symbol share one upstream request
+        return get_flight_group().do(
+            f"quote:{symbol}",
+            lambda: self._fetch_quote(symbol, reserved),
+            encode=lambda q: json.dumps(asdict(q)),
+            decode=lambda raw: Quote(**json.loads(raw)),
+        )
+
+    def _fetch_quote(self, symbol: str, reserved: bool = False) -> Quote:
+        data = self._request("/quote", {"symbol": symbol}, quota_class="quote", reserved=reserved)
+        return self._parse_quote(symbol, data)
+
+    def profile(self, symbol: str) -> Dict[str, Any]:
+        return self._request("/stock/profile2", {"symbol": symbol})
+
+    def metrics(self, symbol: str, reserved: bool = False) -> Dict[str, Any]:
+        return get_flight_group().do(f"metrics:{symbol}", lambda: self._fetch_metrics(symbol, reserved))
+
+    def _fetch_metrics(self, symbol: str, reserved: bool = False) -> Dict[str, Any]:
+        data = self._request("/stock/metric", {"symbol": symbol, "metric": "all"}, quota_class="background", reserved=reserved)
+        return self._parse_metrics(data)
+
+
+class _AsyncLoopState:
+    """Per-event-loop resources: asyncio primitives and httpx clients cannot cross loops."""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.flights = AsyncSingleFlight()
+        self.http = None
+        if httpx is not None:
+            self.http = httpx.AsyncClient(
+                headers={"User-Agent": "HeatmapApp/1.0"},
+                limits=httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max(1, int(getattr(settings, "FINNHUB_POOL_MAXSIZE", 8))),
+                    keepalive_expiry=float(getattr(settings, "FINNHUB_POOL_IDLE_SECONDS", 30)),
+                ),
+            )
+
+
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncLoopState]" = weakref.WeakKeyDictionary()
+
+
+def _async_loop_state() -> _AsyncLoopState:
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None:
+        limit = max(1, int(getattr(settings, "FINNHUB_ASYNC_MAX_CONCURRENCY", 32)))
+        state = _AsyncLoopState(limit)
+        _loop_states[loop] = state
+    return state
+
+
+async def close_async_loop_state() -> None:
+    """Close the running loop's httpx client and forget its state.
+
+    Call it before a loop that ends with the request goes away: async views served over WSGI
+    run on a fresh event loop per request (`async_to_sync`), and an unclosed client would leak
+    its sockets with every one of them.
+    """
+    state = _loop_states.pop(asyncio.get_running_loop(), None)
+    if state is not None and state.http is not None:
+        await state.http.aclose()
+
+
+class AsyncFinnhubClient(_FinnhubBase):
+    """asyncio counterpart of `FinnhubClient` with the same public methods.
+
+    Upstream calls in one event loop share an httpx connection pool and are bounded by
+    `FINNHUB_ASYNC_MAX_CONCURRENCY`. Without httpx installed, requests fall back to the sync
+    transport on a worker thread. Build instances with `await AsyncFinnhubClient.create()` so the
+    API key stored in the database is read outside the event loop.
+    """
+
+    @classmethod
+    async def create(cls, api_key: Optional[str] = None, **kwargs: Any) -> "AsyncFinnhubClient":
+        if not api_key:
+            api_key = await sync_to_async(resolve_api_key)()
+        return cls(api_key=api_key, **kwargs)
+
+    async def _request(self, path: str, params: Dict[str, Any], quota_class: str = "interactive", reserved: bool = False) -> Dict[str, Any]:
+        key, target = self._prepare(path, params)
+        state = _async_loop_state()
+        breaker = get_breaker(path)
+
+        last_exc: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            timeout = self._attempt_timeout(breaker, last_exc)
+            if attempt or not reserved:
+                await sync_to_async(self._take_quota)(quota_class, last_exc)
+            try:
+                async with state.semaphore:
+                    status, raw, headers = await self._limited_send(state, key, target, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                last_exc = self._network_failure(breaker, e, timeout)
+            except Exception as e:
+                if httpx is None or not isinstance(e, httpx.HTTPError):
+                    raise
+                last_exc = self._network_failure(breaker, e, timeout)
+            else:
+                upstream = self._upstream_quota(status, headers)
+                if upstream:
+                    await sync_to_async(observe_upstream)(*upstream)
+                data, last_exc = self._settle(breaker, status, raw)
+                if data is not None:
+                    return data
+
+            delay = self._retry_delay(attempt)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+        if last_exc:
+            raise last_exc
+        raise FinnhubError("Unknown error")
+
+    async def _limited_send(self, state: _AsyncLoopState, key: PoolKey, target: str, timeout: float) -> Tuple[int, bytes, Any]:
+        limiter = get_concurrency_limiter()
+        slot: Optional[Slot] = await limiter.acquire_async(timeout)
+        if slot is None:
+            raise self._slot_wait_failed()
+        status: Optional[int] = None
+        try:
+            status, raw, headers = await self._send(state, key, target, max(0.1, timeout - (time.monotonic() - slot.started)))
+        finally:
+            limiter.release(slot, self._congested(status))
+        return status, raw, headers
+
+    async def _send(self, state: _AsyncLoopState, key: PoolKey, target: str, timeout: float) -> Tuple[int, bytes, Any]:
+        if state.http is None:
+            return await asyncio.to_thread(FinnhubClient._send, self, key, target, timeout)
+        scheme, host, port = key
+        netloc = f"{host}:{port}" if port else host
+        resp = await state.http.get(f"{scheme}://{netloc}{target}", timeout=timeout)
+        return resp.status_code, resp.content, resp.headers
+
+    # Public API methods
+    async def search(self, query: str, exchange: Optional[str] = None) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"q": query}
+        data = await self._request("/search", params)
+        return self._filter_search(data, exchange)
+
+    async def quote(self, symbol: str, reserved: bool = False) -> Quote:
+        return await _async_loop_state().flights.do(f"quote:{symbol}", lambda: self._fetch_quote(symbol, reserved))
+
+    async def _fetch_quote(self, symbol: str, reserved: bool = False) -> Quote:
+        data = await self._request("/quote", {"symbol": symbol}, quota_class="quote", reserved=reserved)
+        return self._parse_quote(symbol, data)
+
+    async def profile(self, symbol: str) -> Dict[str, Any]:
+        return await self._request("/stock/profile2", {"symbol": symbol})
+
+    async def metrics(self, symbol: str, reserved: bool = False) -> Dict[str, Any]:
+        return await _async_loop_state().flights.do(f"metrics:{symbol}", lambda: self._fetch_metrics(symbol, reserved))
+
+    async def _fetch_metrics(self, symbol: str, reserved: bool = False) -> Dict[str, Any]:
+        data = await self._request("/stock/metric", {"symbol": symbol, "metric": "all"}, quota_class="background", reserved=reserved)
+        return self._parse_metrics(data)
+
+
 def compute_us_market_status(now_ts: Optional[float] = None) -> Dict[str, Any]:
     """Compute a basic US market session status based on NY timezone.
     Sessions: Pre-market 04:00-09:30, Regular 09:30-16:00, Post-market 16:00-20:00, Closed otherwise.
+    Exchange holidays are Closed; early-close days end Regular at 13:00 and Post-market at 17:00.
     """
     from datetime import datetime, time as dtime
     try:
@@ -155,13 +581,13 @@ def compute_us_market_status(now_ts: Optional[float] = None) -> Dict[str, Any]:
 
     tz = ZoneInfo("America/New_York") if ZoneInfo else None
     now = datetime.fromtimestamp(now_ts, tz) if (now_ts and tz) else datetime.now(tz)
-    weekday = now.weekday()  # 0=Mon
     hhmm = now.time()
+    day = trading_day(now.date())
 
     pre_start = dtime(4, 0)
     regular_start = dtime(9, 30)
-    regular_end = dtime(16, 0)
-    post_end = dtime(20, 0)
+    regular_end = day.regular_close
+    post_end = day.post_market_end
 
     status = {
         "isOpen": False,
@@ -169,8 +595,12 @@ def compute_us_market_status(now_ts: Optional[float] = None) -> Dict[str, Any]:
         "timestamp": int(now.timestamp()),
     }
 
-    if weekday >= 5:  # Weekend
+    if not day.is_open:  # Weekend or exchange holiday
+        if day.holiday:
+            status["holiday"] = day.holiday
         return status
+    if day.early_close:
+        status["earlyClose"] = True
 
     if pre_start <= hhmm < regular_start:
         status.update({"session": "Pre-Market"})
@@ -0,0 +1,126 @@
+"""Append-only intraday quote history.
+
+Every refresh bulk-inserts the quotes it fetched as `QuoteTick` rows. The unique (symbol, t)
+index drops a quote whose Finnhub timestamp did not move, so polling a quiet symbol adds nothing.
+It also serves time-range reads with keyset pagination. New ticks are folded into OHLC bars
+as they land (see `rollups`). `prune_quote_history` keeps the table bounded: ticks older than
+`QUOTE_HISTORY_COMPACT_AFTER_DAYS` are thinned to one per `QUOTE_HISTORY_COMPACT_SECONDS`
+bucket, and ticks older than `QUOTE_HISTORY_RETENTION_DAYS` are deleted. Both steps work in id
+batches, so no single statement touches millions of rows. `QUOTE_HISTORY_ENABLED=0` turns
+recording off.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import QuoteTick
+from .rollups import apply_ticks
+
+
+INSERT_BATCH_SIZE = 100  # 9 columns per row, below SQLite's 999 bound parameters
+DELETE_BATCH_SIZE = 5000
+MAX_RANGE_LIMIT = 5000
+TICK_FIELDS = ("c", "pc", "h", "l", "d", "dp")
+
+
+def history_enabled() -> bool:
+    return bool(getattr(settings, "QUOTE_HISTORY_ENABLED", True))
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def record_ticks(payloads: Dict[str, Dict[str, Any]]) -> int:
+    """Append one tick per fetched quote and roll new ones into bars; returns how many were new.
+
+    Runs in its own transaction (a savepoint inside an outer one), so a `DatabaseError` it
+    raises leaves nothing half-written and the connection usable.
+    """
+    if not payloads or not history_enabled():
+        return 0
+    ticks = []
+    for sym, data in payloads.items():
+        try:
+            t = int(data.get("t") or 0)
+        except (TypeError, ValueError):
+            t = 0
+        if t <= 0:
+            continue
+        ticks.append(QuoteTick(symbol=sym, t=t, **{name: _number(data.get(name)) for name in TICK_FIELDS}))
+    if not ticks:
+        return 0
+    with transaction.atomic():
+        # Superset of the stored (symbol, t) pairs; only ticks not seen before move the bars
+        seen = set(
+            QuoteTick.objects.filter(symbol__in={tick.symbol for tick in ticks}, t__in={tick.t for tick in ticks})
+            .values_list("symbol", "t")
+        )
+        new = [tick for tick in ticks if (tick.symbol, tick.t) not in seen]
+        if not new:
+            return 0
+        QuoteTick.objects.bulk_create(new, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True)
+        apply_ticks((tick.symbol, tick.t, tick.c) for tick in new)
+    return len(new)
+
+
+def tick_range(
+    symbol: str,
+    start: int,
+    end: int,
+    limit: int = 1000,
+    after: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Ticks of `symbol` with `start <= t < end`, oldest first, and the cursor of the next page.
+
+    Pass the returned cursor back as `after` to continue; it is None on the last page.
+    """
+    limit = max(1, min(MAX_RANGE_LIMIT, limit))
+    qs = QuoteTick.objects.filter(symbol=symbol, t__gte=start, t__lt=end)
+    if after is not None:
+        qs = qs.filter(t__gt=after)
+    rows = list(qs.order_by("t").values("t", *TICK_FIELDS)[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1]["t"] if more else None)
+
+
+def _delete_ids(ids: List[int]) -> int:
+    deleted = 0
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        deleted += QuoteTick.objects.filter(id__in=ids[start:start + DELETE_BATCH_SIZE]).delete()[0]
+    return deleted
+
+
+def prune_ticks(before: int) -> int:
+    """Delete every tick with `t < before`."""
+    deleted = 0
+    while True:
+        ids = list(QuoteTick.objects.filter(t__lt=before).values_list("id", flat=True)[:DELETE_BATCH_SIZE])
+        if not ids:
+            return deleted
+        deleted += _delete_ids(ids)
+
+
+def compact_ticks(start: int, end: int, bucket_seconds: int) -> int:
+    """Keep only the last tick per symbol and `bucket_seconds` bucket among ticks in [start, end)."""
+    bucket_seconds = max(1, bucket_seconds)
+    doomed: List[int] = []
+    deleted = 0
+    previous: Optional[Tuple[str, int, int]] = None  # symbol, bucket, id of the latest tick seen
+    rows = QuoteTick.objects.filter(t__gte=start, t__lt=end).order_by("symbol", "t").values_list("symbol", "t", "id")
+    for symbol, t, pk in rows.iterator(chunk_size=DELETE_BATCH_SIZE):
+        bucket = t // bucket_seconds
+        if previous is not None and previous[:2] == (symbol, bucket):
+            doomed.append(previous[2])
+        previous = (symbol, bucket, pk)
+        if len(doomed) >= DELETE_BATCH_SIZE:
+            deleted += _delete_ids(doomed)
+            doomed = []
+    return deleted + _delete_ids(doomed)
@@ -0,0 +1,187 @@
+"""Per-symbol refresh intervals planned from the upstream quota.
+
+Every `QUOTE_PLAN_EVERY_SECONDS` the planner spreads the per-minute budget
+(`FINNHUB_RATE_LIMIT_PER_MIN` x `QUOTE_PLAN_BUDGET_SHARE`) over the tracked symbols. Each symbol
+gets a weight from how much it is moving: today's `dp`, its intraday range `(h - l) / pc`, and the
+EWMA of its moves between refreshes. Held positions (`PurchaseLot`) are boosted by
+`QUOTE_PLAN_HELD_WEIGHT` and the admin `priority` scales the result.
+
+Minimising weighted staleness, sum(w_i * T_i), under a call budget sum(1 / T_i) = B gives
+T_i proportional to 1 / sqrt(w_i). Intervals are clamped between the regular-session TTL and
+`QUOTE_PLAN_MAX_INTERVAL_SECONDS`, and the budget left over by clamped symbols is redistributed.
+
+Refreshes only check whether a replan is due; the replan itself (reads over every tracked symbol
+and one bulk write) runs on the shared fetch executor, off the request path.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from ..models import CachedQuote, PurchaseLot, QuoteRefreshState, Ticker
+from .executor import get_fetch_executor
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FLOOR = 0.25  # % — keeps flat symbols from being starved entirely
+VOLATILITY_ALPHA = 0.3
+ACTUAL_INTERVAL_ALPHA = 0.3
+
+
+def _float_setting(name: str, default: float) -> float:
+    try:
+        return float(getattr(settings, name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _num(value: Any) -> Optional[float]:
+    try:
+        out = float(value)
+    except (TypeError, ValueError):
+        return None
+    return out if math.isfinite(out) else None
+
+
+def budget_per_minute() -> float:
+    limit = _float_setting("FINNHUB_RATE_LIMIT_PER_MIN", 60)
+    share = min(1.0, max(0.05, _float_setting("QUOTE_PLAN_BUDGET_SHARE", 0.8)))
+    return max(0.0, limit * share)
+
+
+def interval_bounds() -> Tuple[float, float]:
+    low = max(1.0, _float_setting("FINNHUB_QUOTE_TTL_SECONDS", 10))
+    high = max(low, _float_setting("QUOTE_PLAN_MAX_INTERVAL_SECONDS", 900))
+    return low, high
+
+
+def update_volatility(previous: Optional[float], old_price: Any, new_price: Any, elapsed: Optional[float]) -> Optional[float]:
+    """Fold one observed move (percent per sqrt(minute)) into the EWMA."""
+    old_c, new_c = _num(old_price), _num(new_price)
+    if not old_c or new_c is None or not elapsed or elapsed <= 0:
+        return previous
+    move = abs(new_c - old_c) / abs(old_c) * 100 / math.sqrt(max(elapsed, 1.0) / 60.0)
+    if previous is None:
+        return move
+    return VOLATILITY_ALPHA * move + (1 - VOLATILITY_ALPHA) * previous
+
+
+def update_actual_interval(previous: Optional[float], elapsed: Optional[float]) -> Optional[float]:
+    if not elapsed or elapsed <= 0:
+        return previous
+    if previous is None:
+        return elapsed
+    return ACTUAL_INTERVAL_ALPHA * elapsed + (1 - ACTUAL_INTERVAL_ALPHA) * previous
+
+
+def symbol_weight(data: Dict[str, Any], state: Optional[QuoteRefreshState], held: bool) -> float:
+    dp = abs(_num(data.get("dp")) or 0.0)
+    pc, h, l = _num(data.get("pc")), _num(data.get("h")), _num(data.get("l"))
+    range_pct = (h - l) / pc * 100 if pc and h is not None and l is not None and h >= l else 0.0
+    vol = state.volatility if state and state.volatility else 0.0
+    activity = max(dp, 0.5 * range_pct, vol) + ACTIVITY_FLOOR
+    weight = activity * (_float_setting("QUOTE_PLAN_HELD_WEIGHT", 2.0) if held else 1.0)
+    if state and state.priority > 0:
+        weight *= 1 + state.priority
+    return weight
+
+
+def allocate_intervals(weights: Dict[str, float], calls_per_second: float, low: float, high: float) -> Dict[str, float]:
+    """Square-root allocation of `calls_per_second` with clamping and redistribution."""
+    if not weights:
+        return {}
+    if calls_per_second <= 0:
+        return {sym: high for sym in weights}
+    fixed: Dict[str, float] = {}
+    free = dict(weights)
+    budget = calls_per_second
+    for _ in range(len(weights) + 1):
+        if not free:
+            break
+        roots = {sym: math.sqrt(w) for sym, w in free.items()}
+        total = sum(roots.values())
+        if budget <= 0:
+            fixed.update({sym: high for sym in free})
+            break
+        trial = {sym: total / (budget * r) for sym, r in roots.items()}
+        clamped = {sym: t for sym, t in trial.items() if t < low or t > high}
+        if not clamped:
+            fixed.update(trial)
+            break
+        for sym, t in clamped.items():
+            fixed[sym] = low if t < low else high
+            budget -= 1.0 / fixed[sym]
+            free.pop(sym)
+    return fixed
+
+
+_plan_lock = Lock()
+_last_plan: Dict[str, Any] = {"at": 0.0, "symbols": 0, "budgetPerMin": None}
+
+
+def replan(now_ts: Optional[float] = None) -> Dict[str, float]:
+    """Recompute and store `planned_interval`/`weight` for every tracked symbol."""
+    now_ts = now_ts or time.time()
+    symbols = list(Ticker.objects.values_list("symbol", flat=True))
+    cached = dict(CachedQuote.objects.filter(symbol__in=symbols).values_list("symbol", "data"))
+    states = {s.symbol: s for s in QuoteRefreshState.objects.filter(symbol__in=symbols)}
+    held = set(PurchaseLot.objects.values_list("ticker__symbol", flat=True).distinct())
+
+    weights = {
+        sym: symbol_weight(cached.get(sym) if isinstance(cached.get(sym), dict) else {}, states.get(sym), sym in held)
+        for sym in symbols
+    }
+    low, high = interval_bounds()
+    budget = budget_per_minute()
+    intervals = allocate_intervals(weights, budget / 60.0, low, high)
+
+    rows = [
+        QuoteRefreshState(symbol=sym, weight=round(weights[sym], 4), planned_interval=round(intervals[sym], 2))
+        for sym in symbols
+    ]
+    if rows:
+        QuoteRefreshState.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["symbol"],
+            update_fields=["weight", "planned_interval"],
+        )
+    with _plan_lock:
+        _last_plan.update({"at": now_ts, "symbols": len(symbols), "budgetPerMin": round(budget, 2)})
+    return intervals
+
+
+def _replan_logged(now_ts: float) -> None:
+    try:
+        replan(now_ts)
+    except Exception:
+        # Nobody waits on the future; the next due check retries after QUOTE_PLAN_EVERY_SECONDS
+        logger.exception("Refresh interval replan failed")
+
+
+def replan_if_due(now_ts: Optional[float] = None) -> bool:
+    """Queue a replan on the fetch executor when one is due; returns whether it was queued."""
+    now_ts = now_ts or time.time()
+    every = max(5.0, _float_setting("QUOTE_PLAN_EVERY_SECONDS", 60))
+    with _plan_lock:
+        if now_ts - _last_plan["at"] < every:
+            return False
+        _last_plan["at"] = now_ts  # claim the slot so concurrent requests in this process skip
+    get_fetch_executor().submit(_replan_logged, now_ts)
+    return True
+
+
+def planner_stats() -> Dict[str, Any]:
+    low, high = interval_bounds()
+    with _plan_lock:
+        out = dict(_last_plan)
+    out["at"] = int(out["at"]) if out["at"] else None
+    out.update({"minInterval": low, "maxInterval": high})
+    return out
+
@@ -0,0 +1,186 @@
+"""Per-process L1 cache of decoded `CachedQuote` rows.
+
+Reads go through a bounded LRU of `CachedQuote` instances (`QUOTE_L1_MAX_ENTRIES`, 0 disables),
+so polling a watchlist that has not changed decodes no JSON and reads no rows. Coherence with
+the table (shared with other workers and the ingestor) comes from a generation check: at most
+every `QUOTE_L1_CHECK_SECONDS`, one aggregate query reads max(`fetched_at`), max(`changed_at`)
+and the row count. When the count moves (rows added or deleted) the whole cache is dropped;
+when only the timestamps move, rows touched since the previous generation (minus
+`DELTA_MARGIN_SECONDS` for writes that commit out of timestamp order) are reloaded. Writes made
+by this process update the cache directly.
+
+Entries are shared between callers and must not be mutated.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+from ..models import CachedQuote
+
+
+DELTA_MARGIN_SECONDS = 5.0
+
+Generation = Tuple[Optional[datetime], Optional[datetime], int]
+
+
+def _payload_bytes(row: Optional[CachedQuote]) -> int:
+    if row is None:
+        return 0
+    data = row.data
+    size = sys.getsizeof(data)
+    if isinstance(data, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in data.items())
+    return size
+
+
+class QuoteL1Cache:
+    def __init__(self, max_entries: int, check_seconds: float):
+        self.max_entries = max(0, max_entries)
+        self.check_seconds = max(0.0, check_seconds)
+        self._lock = Lock()
+        # None marks a symbol known to have no row, so missing symbols do not hit the DB either
+        self._entries: "OrderedDict[str, Optional[CachedQuote]]" = OrderedDict()
+        self._bytes = 0
+        self._generation: Optional[Generation] = None
+        self._epoch = 0  # bumped whenever the table is seen to change
+        self._checked_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "checks": 0, "flushes": 0, "reloaded": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _store(self, sym: str, row: Optional[CachedQuote]) -> None:
+        old = self._entries.pop(sym, None)
+        self._bytes -= _payload_bytes(old)
+        self._entries[sym] = row
+        self._bytes += _payload_bytes(row)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= _payload_bytes(evicted)
+            self._stats["evictions"] += 1
+
+    def _flush(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self._stats["flushes"] += 1
+
+    def _check(self) -> None:
+        """Compare the table's generation with the cached one and drop or reload what moved."""
+        now = time.monotonic()
+        with self._lock:
+            if self._generation is not None and now - self._checked_at < self.check_seconds:
+                return
+            self._checked_at = now
+            self._stats["checks"] += 1
+            previous = self._generation
+        agg = CachedQuote.objects.aggregate(fetched=Max("fetched_at"), changed=Max("changed_at"), rows=Count("id"))
+        generation: Generation = (agg["fetched"], agg["changed"], agg["rows"])
+        if generation == previous:
+            return
+        reload: List[CachedQuote] = []
+        since = max((t for t in (previous or (None, None))[:2] if t is not None), default=None)
+        delta = previous is not None and previous[2] == generation[2] and since is not None
+        if delta:
+            since -= timedelta(seconds=DELTA_MARGIN_SECONDS)
+            reload = list(CachedQuote.objects.filter(Q(fetched_at__gte=since) | Q(changed_at__gte=since)))
+        with self._lock:
+            self._generation = generation
+            self._epoch += 1
+            if not delta:
+                if previous is not None:
+                    self._flush()
+                return
+            for row in reload:
+                if row.symbol in self._entries:
+                    self._store(row.symbol, row)
+                    self._stats["reloaded"] += 1
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, CachedQuote]:
+        """`CachedQuote` rows for `symbols` (missing symbols are left out), like a `symbol__in` query."""
+        symbols = list(dict.fromkeys(symbols))
+        if not self.enabled:
+            return {c.symbol: c for c in CachedQuote.objects.filter(symbol__in=symbols)}
+        self._check()
+        found: Dict[str, CachedQuote] = {}
+        missing: List[str] = []
+        with self._lock:
+            epoch = self._epoch
+            for sym in symbols:
+                if sym in self._entries:
+                    self._entries.move_to_end(sym)
+                    row = self._entries[sym]
+                    if row is not None:
+                        found[sym] = row
+                else:
+                    missing.append(sym)
+            self._stats["hits"] += len(symbols) - len(missing)
+            self._stats["misses"] += len(missing)
+        if missing:
+            loaded = {c.symbol: c for c in CachedQuote.objects.filter(symbol__in=missing)}
+            found.update(loaded)
+            with self._lock:
+                # Rows read before a generation change may already be outdated; serve them, do not keep them
+                if epoch == self._epoch:
+                    for sym in missing:
+                        self._store(sym, loaded.get(sym))
+        return found
+
+    def put_many(self, rows: Iterable[CachedQuote]) -> None:
+        """Write-through for rows this process just saved."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for row in rows:
+                self._store(row.symbol, row)
+
+    def invalidate(self, symbols: Iterable[str]) -> None:
+        with self._lock:
+            for sym in symbols:
+                self._bytes -= _payload_bytes(self._entries.pop(sym, None))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            lookups = out["hits"] + out["misses"]
+            out.update({
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "bytes": self._bytes,
+                "hitRatio": round(out["hits"] / lookups, 4) if lookups else None,
+                "checkSeconds": self.check_seconds,
+            })
+        return out
+
+
+_cache_lock = Lock()
+_cache: Optional[QuoteL1Cache] = None
+
+
+def get_quote_cache() -> QuoteL1Cache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                max_entries = int(getattr(settings, "QUOTE_L1_MAX_ENTRIES", 2048))
+            except (TypeError, ValueError):
+                max_entries = 2048
+            try:
+                check_seconds = float(getattr(settings, "QUOTE_L1_CHECK_SECONDS", 1))
+            except (TypeError, ValueError):
+                check_seconds = 1.0
+            _cache = QuoteL1Cache(max_entries, check_seconds)
+        return _cache
+
+
+def quote_cache_stats() -> Dict[str, Any]:
+    return get_quote_cache().stats()
@@ -0,0 +1,251 @@
+"""Server-Sent Events feed of `CachedQuote` changes for /api/quotes/stream.
+
+Each connection sends a ``snapshot`` event with every requested quote, then polls the cache for
+rows whose `changed_at` moved past its cursor and pushes them as ``quotes`` events, with each
+quote's version under ``versions``. Polls look `CURSOR_OVERLAP_MS` behind the cursor, so a row
+that commits late with an older `changed_at` is still picked up; a resumed stream may resend a
+quote the browser already has, which it drops by version. Event ids carry the cursor (ms since
+epoch) so `EventSource` resumes from `Last-Event-ID` after a reconnect. Connections end after
+`QUOTE_STREAM_MAX_SECONDS` and the browser reconnects on its own.
+
+`QuoteLines` is the one-shot counterpart for ``/api/quotes`` in streaming mode: one NDJSON line
+per symbol as soon as its refresh completes, then a summary line with ``"done": true``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from ..models import CachedQuote
+from .finnhub import FinnhubClient, compute_us_market_status
+from .quotes import (
+    CURSOR_OVERLAP_MS,
+    RefreshAssembler,
+    RefreshResult,
+    after_cursor,
+    ingestor_enabled,
+    iter_refresh,
+    plan_refresh,
+    read_cached_quotes,
+    request_deadline,
+    start_revalidation,
+    version_datetime,
+    version_ms,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+HEARTBEAT_SECONDS = 15
+RECONNECT_MS = 2000
+# Sync (WSGI) workers are held for the whole stream; stay under gunicorn's 60s worker timeout
+WSGI_MAX_SECONDS = 50
+
+
+def stream_offered(asgi: bool) -> bool:
+    """Whether the dashboard should subscribe to the stream instead of polling."""
+    mode = str(getattr(settings, "QUOTE_STREAM_ENABLED", "auto") or "auto").lower()
+    if mode in ("0", "false", "no", "off"):
+        return False
+    if mode in ("1", "true", "yes", "on"):
+        return True
+    return asgi and ingestor_enabled()
+
+
+def sse_event(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class QuoteStream:
+    def __init__(self, symbols: List[str], last_event_id: Optional[str] = None, asgi: bool = False):
+        self.symbols = symbols
+        self.resume_from = version_datetime(last_event_id)
+        self.cursor: Optional[datetime] = None
+        self.sent: Dict[str, Dict[str, Any]] = {}
+        self.versions: Dict[str, int] = {}  # of the quotes collected for the next event
+        self.session: Optional[str] = None
+        self.poll_seconds = max(0.2, float(getattr(settings, "QUOTE_STREAM_POLL_SECONDS", 1.0)))
+        max_seconds = float(getattr(settings, "QUOTE_STREAM_MAX_SECONDS", 300))
+        self.max_seconds = max_seconds if asgi else min(max_seconds, WSGI_MAX_SECONDS)
+
+    def _rows(self, since: Optional[datetime]):
+        qs = CachedQuote.objects.filter(symbol__in=self.symbols)
+        if since is not None:
+            qs = qs.filter(changed_at__gt=since - timedelta(milliseconds=CURSOR_OVERLAP_MS))
+        return qs.order_by("changed_at")
+
+    def _collect(self, since: Optional[datetime]) -> Dict[str, Dict[str, Any]]:
+        changed: Dict[str, Dict[str, Any]] = {}
+        self.versions = {}
+        for row in self._rows(since):
+            if row.changed_at and (self.cursor is None or row.changed_at > self.cursor):
+                self.cursor = row.changed_at
+            data = row.data if isinstance(row.data, dict) else {}
+            if data and self.sent.get(row.symbol) != data:
+                changed[row.symbol] = data
+                self.sent[row.symbol] = data
+                self.versions[row.symbol] = version_ms(row.changed_at)
+        return changed
+
+    def _quotes_event(self, kind: str, quotes: Dict[str, Dict[str, Any]]) -> str:
+        data = {"quotes": quotes, "versions": self.versions, "asOf": int(time.time())}
+        return sse_event(kind, data, str(version_ms(self.cursor)))
+
+    def _status_event(self) -> Optional[str]:
+        status = compute_us_market_status()
+        if status.get("session") == self.session:
+            return None
+        self.session = status.get("session")
+        return sse_event("status", status)
+
+    def open(self) -> List[str]:
+        """Initial events: reconnect hint, market status and a snapshot (or the delta since resume)."""
+        events = [f"retry: {RECONNECT_MS}\n\n"]
+        status = self._status_event()
+        if status:
+            events.append(status)
+        quotes = self._collect(self.resume_from)
+        if self.resume_from is not None and self.cursor is None:
+            self.cursor = self.resume_from
+        kind = "quotes" if self.resume_from is not None else "snapshot"
+        events.append(self._quotes_event(kind, quotes))
+        return events
+
+    def poll(self) -> List[str]:
+        events: List[str] = []
+        status = self._status_event()
+        if status:
+            events.append(status)
+        changed = self._collect(self.cursor)
+        if changed:
+            events.append(self._quotes_event("quotes", changed))
+        return events
+
+    def __iter__(self) -> Iterator[str]:
+        started = time.monotonic()
+        last_write = started
+        yield from self.open()
+        while time.monotonic() - started < self.max_seconds:
+            time.sleep(self.poll_seconds)
+            events = self.poll()
+            now = time.monotonic()
+            if not events and now - last_write >= HEARTBEAT_SECONDS:
+                events = [": ping\n\n"]
+            if events:
+                last_write = now
+                yield from events
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        started = time.monotonic()
+        last_write = started
+        for event in await sync_to_async(self.open)():
+            yield event
+        while time.monotonic() - started < self.max_seconds:
+            await asyncio.sleep(self.poll_seconds)
+            events = await sync_to_async(self.poll)()
+            now = time.monotonic()
+            if not events and now - last_write >= HEARTBEAT_SECONDS:
+                events = [": ping\n\n"]
+            if events:
+                last_write = now
+                for event in events:
+                    yield event
+
+
+def ndjson_line(data: Dict[str, Any]) -> str:
+    return json.dumps(data, separators=(",", ":")) + "\n"
+
+
+class QuoteLines:
+    """NDJSON body for /api/quotes streaming mode.
+
+    Symbol lines are ``{"symbol", "quote", "error", "pending"}``, the quote carrying its ``age``
+    in seconds; with `since`, symbols whose version did not move past it are left out unless they
+    carry an error. The last line has ``"done": true`` with
+    the fields of the buffered response other than ``quotes``.
+    """
+
+    def __init__(self, symbols: List[str], since: Optional[int] = None, wait: Optional[float] = None):
+        self.symbols = symbols
+        self.since = since
+        self.wait = wait
+
+    def _symbol_line(self, sym: str, result: RefreshResult) -> str:
+        return ndjson_line({
+            "symbol": sym,
+            "quote": result.quote_with_age(sym),
+            "error": result.errors.get(sym),
+            "pending": sym in result.pending,
+        })
+
+    def _summary(self, result: RefreshResult) -> str:
+        return ndjson_line({
+            "done": True,
+            "ok": True,
+            "asOf": result.as_of,
+            "marketStatus": compute_us_market_status(),
+            "errors": result.errors,
+            "rateLimit": result.rate_limit,
+            "cursor": result.cursor,
+            "since": self.since,
+            "pending": result.pending,
+        })
+
+    def _lines(self) -> Iterator[str]:
+        if ingestor_enabled():
+            result = read_cached_quotes(self.symbols)
+            for sym in self.symbols:
+                if sym in result.errors or after_cursor(result.versions.get(sym, 0), self.since):
+                    yield self._symbol_line(sym, result)
+        else:
+            plan = plan_refresh(self.symbols)
+            assembler = RefreshAssembler(plan)
+            client = FinnhubClient(deadline=request_deadline())
+            start_revalidation(plan, client)
+            for sym in iter_refresh(plan, client, assembler, self.wait):
+                if sym in assembler.result.errors or assembler.changed_since(sym, self.since):
+                    yield self._symbol_line(sym, assembler.result)
+            result = assembler.finish()
+        yield self._summary(result)
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            yield from self._lines()
+        except Exception as exc:
+            # Headers are already sent, so the failure has to travel in the body
+            logger.exception("Quote stream failed")
+            yield ndjson_line({"done": True, "ok": False, "error": str(exc)})
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+        def produce() -> None:
+            try:
+                for line in self:
+                    loop.call_soon_threadsafe(queue.put_nowait, line)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        # The whole blocking refresh runs on one pool thread, not on Django's single
+        # thread-sensitive executor where it would stall every other sync view and ORM call
+        producer = asyncio.ensure_future(sync_to_async(produce, thread_sensitive=False)())
+        while True:
+            line = await queue.get()
+            if line is None:
+                break
+            yield line
+        await producer
@@ -0,0 +1,288 @@
+"""Fixed-layout shared-memory quote table readable by every worker on the host.
+
+One `multiprocessing.shared_memory` segment holds `QUOTE_SHM_SLOTS` slots of
+``seq | symbol | present flags | c pc h l dp d t pre post week52High week52Low metricsAsOf |
+fetched_at changed_at``, with symbols placed by open addressing (crc32, linear probing; slots
+are never freed). Reads take no lock: a slot is copied between two reads of its sequence
+number and retried if a write was in progress (odd) or happened meanwhile (changed). Writers
+are serialized by an `fcntl` lock on a file next to the segment, so whichever process saves
+quotes (the ingestor, or request workers without one) can update it. A write never replaces a
+slot with an older `fetched_at`.
+
+`QUOTE_SHM_ENABLED` is ``auto`` by default: on when the background ingestor is enabled, since
+`/api/quotes` is then a pure cache read. The table is a cache of `CachedQuote`; rows changed
+outside `save_quote_payloads` (e.g. in the admin) are not mirrored until the next fetch.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import struct
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from ..models import CachedQuote
+
+try:  # POSIX only; without it the table stays off
+    import fcntl
+except Exception:  # pragma: no cover
+    fcntl = None
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except Exception:  # pragma: no cover
+    resource_tracker = None
+    shared_memory = None
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HMQT"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sII4x")
+SEQ = struct.Struct("<Q")
+FIELDS = ("c", "pc", "h", "l", "dp", "d", "t", "pre", "post", "week52High", "week52Low", "metricsAsOf")
+INT_FIELDS = frozenset({"t", "metricsAsOf"})
+# seq, symbol, present flags, quote fields, fetched_at, changed_at
+SLOT = struct.Struct("<Q16sI4x" + "d" * (len(FIELDS) + 2))
+BODY = struct.Struct(SLOT.format.replace("<Q", "<", 1))
+SYMBOL_BYTES = 16
+READ_RETRIES = 8
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return value.timestamp() if value else math.nan
+
+
+def _datetime(value: float) -> Optional[datetime]:
+    return None if math.isnan(value) else datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def _encode(data: Dict[str, Any]) -> Tuple[int, Tuple[float, ...]]:
+    flags = 0
+    values = []
+    for bit, name in enumerate(FIELDS):
+        value = data.get(name)
+        if name in data:
+            flags |= 1 << bit
+        try:
+            values.append(float(value) if value is not None else math.nan)
+        except (TypeError, ValueError):
+            values.append(math.nan)
+    return flags, tuple(values)
+
+
+def _decode(flags: int, values: Tuple[float, ...]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for bit, name in enumerate(FIELDS):
+        if flags & (1 << bit):
+            value = values[bit]
+            if math.isnan(value):
+                data[name] = None
+            else:
+                data[name] = int(value) if name in INT_FIELDS else value
+    return data
+
+
+class QuoteTable:
+    def __init__(self, name: str, slots: int):
+        self.name = f"{name}-v{LAYOUT_VERSION}"
+        self.slots = max(1, slots)
+        size = HEADER.size + self.slots * SLOT.size
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+            HEADER.pack_into(self._shm.buf, 0, MAGIC, LAYOUT_VERSION, self.slots)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+            magic, version, slots = self._wait_for_header()
+            if magic != MAGIC or version != LAYOUT_VERSION:
+                self._shm.close()
+                raise RuntimeError(f"shared memory segment {self.name} has an unexpected layout")
+            # The first process to create the segment decides its size
+            self.slots = slots
+        # Every worker attaches; none may unlink the segment when it exits
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._buf = self._shm.buf
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+        self._lock_file = None
+        self._lock_pid: Optional[int] = None
+        self._thread_lock = Lock()
+        self._stats_lock = Lock()
+        self._stats = {"reads": 0, "hits": 0, "misses": 0, "retries": 0, "writes": 0, "stale": 0, "full": 0}
+
+    def _wait_for_header(self) -> Tuple[bytes, int, int]:
+        # The creator writes the header right after sizing the segment
+        for _ in range(100):
+            magic, version, slots = HEADER.unpack_from(self._shm.buf, 0)
+            if magic == MAGIC:
+                return magic, version, slots
+            time.sleep(0.01)
+        return magic, version, slots
+
+    def _offset(self, index: int) -> int:
+        return HEADER.size + index * SLOT.size
+
+    def _probe(self, symbol: bytes) -> Iterable[int]:
+        start = zlib.crc32(symbol) % self.slots
+        for step in range(self.slots):
+            yield (start + step) % self.slots
+
+    def _read_slot(self, offset: int) -> Optional[Tuple[Any, ...]]:
+        """Consistent copy of one slot's fields, or None when it is empty or kept changing."""
+        buf = self._buf
+        for _ in range(READ_RETRIES):
+            before = SEQ.unpack_from(buf, offset)[0]
+            if before == 0:
+                return None
+            if not before & 1:
+                body = BODY.unpack_from(buf, offset + SEQ.size)
+                if SEQ.unpack_from(buf, offset)[0] == before:
+                    return body
+            with self._stats_lock:
+                self._stats["retries"] += 1
+        return None
+
+    def _find(self, symbol: bytes) -> Optional[Tuple[Any, ...]]:
+        for index in self._probe(symbol):
+            body = self._read_slot(self._offset(index))
+            if body is None:
+                return None
+            if body[0].rstrip(b"\0") == symbol:
+                return body
+        return None
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, CachedQuote]:
+        """Unsaved `CachedQuote` instances for the symbols present in the table."""
+        found: Dict[str, CachedQuote] = {}
+        reads = 0
+        for sym in symbols:
+            reads += 1
+            key = sym.encode("ascii", "ignore")[:SYMBOL_BYTES]
+            body = self._find(key)
+            if body is None:
+                continue
+            _, flags, *values = body
+            fields, (fetched_at, changed_at) = tuple(values[:len(FIELDS)]), values[len(FIELDS):]
+            found[sym] = CachedQuote(
+                symbol=sym,
+                data=_decode(flags, fields),
+                fetched_at=_datetime(fetched_at),
+                changed_at=_datetime(changed_at),
+            )
+        with self._stats_lock:
+            self._stats["reads"] += reads
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += reads - len(found)
+        return found
+
+    def _writer_lock(self):
+        # Reopened after fork: an inherited descriptor would share its lock with the parent
+        if self._lock_pid != os.getpid():
+            self._lock_file = open(self._lock_path, "a+b")
+            self._lock_pid = os.getpid()
+        return self._lock_file
+
+    def put_many(self, rows: Iterable[CachedQuote]) -> None:
+        """Store `rows`; a row with no `fetched_at` keeps the slot's current one (or is skipped)."""
+        rows = list(rows)
+        if not rows:
+            return
+        with self._thread_lock:
+            lock_file = self._writer_lock()
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                for row in rows:
+                    self._write(row)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, row: CachedQuote) -> None:
+        buf = self._buf
+        key = row.symbol.encode("ascii", "ignore")[:SYMBOL_BYTES]
+        for index in self._probe(key):
+            offset = self._offset(index)
+            seq = SEQ.unpack_from(buf, offset)[0]
+            current = BODY.unpack_from(buf, offset + SEQ.size) if seq else None
+            if current is not None and current[0].rstrip(b"\0") != key:
+                continue
+            fetched_at = _timestamp(row.fetched_at)
+            if current is not None:
+                stored_at = current[-2]
+                if math.isnan(fetched_at):
+                    fetched_at = stored_at
+                elif fetched_at < stored_at:
+                    self._count("stale")
+                    return
+            elif math.isnan(fetched_at):
+                return
+            flags, values = _encode(row.data if isinstance(row.data, dict) else {})
+            SEQ.pack_into(buf, offset, seq + 1)
+            BODY.pack_into(buf, offset + SEQ.size, key, flags, *values, fetched_at, _timestamp(row.changed_at))
+            SEQ.pack_into(buf, offset, seq + 2)
+            self._count("writes")
+            return
+        self._count("full")
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        used = sum(1 for index in range(self.slots) if SEQ.unpack_from(self._buf, self._offset(index))[0])
+        with self._stats_lock:
+            out: Dict[str, Any] = dict(self._stats)
+        out.update({
+            "enabled": True,
+            "name": self.name,
+            "slots": self.slots,
+            "used": used,
+            "bytes": HEADER.size + self.slots * SLOT.size,
+            "hitRatio": round(out["hits"] / out["reads"], 4) if out["reads"] else None,
+        })
+        return out
+
+
+def table_enabled() -> bool:
+    mode = str(getattr(settings, "QUOTE_SHM_ENABLED", "auto") or "auto").lower()
+    if mode in ("0", "false", "no", "off"):
+        return False
+    if mode in ("1", "true", "yes", "on"):
+        return True
+    return bool(getattr(settings, "QUOTE_INGESTOR_ENABLED", False))
+
+
+_table_lock = Lock()
+_table: Optional[QuoteTable] = None
+_table_failed = False
+
+
+def get_quote_table() -> Optional[QuoteTable]:
+    """The process's view of the shared table; None when disabled or unavailable on this platform."""
+    global _table, _table_failed
+    with _table_lock:
+        if _table is None and not _table_failed:
+            if not table_enabled() or fcntl is None or shared_memory is None:
+                _table_failed = True
+                return None
+            try:
+                slots = int(getattr(settings, "QUOTE_SHM_SLOTS", 2048))
+            except (TypeError, ValueError):
+                slots = 2048
+            try:
+                _table = QuoteTable(str(getattr(settings, "QUOTE_SHM_NAME", "heatmap-quotes")), slots)
+            except Exception as exc:
+                logger.warning("Shared-memory quote table unavailable; reading quotes from the database: %s", exc)
+                _table_failed = True
+        return _table
+
+
+def quote_table_stats() -> Dict[str, Any]:
+    table = get_quote_table()
+    return table.stats() if table is not None else {"enabled": False}
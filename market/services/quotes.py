@@ -0,0 +1,812 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, field, replace
+from threading import Lock
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from ..models import CachedQuote, QuoteRefreshState, Ticker
+from .executor import get_fetch_executor
+from .finnhub import AsyncFinnhubClient, FinnhubClient, FinnhubError, Quote
+from .history import record_ticks
+from .quota_planner import replan_if_due
+from .quote_cache import DELTA_MARGIN_SECONDS, get_quote_cache
+from .quote_table import get_quote_table
+from .ratelimit import acquire, cached_rate_limit_snapshot, reserve_quote_slots
+from .refresh_state import load_states, order_by_need, record_attempts
+from .schedule import current_policy, record_saved
+
+
+logger = logging.getLogger(__name__)
+
+# Keeps each upsert below SQLite's default 999 bound-parameter limit (14 columns per row)
+UPSERT_BATCH_SIZE = 60
+
+PENDING_ERROR = "PENDING: Still refreshing in the background (using cached)"
+
+# Writers stamp `changed_at` before their upsert commits, so a row can become visible with a
+# version below a cursor already handed out. Deltas look back this far behind the cursor: a
+# client may receive a quote it already has again, but never misses one.
+CURSOR_OVERLAP_MS = int(DELTA_MARGIN_SECONDS * 1000)
+
+
+def _int_setting(name: str, default: int) -> int:
+    try:
+        return int(getattr(settings, name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def ingestor_enabled() -> bool:
+    """True when a background `quote_ingestor` owns upstream fetching."""
+    return bool(getattr(settings, "QUOTE_INGESTOR_ENABLED", False))
+
+
+def tracked_symbols() -> List[str]:
+    return list(Ticker.objects.values_list("symbol", flat=True))
+
+
+def format_error(exc: FinnhubError | Exception) -> str:
+    if isinstance(exc, FinnhubError):
+        prefix = exc.code or "ERROR"
+        return f"{prefix}: {exc}"
+    return str(exc)
+
+
+def version_ms(value: Optional[datetime]) -> int:
+    """`CachedQuote.changed_at` as a client-facing version/cursor (ms since epoch)."""
+    return int(value.timestamp() * 1000) if value else 0
+
+
+def after_cursor(version: int, since: Optional[int]) -> bool:
+    """Whether a quote at `version` belongs in a delta from cursor `since` (None: everything)."""
+    return since is None or version > since - CURSOR_OVERLAP_MS
+
+
+def version_datetime(cursor: Any) -> Optional[datetime]:
+    """Inverse of `version_ms`; None for missing or malformed cursors."""
+    try:
+        ms = int(cursor)
+    except (TypeError, ValueError):
+        return None
+    if ms <= 0:
+        return None
+    return datetime.fromtimestamp(ms / 1000.0, tz=dt_timezone.utc)
+
+
+@dataclass
+class RefreshResult:
+    as_of: int
+    quotes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    rate_limit: Dict[str, Any] = field(default_factory=dict)
+    fetched: int = 0
+    versions: Dict[str, int] = field(default_factory=dict)
+    pending: List[str] = field(default_factory=list)
+    ages: Dict[str, float] = field(default_factory=dict)  # seconds since each quote was fetched
+
+    @property
+    def cursor(self) -> int:
+        return max(self.versions.values(), default=0)
+
+    def quote_with_age(self, sym: str) -> Optional[Dict[str, Any]]:
+        """Response copy of `sym`'s quote with its `age`; the stored payload never carries one."""
+        quote = self.quotes.get(sym)
+        if quote is None:
+            return None
+        return {**quote, "age": self.ages.get(sym)}
+
+    def quotes_since(self, since: Optional[int]) -> Dict[str, Dict[str, Any]]:
+        """Quotes that may have changed after `since` (all of them when `since` is None), with ages."""
+        return {
+            sym: self.quote_with_age(sym)
+            for sym in self.quotes
+            if sym not in self.versions or after_cursor(self.versions[sym], since)
+        }
+
+
+def save_quote_payloads(payloads: Dict[str, Dict[str, Any]], touch: bool = True) -> Dict[str, int]:
+    """Upsert many `CachedQuote` rows in a single INSERT ... ON CONFLICT statement.
+
+    With `touch=False` existing rows keep their `fetched_at`, so only `data` is replaced.
+    `changed_at` moves only for rows whose payload differs from what is stored. Returns the
+    resulting version of every saved symbol.
+    """
+    if not payloads:
+        return {}
+    previous = {
+        c.symbol: c
+        for c in CachedQuote.objects.filter(symbol__in=list(payloads)).only("symbol", "data", "changed_at")
+    }
+    now = timezone.now()
+    rows = []
+    versions: Dict[str, int] = {}
+    for sym, data in payloads.items():
+        prior = previous.get(sym)
+        changed_at = prior.changed_at if prior is not None and prior.changed_at and prior.data == data else now
+        row = CachedQuote(symbol=sym, data=data, fetched_at=now, changed_at=changed_at)
+        row.sync_columns()
+        rows.append(row)
+        versions[sym] = version_ms(changed_at)
+    update_fields = ["data", "changed_at", *CachedQuote.COLUMNS.values()]
+    if touch:
+        update_fields.append("fetched_at")
+    CachedQuote.objects.bulk_create(
+        rows,
+        batch_size=UPSERT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["symbol"],
+        update_fields=update_fields,
+    )
+    table = get_quote_table()
+    if touch:
+        get_quote_cache().put_many(rows)
+        if table is not None:
+            table.put_many(rows)
+    else:
+        # Existing rows kept a fetched_at this process does not know
+        get_quote_cache().invalidate(payloads)
+        if table is not None:
+            table.put_many(CachedQuote(symbol=r.symbol, data=r.data, changed_at=r.changed_at) for r in rows)
+    return versions
+
+
+def quote_age(cached: Optional[CachedQuote], now: datetime) -> Optional[float]:
+    if cached is None or cached.fetched_at is None:
+        return None
+    return round(max(0.0, (now - cached.fetched_at).total_seconds()), 1)
+
+
+def read_cached_quotes(symbols: List[str]) -> RefreshResult:
+    """Serve quotes straight from the `CachedQuote` table without touching Finnhub.
+
+    With the shared-memory table enabled (see `quote_table`) quotes are read from it. Symbols it
+    does not hold, or holds past the session TTL, go to the database (and are then copied into
+    it): an ingestor that does not share this host's /dev/shm never updates the table.
+    """
+    now = timezone.now()
+    result = RefreshResult(as_of=int(now.timestamp()))
+    table = get_quote_table()
+    cached_entries: Dict[str, CachedQuote] = {}
+    if table is not None:
+        policy = current_policy(now)
+        cached_entries = {sym: row for sym, row in table.get_many(symbols).items() if policy.is_fresh(row.fetched_at, now)}
+    missing = [sym for sym in symbols if sym not in cached_entries]
+    if missing:
+        loaded = get_quote_cache().get_many(missing)
+        cached_entries.update(loaded)
+        if table is not None and loaded:
+            table.put_many(loaded.values())
+    for sym in symbols:
+        cached = cached_entries.get(sym)
+        cached_data = cached.data if cached and isinstance(cached.data, dict) else {}
+        if cached_data:
+            result.quotes[sym] = cached_data
+            result.versions[sym] = version_ms(cached.changed_at)
+            result.ages[sym] = quote_age(cached, now)
+        else:
+            result.errors[sym] = "PENDING: Awaiting background refresh"
+    result.rate_limit = cached_rate_limit_snapshot()
+    result.rate_limit.update({"requested": 0, "granted": 0, "skipped": 0})
+    return result
+
+
+_revalidating_lock = Lock()
+_revalidating: Set[str] = set()
+
+
+def claim_revalidation(symbols: List[str]) -> List[str]:
+    """Symbols not already being revalidated by another request in this process, now claimed."""
+    with _revalidating_lock:
+        claimed = [sym for sym in symbols if sym not in _revalidating]
+        _revalidating.update(claimed)
+    return claimed
+
+
+def release_revalidation(symbols: List[str]) -> None:
+    with _revalidating_lock:
+        _revalidating.difference_update(symbols)
+
+
+@dataclass
+class RefreshPlan:
+    """What a refresh will do, decided from the cache and the rate limiter before any fetch."""
+
+    symbols: List[str]
+    now_ts: int
+    metrics_ttl: int
+    cached_entries: Dict[str, CachedQuote]
+    fresh_cached: Dict[str, Dict[str, Any]]
+    symbols_to_fetch: List[str]
+    rate_limited: List[str]
+    rate_limit_info: Dict[str, Any]
+    total_requested: int
+    session: str = "Regular"
+    session_saved: int = 0
+    refresh_states: Dict[str, QuoteRefreshState] = field(default_factory=dict)
+    revalidate: List[str] = field(default_factory=list)
+
+    @property
+    def rate_limit_error(self) -> str:
+        reset_hint = self.rate_limit_info.get("resetIn") if self.rate_limit_info else None
+        if isinstance(reset_hint, (int, float)) and reset_hint > 0:
+            return f"RATE_LIMIT: Using cached data (resets in {int(reset_hint)}s)"
+        return "RATE_LIMIT: Using cached data (Finnhub limit reached)"
+
+
+def request_deadline() -> Optional[float]:
+    """Seconds one refresh may spend on upstream calls in total (`FINNHUB_REQUEST_DEADLINE_SECONDS`)."""
+    try:
+        seconds = float(getattr(settings, "FINNHUB_REQUEST_DEADLINE_SECONDS", 8))
+    except (TypeError, ValueError):
+        seconds = 8.0
+    return seconds if seconds > 0 else None
+
+
+def plan_refresh(symbols: List[str], revalidate_in_background: bool = True) -> RefreshPlan:
+    """Split `symbols` into cache hits and upstream fetches, reserving rate-limit slots for the latter.
+
+    Cached entries are served while the market-session policy (see `schedule`) considers them
+    fresh, stretched to each symbol's planned interval (see `quota_planner`). Past that soft
+    limit, a quote younger than `FINNHUB_QUOTE_HARD_TTL_SECONDS` is still served and queued in
+    `revalidate` for a background refresh; only older or missing quotes are fetched before
+    responding. `revalidate_in_background=False` fetches every stale quote before responding, as
+    the ingestor does. Stale symbols are ranked by `refresh_state.order_by_need` first, so the ones that
+    do not fit in the per-minute rate limit (and fall back to their cached payload) rotate
+    between calls.
+    """
+    now = timezone.now()
+    now_ts = int(now.timestamp())
+
+    metrics_ttl = _int_setting("FINNHUB_METRICS_TTL_SECONDS", 21600)
+
+    cached_entries = get_quote_cache().get_many(symbols)
+
+    # Flat regular-session TTL, kept as the baseline the session policy is measured against
+    quote_ttl = _int_setting("FINNHUB_QUOTE_TTL_SECONDS", 10)
+    if quote_ttl < 0:
+        quote_ttl = 0
+    policy = current_policy(now)
+    replan_if_due(now.timestamp())
+    refresh_states = load_states(symbols)
+
+    hard_ttl = max(0, _int_setting("FINNHUB_QUOTE_HARD_TTL_SECONDS", 300)) if revalidate_in_background else 0
+
+    fresh_cached: Dict[str, Dict[str, Any]] = {}
+    symbols_to_fetch: List[str] = []
+    revalidate: List[str] = []
+    session_saved = 0
+    for sym in symbols:
+        cached = cached_entries.get(sym)
+        state = refresh_states.get(sym)
+        interval = state.planned_interval if state else None
+        use_cache = False
+        if cached and cached.fetched_at and policy.is_fresh(cached.fetched_at, now, interval):
+            cached_payload = cached.data if isinstance(cached.data, dict) else {}
+            if cached_payload:
+                fresh_cached[sym] = dict(cached_payload)
+                use_cache = True
+                if (now - cached.fetched_at).total_seconds() >= quote_ttl:
+                    session_saved += 1
+        if not use_cache:
+            cached_payload = cached.data if cached and isinstance(cached.data, dict) else {}
+            if cached_payload and cached.fetched_at and (now - cached.fetched_at).total_seconds() < hard_ttl:
+                fresh_cached[sym] = dict(cached_payload)
+                revalidate.append(sym)
+            else:
+                symbols_to_fetch.append(sym)
+    record_saved(policy.session, session_saved)
+
+    symbols_to_fetch = order_by_need(symbols_to_fetch, refresh_states, now)
+    revalidate = claim_revalidation(order_by_need(revalidate, refresh_states, now))
+
+    total_requested = len(symbols_to_fetch)
+    rate_limited_symbols: List[str] = []
+
+    if symbols_to_fetch:
+        allowed, rate_limit_info = reserve_quote_slots(total_requested)
+        if allowed < total_requested:
+            rate_limited_symbols = symbols_to_fetch[allowed:]
+            symbols_to_fetch = symbols_to_fetch[:allowed]
+            for sym in rate_limited_symbols:
+                cached = cached_entries.get(sym)
+                if cached and isinstance(cached.data, dict):
+                    fresh_cached[sym] = dict(cached.data)
+        rate_limit_info["requested"] = total_requested
+        rate_limit_info["granted"] = allowed
+        rate_limit_info["skipped"] = len(rate_limited_symbols)
+    else:
+        rate_limit_info = cached_rate_limit_snapshot()
+        rate_limit_info.update({"requested": 0, "granted": 0, "skipped": 0})
+    if revalidate:
+        # Background refreshes only get what is left after the blocking fetches
+        allowed, _ = reserve_quote_slots(len(revalidate))
+        release_revalidation(revalidate[allowed:])
+        rate_limit_info["revalidateSkipped"] = len(revalidate) - allowed
+        revalidate = revalidate[:allowed]
+    rate_limit_info["revalidating"] = len(revalidate)
+    rate_limit_info["session"] = policy.session
+    rate_limit_info["savedBySchedule"] = session_saved
+
+    return RefreshPlan(
+        symbols=list(symbols),
+        now_ts=now_ts,
+        metrics_ttl=metrics_ttl,
+        cached_entries=cached_entries,
+        fresh_cached=fresh_cached,
+        symbols_to_fetch=symbols_to_fetch,
+        rate_limited=rate_limited_symbols,
+        rate_limit_info=rate_limit_info,
+        total_requested=total_requested,
+        session=policy.session,
+        session_saved=session_saved,
+        refresh_states=refresh_states,
+        revalidate=revalidate,
+    )
+
+
+def metrics_symbols_for(plan: RefreshPlan, quote_errors: Dict[str, Any]) -> List[str]:
+    """Symbols whose cached 52-week metrics are older than `FINNHUB_METRICS_TTL_SECONDS`."""
+    rate_limited_set = set(plan.rate_limited)
+    metrics_symbols: List[str] = []
+    if plan.metrics_ttl <= 0:
+        return [sym for sym in plan.symbols if sym not in quote_errors and sym not in rate_limited_set]
+    for sym in plan.symbols:
+        if sym in quote_errors or sym in rate_limited_set:
+            continue
+        cached = plan.cached_entries.get(sym)
+        cached_data = cached.data if cached else {}
+        raw_ts = None
+        if cached_data:
+            raw_ts = cached_data.get("metricsAsOf") or cached_data.get("metrics_as_of")
+        metrics_ts = None
+        if raw_ts is not None:
+            try:
+                metrics_ts = int(float(raw_ts))
+            except (TypeError, ValueError):
+                metrics_ts = None
+        if metrics_ts is None or (plan.now_ts - metrics_ts) >= plan.metrics_ttl:
+            metrics_symbols.append(sym)
+    return metrics_symbols
+
+
+def reserve_metrics(plan: RefreshPlan) -> List[str]:
+    """Metrics due for refresh, trimmed to what the background quota class grants right now.
+
+    Called before any quote is fetched, so metrics can be fetched alongside quotes. Symbols being
+    revalidated get theirs with the background refresh, so the two saves cannot overwrite each
+    other. Symbols left out keep their cached 52-week values and are retried on a later refresh.
+    """
+    revalidating = set(plan.revalidate)
+    due = [sym for sym in metrics_symbols_for(plan, {}) if sym not in revalidating]
+    if not due:
+        return due
+    granted, _ = acquire("background", len(due))
+    plan.rate_limit_info["metricsDeferred"] = plan.rate_limit_info.get("metricsDeferred", 0) + len(due) - granted
+    return due[:granted]
+
+
+class RefreshAssembler:
+    """Builds the per-symbol response of one refresh as each symbol's data arrives.
+
+    `add` turns one symbol's fetch outcome (or its absence) into the response payload and error
+    note; `finish` persists everything in one batch and fills in versions and rate-limit info.
+    """
+
+    def __init__(self, plan: RefreshPlan):
+        self.plan = plan
+        self.result = RefreshResult(as_of=plan.now_ts, fetched=len(plan.symbols_to_fetch))
+        self._rate_limited = set(plan.rate_limited)
+        self._refreshed: Dict[str, Dict[str, Any]] = {}
+        self._metrics_only: Dict[str, Dict[str, Any]] = {}
+        self._prices: Dict[str, Tuple[Any, Any]] = {}
+        self._fetching = set(plan.symbols_to_fetch)
+        self._attempted: List[str] = []
+        self._now = timezone.now()
+
+    def add(
+        self,
+        sym: str,
+        quote_obj: Optional[Quote] = None,
+        quote_exc: Optional[FinnhubError | Exception] = None,
+        metrics_payload: Optional[Dict[str, Any]] = None,
+        metrics_exc: Optional[FinnhubError] = None,
+    ) -> None:
+        plan = self.plan
+        now_ts = plan.now_ts
+        if sym in self._fetching:
+            self._attempted.append(sym)
+        self.result.ages[sym] = 0.0 if quote_obj else quote_age(plan.cached_entries.get(sym), self._now)
+        quotes = self.result.quotes
+        errors = self.result.errors
+        rate_limit_error = plan.rate_limit_error
+        cached = plan.cached_entries.get(sym)
+        cached_data = cached.data if cached and isinstance(cached.data, dict) else {}
+        if quote_obj:
+            payload = {
+                "c": quote_obj.c,
+                "pc": quote_obj.pc,
+                "h": quote_obj.h,
+                "l": quote_obj.l,
+                "dp": quote_obj.dp,
+                "d": quote_obj.d,
+                "t": quote_obj.t,
+                "pre": quote_obj.pre,
+                "post": quote_obj.post,
+            }
+            if metrics_payload:
+                payload.update({
+                    "week52High": metrics_payload.get("week52High"),
+                    "week52Low": metrics_payload.get("week52Low"),
+                    "metricsAsOf": now_ts,
+                })
+            else:
+                if cached_data:
+                    if "week52High" in cached_data:
+                        payload["week52High"] = cached_data.get("week52High")
+                    if "week52Low" in cached_data:
+                        payload["week52Low"] = cached_data.get("week52Low")
+                    if "metricsAsOf" in cached_data:
+                        payload["metricsAsOf"] = cached_data.get("metricsAsOf")
+            quotes[sym] = payload
+            self._refreshed[sym] = payload
+            self._prices[sym] = (cached_data.get("c") if cached_data else None, quote_obj.c)
+            if sym in self._rate_limited:
+                errors[sym] = rate_limit_error
+            elif metrics_exc is not None:
+                errors[sym] = f"{format_error(metrics_exc)} (kept cached metrics)"
+            return
+
+        if sym in plan.fresh_cached:
+            payload = dict(plan.fresh_cached.get(sym, {}))
+            if metrics_payload:
+                payload.update({
+                    "week52High": metrics_payload.get("week52High"),
+                    "week52Low": metrics_payload.get("week52Low"),
+                    "metricsAsOf": now_ts,
+                })
+                if cached:
+                    self._metrics_only[sym] = payload
+            quotes[sym] = payload
+            if sym in self._rate_limited:
+                errors[sym] = rate_limit_error
+            elif metrics_exc is not None:
+                errors[sym] = f"{format_error(metrics_exc)} (kept cached metrics)"
+            return
+
+        if cached_data:
+            quotes[sym] = cached_data
+            if sym in self._rate_limited:
+                errors[sym] = rate_limit_error
+            elif quote_exc is not None:
+                errors[sym] = f"{format_error(quote_exc)} (using cached)"
+        elif quote_exc is not None:
+            errors[sym] = format_error(quote_exc)
+        elif sym in self._rate_limited:
+            errors[sym] = rate_limit_error
+
+    def add_pending(self, sym: str) -> None:
+        """`sym`'s calls are still running past the caller's deadline: serve the cached quote."""
+        cached = self.plan.cached_entries.get(sym)
+        cached_data = cached.data if cached and isinstance(cached.data, dict) else {}
+        if cached_data:
+            self.result.quotes[sym] = cached_data
+            self.result.ages[sym] = quote_age(cached, self._now)
+        self.result.errors[sym] = PENDING_ERROR
+        self.result.pending.append(sym)
+
+    def changed_since(self, sym: str, since: Optional[int]) -> bool:
+        """Whether `sym`'s assembled quote belongs in a delta from `since` (see `after_cursor`)."""
+        if since is None:
+            return True
+        cached = self.plan.cached_entries.get(sym)
+        pending = self._refreshed.get(sym, self._metrics_only.get(sym))
+        if cached is None or (pending is not None and pending != cached.data):
+            return True
+        return after_cursor(version_ms(cached.changed_at), since)
+
+    def finish(self) -> RefreshResult:
+        plan = self.plan
+        result = self.result
+        for sym in result.quotes:
+            cached = plan.cached_entries.get(sym)
+            if cached is not None:
+                result.versions[sym] = version_ms(cached.changed_at)
+        result.versions.update(save_quote_payloads(self._refreshed))
+        try:
+            record_ticks(self._refreshed)
+        except DatabaseError as exc:
+            # History is best effort; the quotes above are already saved and are still returned
+            logger.warning("Could not record quote history: %s", exc)
+        # Metrics-only updates keep fetched_at so the quote TTL is not reset
+        result.versions.update(save_quote_payloads(self._metrics_only, touch=False))
+        record_attempts(self._attempted, self._prices, plan.refresh_states, timezone.now())
+
+        rate_limit_info = plan.rate_limit_info
+        rate_limit_info.setdefault("requested", plan.total_requested)
+        rate_limit_info.setdefault("granted", plan.total_requested - len(plan.rate_limited))
+        rate_limit_info.setdefault("skipped", len(plan.rate_limited))
+        result.rate_limit = rate_limit_info
+        return result
+
+
+def finish_refresh(
+    plan: RefreshPlan,
+    quote_results: Dict[str, Quote],
+    quote_errors: Dict[str, FinnhubError | Exception],
+    metrics_results: Dict[str, Dict[str, Any]],
+    metrics_errors: Dict[str, FinnhubError],
+) -> RefreshResult:
+    """Merge fetched data with the cache, persist it and build the per-symbol response."""
+    assembler = RefreshAssembler(plan)
+    for sym in plan.symbols:
+        assembler.add(sym, quote_results.get(sym), quote_errors.get(sym), metrics_results.get(sym), metrics_errors.get(sym))
+    return assembler.finish()
+
+
+class _Outcomes:
+    """Results and errors of one refresh's quote and metrics calls, keyed by kind then symbol."""
+
+    def __init__(self) -> None:
+        self.results: Dict[str, Dict[str, Any]] = {"quote": {}, "metrics": {}}
+        self.errors: Dict[str, Dict[str, FinnhubError]] = {"quote": {}, "metrics": {}}
+
+    def record(self, kind: str, sym: str, future: Future) -> None:
+        try:
+            self.results[kind][sym] = future.result()
+        except FinnhubError as exc:
+            self.errors[kind][sym] = exc
+        except Exception as exc:
+            self.errors[kind][sym] = FinnhubError(str(exc))
+
+    def add_to(self, assembler: RefreshAssembler, sym: str) -> None:
+        assembler.add(
+            sym,
+            self.results["quote"].get(sym),
+            self.errors["quote"].get(sym),
+            self.results["metrics"].get(sym),
+            self.errors["metrics"].get(sym),
+        )
+
+
+def _finish_late(plan: RefreshPlan, late: List[str], outcomes: _Outcomes, claimed: bool) -> None:
+    try:
+        assembler = RefreshAssembler(plan)
+        for sym in late:
+            outcomes.add_to(assembler, sym)
+        assembler.finish()
+    finally:
+        if claimed:
+            release_revalidation(late)
+
+
+def _complete_in_background(
+    plan: RefreshPlan,
+    late: List[str],
+    unread: Dict[Future, Tuple[str, str]],
+    outcomes: _Outcomes,
+    claimed: bool = False,
+) -> None:
+    """Persist `late` symbols once their remaining calls finish, without anyone waiting on them.
+
+    `claimed` releases the symbols' revalidation claim (see `claim_revalidation`) afterwards.
+    """
+    lock = Lock()
+    remaining = [len(unread)]
+
+    def settle(future: Future) -> None:
+        kind, sym = unread[future]
+        with lock:
+            outcomes.record(kind, sym, future)
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            # Runs on the pool rather than in this callback so DB connections get cleaned up
+            get_fetch_executor().submit(_finish_late, plan, late, outcomes, claimed)
+
+    for future in list(unread):
+        future.add_done_callback(settle)
+
+
+def revalidation_plan(plan: RefreshPlan) -> RefreshPlan:
+    """The background half of `plan`: its stale-but-servable symbols, fetched unconditionally."""
+    symbols = list(plan.revalidate)
+    return replace(
+        plan,
+        symbols=symbols,
+        fresh_cached={sym: plan.fresh_cached[sym] for sym in symbols if sym in plan.fresh_cached},
+        symbols_to_fetch=symbols,
+        rate_limited=[],
+        rate_limit_info=dict(plan.rate_limit_info),
+        total_requested=len(symbols),
+        session_saved=0,
+        revalidate=[],
+    )
+
+
+def start_revalidation(plan: RefreshPlan, client: FinnhubClient) -> None:
+    """Queue `plan.revalidate` on the fetch executor; results are saved when the calls finish."""
+    if not plan.revalidate:
+        return
+    background = revalidation_plan(plan)
+    try:
+        metrics_symbols = reserve_metrics(background)
+        executor = get_fetch_executor()
+        futures: Dict[Future, Tuple[str, str]] = {}
+        for sym in background.symbols_to_fetch:
+            futures[executor.submit(client.quote, sym, True)] = ("quote", sym)
+        for sym in metrics_symbols:
+            futures[executor.submit(client.metrics, sym, True)] = ("metrics", sym)
+    except BaseException:
+        release_revalidation(background.symbols)
+        raise
+    _complete_in_background(background, background.symbols, futures, _Outcomes(), claimed=True)
+
+
+def iter_refresh(
+    plan: RefreshPlan,
+    client: FinnhubClient,
+    assembler: RefreshAssembler,
+    wait: Optional[float] = None,
+) -> Iterator[str]:
+    """Run `plan`'s upstream calls and yield each symbol as soon as `assembler` has it.
+
+    Quote and metrics calls for every symbol are queued together on the shared fetch executor;
+    symbols that need no call are yielded first. Call `assembler.finish()` afterwards to persist.
+
+    With `wait`, symbols whose calls have not finished after that many seconds are added as
+    pending (cached quote) and yielded; their calls keep running and are saved to the cache when
+    they finish, for the next poll to pick up.
+    """
+    # Metrics are reserved before quote outcomes are known so both can run at the same time
+    metrics_symbols = reserve_metrics(plan)
+    executor = get_fetch_executor()
+
+    # Quote and metrics slots are reserved up front, so the client must not charge them again
+    futures: Dict[Future, Tuple[str, str]] = {}
+    for sym in plan.symbols_to_fetch:
+        futures[executor.submit(client.quote, sym, True)] = ("quote", sym)
+    for sym in metrics_symbols:
+        futures[executor.submit(client.metrics, sym, True)] = ("metrics", sym)
+
+    outstanding: Dict[str, int] = {}
+    for _, sym in futures.values():
+        outstanding[sym] = outstanding.get(sym, 0) + 1
+    for sym in plan.symbols:
+        if sym not in outstanding:
+            assembler.add(sym)
+            yield sym
+
+    outcomes = _Outcomes()
+    unread = dict(futures)
+    try:
+        for future in as_completed(futures, timeout=wait):
+            kind, sym = unread.pop(future)
+            outcomes.record(kind, sym, future)
+            outstanding[sym] -= 1
+            if not outstanding[sym]:
+                outcomes.add_to(assembler, sym)
+                yield sym
+    except TimeoutError:
+        late = [sym for sym in plan.symbols if outstanding.get(sym)]
+        for sym in late:
+            assembler.add_pending(sym)
+            yield sym
+        _complete_in_background(plan, late, unread, outcomes)
+
+
+def refresh_quotes(
+    symbols: List[str],
+    client: Optional[FinnhubClient] = None,
+    wait: Optional[float] = None,
+    revalidate_in_background: bool = True,
+) -> RefreshResult:
+    """Fetch stale quotes (and 52-week metrics) from Finnhub and persist them to `CachedQuote`.
+
+    Quotes past their soft TTL but within the hard one are served from the cache and refreshed
+    in the background (see `plan_refresh`).
+
+    Upstream time is bounded by `request_deadline()`: symbols still pending when it passes, or
+    whose endpoint circuit is open, fall back to their cached quote. `wait` returns sooner, with
+    unfinished symbols listed in `RefreshResult.pending` (see `iter_refresh`).
+    """
+    client = client or FinnhubClient(deadline=request_deadline())
+    plan = plan_refresh(symbols, revalidate_in_background)
+    start_revalidation(plan, client)
+    assembler = RefreshAssembler(plan)
+    for _ in iter_refresh(plan, client, assembler, wait):
+        pass
+    return assembler.finish()
+
+
+async def _attempt(call: Awaitable[Any]) -> Tuple[Any, Optional[FinnhubError]]:
+    try:
+        return await call, None
+    except FinnhubError as exc:
+        return None, exc
+    except Exception as exc:
+        return None, FinnhubError(str(exc))
+
+
+async def _skipped() -> Tuple[None, None]:
+    return None, None
+
+
+# Strong references to background completions; the event loop only keeps weak ones
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _in_background(coro: Awaitable[None]) -> None:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _fetch_one(
+    client: AsyncFinnhubClient,
+    sym: str,
+    fetching: Set[str],
+    metrics_due: Set[str],
+) -> Tuple[str, Any, Any, Any, Any]:
+    """`sym`'s quote and metrics calls, run together, as `RefreshAssembler.add` arguments."""
+    (quote_obj, quote_exc), (metrics_payload, metrics_exc) = await asyncio.gather(
+        _attempt(client.quote(sym, reserved=True)) if sym in fetching else _skipped(),
+        _attempt(client.metrics(sym, reserved=True)) if sym in metrics_due else _skipped(),
+    )
+    return sym, quote_obj, quote_exc, metrics_payload, metrics_exc
+
+
+async def _finish_late_async(plan: RefreshPlan, late: List[asyncio.Task]) -> None:
+    assembler = RefreshAssembler(plan)
+    for outcome in await asyncio.gather(*late):
+        assembler.add(*outcome)
+    await sync_to_async(assembler.finish)()
+
+
+async def refresh_quotes_async(
+    symbols: List[str],
+    client: Optional[AsyncFinnhubClient] = None,
+    wait: Optional[float] = None,
+) -> RefreshResult:
+    """asyncio variant of `refresh_quotes`: every upstream call is awaited concurrently on one loop.
+
+    Each symbol's quote and metrics calls run together and it is assembled when both finish.
+    Fan-out is bounded by `FINNHUB_ASYNC_MAX_CONCURRENCY` inside the client; database work runs
+    through `sync_to_async`. Stale quotes within the hard TTL are revalidated on the shared fetch
+    executor, as in `refresh_quotes`. With `wait`, symbols still running after it are served from
+    the cache as pending and saved by a background task on the same loop when they finish, so
+    only pass `wait` on a loop that outlives the call (ASGI).
+    """
+    client = client or await AsyncFinnhubClient.create(deadline=request_deadline())
+    plan = await sync_to_async(plan_refresh)(symbols)
+    if plan.revalidate:
+        # Not a task on this loop: under WSGI the loop ends with the request
+        background_client = FinnhubClient(api_key=client.api_key, base_url=client.base_url, deadline=request_deadline())
+        await sync_to_async(start_revalidation)(plan, background_client)
+    metrics_symbols = await sync_to_async(reserve_metrics)(plan)
+    fetching = set(plan.symbols_to_fetch)
+    metrics_due = set(metrics_symbols)
+    assembler = RefreshAssembler(plan)
+
+    tasks = {asyncio.ensure_future(_fetch_one(client, sym, fetching, metrics_due)): sym for sym in plan.symbols}
+    done: Set[asyncio.Task] = set()
+    if tasks:
+        done, _ = await asyncio.wait(tasks, timeout=wait)
+    late = [task for task in tasks if task not in done]
+    for task, sym in tasks.items():
+        if task in done:
+            assembler.add(*task.result())
+        else:
+            assembler.add_pending(sym)
+    if late:
+        _in_background(_finish_late_async(plan, late))
+    return await sync_to_async(assembler.finish)()
+
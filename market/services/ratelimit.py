@@ -0,0 +1,505 @@
+"""Finnhub rate limiting shared by every worker process.
+
+The limiter is a token bucket refilled continuously at `FINNHUB_RATE_LIMIT_PER_MIN / 60`
+tokens per second, holding at most `FINNHUB_RATE_LIMIT_BURST` tokens. The state lives in a
+pluggable backend selected by `FINNHUB_RATE_LIMIT_BACKEND`:
+
+- ``database`` (default): one `RateLimitBucket` row, shared by all gunicorn workers and by any
+  host pointing at the same database (SQLite file or Postgres).
+- ``redis``: a hash updated by a Lua script, for deployments that already run Redis. Requires
+  the optional ``redis`` package and `FINNHUB_RATE_LIMIT_REDIS_URL`.
+- ``memory``: per-process only; useful for tests and single-process dev servers.
+
+Every upstream call draws from the same bucket under a priority class (`QUOTA_CLASSES`):
+``interactive`` (search, profile) > ``quote`` > ``background`` (52-week metrics). A class can
+only take tokens while the bucket stays above the headroom reserved for the classes ranked
+above it (`FINNHUB_QUOTA_RESERVE_INTERACTIVE`, `FINNHUB_QUOTA_RESERVE_QUOTE`), so a metrics
+burst cannot starve quotes and neither can starve a user typing in the search box.
+
+Finnhub's own view of the quota (`X-Ratelimit-*` response headers) is folded back in with
+`observe_upstream`: the bucket never holds more tokens than upstream reports as remaining, so
+calls made with the same key elsewhere are accounted for.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from ..models import RateLimitBucket
+
+try:  # Optional dependency, only needed for the redis backend
+    import redis  # type: ignore
+except Exception:  # pragma: no cover - optional
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+BUCKET_NAME = "finnhub"
+
+# Highest priority first
+QUOTA_CLASSES = ("interactive", "quote", "background")
+_RESERVE_SETTINGS = {
+    "interactive": ("FINNHUB_QUOTA_RESERVE_INTERACTIVE", 5),
+    "quote": ("FINNHUB_QUOTA_RESERVE_QUOTE", 10),
+}
+
+
+def _get_rate_limit_setting() -> int:
+    try:
+        value = int(getattr(settings, "FINNHUB_RATE_LIMIT_PER_MIN", 60))
+    except (TypeError, ValueError):
+        value = 60
+    return value
+
+
+def _get_burst_setting(limit: int) -> int:
+    try:
+        burst = int(getattr(settings, "FINNHUB_RATE_LIMIT_BURST", 0) or 0)
+    except (TypeError, ValueError):
+        burst = 0
+    return burst if burst > 0 else limit
+
+
+@dataclass
+class Upstream:
+    """Quota as last reported by Finnhub's X-Ratelimit-* response headers."""
+
+    limit: Optional[int]
+    remaining: Optional[int]
+    reset_at: Optional[float]
+    seen_at: float
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now or time.time()
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "resetIn": max(0, int(math.ceil(self.reset_at - now))) if self.reset_at else None,
+            "age": round(max(0.0, now - self.seen_at), 1),
+        }
+
+    def ceiling(self, rate: float, now: float) -> Optional[float]:
+        """Most tokens the local bucket may hold given what upstream says is left."""
+        if self.remaining is None:
+            return None
+        if self.remaining > 0:
+            return float(self.remaining)
+        # Exhausted upstream: go into debt so the bucket only refills to one token at the reset
+        wait = max(0.0, (self.reset_at or now) - now)
+        return min(0.0, 1.0 - wait * rate)
+
+
+@dataclass
+class BucketState:
+    tokens: float
+    capacity: int
+    rate: float  # tokens per second
+    upstream: Optional[Upstream] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        remaining = max(0, int(math.floor(self.tokens + 1e-9)))
+        missing = max(0.0, self.capacity - self.tokens)
+        reset_in = int(math.ceil(missing / self.rate)) if self.rate > 0 and missing > 1e-9 else 0
+        out: Dict[str, Any] = {
+            "limit": self.capacity,
+            "used": max(0, self.capacity - remaining),
+            "remaining": remaining,
+            "resetIn": reset_in,
+        }
+        if self.upstream is not None:
+            out["upstream"] = self.upstream.snapshot()
+        return out
+
+
+def _refill(tokens: float, last: float, now: float, capacity: int, rate: float) -> float:
+    elapsed = max(0.0, now - last)
+    return min(float(capacity), tokens + elapsed * rate)
+
+
+def _grantable(requested: int, tokens: float, floor: int) -> int:
+    return max(0, min(requested, int(math.floor(tokens - floor + 1e-9))))
+
+
+class TokenBucketBackend:
+    """Base class; subclasses implement `_take` atomically for their storage and `_peek` as a
+    plain read, so looking at the bucket never takes a write lock."""
+
+    def __init__(self, name: str, capacity: int, rate: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+
+    def reserve(self, requested: int, floor: int = 0) -> Tuple[int, BucketState]:
+        """Atomically take up to `requested` whole tokens without going below `floor`."""
+        requested = max(0, int(requested))
+        if not requested:
+            return 0, self._peek()
+        return self._take(requested, max(0, int(floor)))
+
+    def state(self) -> BucketState:
+        """Current tokens, refilled up to now; read-only."""
+        return self._peek()
+
+    def observe(self, upstream: Upstream) -> BucketState:
+        """Record upstream's view of the quota and lower the local tokens to match it."""
+        return self._observe(upstream, upstream.ceiling(self.rate, time.time()))
+
+    def _take(self, requested: int, floor: int) -> Tuple[int, BucketState]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def _peek(self) -> BucketState:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def _observe(self, upstream: Upstream, ceiling: Optional[float]) -> BucketState:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class MemoryTokenBucket(TokenBucketBackend):
+    def __init__(self, name: str, capacity: int, rate: float):
+        super().__init__(name, capacity, rate)
+        self._lock = Lock()
+        self._tokens = float(capacity)
+        self._updated = time.time()
+        self._upstream: Optional[Upstream] = None
+
+    def _take(self, requested: int, floor: int) -> Tuple[int, BucketState]:
+        now = time.time()
+        with self._lock:
+            tokens = _refill(self._tokens, self._updated, now, self.capacity, self.rate)
+            granted = _grantable(requested, tokens, floor)
+            self._tokens = tokens - granted
+            self._updated = now
+            return granted, BucketState(self._tokens, self.capacity, self.rate, self._upstream)
+
+    def _peek(self) -> BucketState:
+        now = time.time()
+        with self._lock:
+            tokens = _refill(self._tokens, self._updated, now, self.capacity, self.rate)
+            return BucketState(tokens, self.capacity, self.rate, self._upstream)
+
+    def _observe(self, upstream: Upstream, ceiling: Optional[float]) -> BucketState:
+        now = time.time()
+        with self._lock:
+            tokens = _refill(self._tokens, self._updated, now, self.capacity, self.rate)
+            if ceiling is not None:
+                tokens = min(tokens, ceiling)
+            self._tokens, self._updated, self._upstream = tokens, now, upstream
+            return BucketState(tokens, self.capacity, self.rate, upstream)
+
+
+class DatabaseTokenBucket(TokenBucketBackend):
+    """Bucket stored in a `RateLimitBucket` row.
+
+    The no-op UPDATE at the start of the transaction takes the row lock on Postgres and the
+    database write lock on SQLite before the row is read, so concurrent reservations from
+    other processes serialize instead of double-spending tokens.
+    """
+
+    def _locked(self, now: float):
+        """Queryset for the bucket row, locked for the rest of the current transaction."""
+        qs = RateLimitBucket.objects.filter(name=self.name)
+        if not qs.update(name=F("name")):
+            try:
+                with transaction.atomic():
+                    RateLimitBucket.objects.create(name=self.name, tokens=float(self.capacity), updated_at=now)
+            except IntegrityError:
+                pass
+            qs.update(name=F("name"))
+        return qs
+
+    @staticmethod
+    def _upstream_of(bucket: RateLimitBucket) -> Optional[Upstream]:
+        if bucket.upstream_seen_at is None:
+            return None
+        return Upstream(bucket.upstream_limit, bucket.upstream_remaining, bucket.upstream_reset_at, bucket.upstream_seen_at)
+
+    def _take(self, requested: int, floor: int) -> Tuple[int, BucketState]:
+        now = time.time()
+        with transaction.atomic():
+            qs = self._locked(now)
+            bucket = qs.get()
+            tokens = _refill(bucket.tokens, bucket.updated_at, now, self.capacity, self.rate)
+            granted = _grantable(requested, tokens, floor)
+            tokens -= granted
+            qs.update(tokens=tokens, updated_at=max(now, bucket.updated_at))
+        return granted, BucketState(tokens, self.capacity, self.rate, self._upstream_of(bucket))
+
+    def _peek(self) -> BucketState:
+        # A single SELECT outside any transaction; a missing row is a full bucket
+        bucket = RateLimitBucket.objects.filter(name=self.name).first()
+        if bucket is None:
+            return BucketState(float(self.capacity), self.capacity, self.rate)
+        tokens = _refill(bucket.tokens, bucket.updated_at, time.time(), self.capacity, self.rate)
+        return BucketState(tokens, self.capacity, self.rate, self._upstream_of(bucket))
+
+    def _observe(self, upstream: Upstream, ceiling: Optional[float]) -> BucketState:
+        now = time.time()
+        with transaction.atomic():
+            qs = self._locked(now)
+            bucket = qs.get()
+            tokens = _refill(bucket.tokens, bucket.updated_at, now, self.capacity, self.rate)
+            if ceiling is not None:
+                tokens = min(tokens, ceiling)
+            qs.update(
+                tokens=tokens,
+                updated_at=max(now, bucket.updated_at),
+                upstream_limit=upstream.limit,
+                upstream_remaining=upstream.remaining,
+                upstream_reset_at=upstream.reset_at,
+                upstream_seen_at=upstream.seen_at,
+            )
+        return BucketState(tokens, self.capacity, self.rate, upstream)
+
+
+_REDIS_RESERVE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local floor = tonumber(ARGV[5])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1])
+local ts = tonumber(data[2])
+if tokens == nil or ts == nil then
+  tokens = capacity
+  ts = now
+end
+if now > ts then
+  tokens = math.min(capacity, tokens + (now - ts) * rate)
+  ts = now
+end
+local granted = math.max(0, math.min(requested, math.floor(tokens - floor + 1e-9)))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(ts))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / math.max(rate, 1e-6)) + 60)
+local up = redis.call('HMGET', KEYS[1], 'u_limit', 'u_remaining', 'u_reset', 'u_seen')
+return {granted, tostring(tokens), up[1] or '', up[2] or '', up[3] or '', up[4] or ''}
+"""
+
+_REDIS_OBSERVE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1])
+local ts = tonumber(data[2])
+if tokens == nil or ts == nil then
+  tokens = capacity
+  ts = now
+end
+if now > ts then
+  tokens = math.min(capacity, tokens + (now - ts) * rate)
+  ts = now
+end
+if ARGV[4] ~= '' then
+  tokens = math.min(tokens, tonumber(ARGV[4]))
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(ts),
+  'u_limit', ARGV[5], 'u_remaining', ARGV[6], 'u_reset', ARGV[7], 'u_seen', ARGV[8])
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / math.max(rate, 1e-6)) + 60)
+return tostring(tokens)
+"""
+
+
+def _opt(value: Any, cast: Callable[[Any], Any]) -> Any:
+    if value in (None, "", b""):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RedisTokenBucket(TokenBucketBackend):
+    def __init__(self, name: str, capacity: int, rate: float, url: str):
+        super().__init__(name, capacity, rate)
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_RESERVE_SCRIPT)
+        self._observe_script = self._client.register_script(_REDIS_OBSERVE_SCRIPT)
+        self._key = f"heatmap:ratelimit:{name}"
+
+    def _take(self, requested: int, floor: int) -> Tuple[int, BucketState]:
+        granted, tokens, *up = self._script(
+            keys=[self._key], args=[self.capacity, self.rate, time.time(), requested, floor]
+        )
+        return int(granted), BucketState(float(tokens), self.capacity, self.rate, self._upstream_of(*up))
+
+    @staticmethod
+    def _upstream_of(u_limit: Any, u_remaining: Any, u_reset: Any, u_seen: Any) -> Optional[Upstream]:
+        if _opt(u_seen, float) is None:
+            return None
+        return Upstream(_opt(u_limit, int), _opt(u_remaining, int), _opt(u_reset, float), float(u_seen))
+
+    def _peek(self) -> BucketState:
+        # Plain HMGET, no script: peeking must not rewrite the hash
+        tokens, ts, *up = self._client.hmget(self._key, "tokens", "ts", "u_limit", "u_remaining", "u_reset", "u_seen")
+        tokens, ts = _opt(tokens, float), _opt(ts, float)
+        if tokens is None or ts is None:
+            tokens = float(self.capacity)
+        else:
+            tokens = _refill(tokens, ts, time.time(), self.capacity, self.rate)
+        return BucketState(tokens, self.capacity, self.rate, self._upstream_of(*up))
+
+    def _observe(self, upstream: Upstream, ceiling: Optional[float]) -> BucketState:
+        args = [
+            self.capacity, self.rate, time.time(), "" if ceiling is None else ceiling,
+            "" if upstream.limit is None else upstream.limit,
+            "" if upstream.remaining is None else upstream.remaining,
+            "" if upstream.reset_at is None else upstream.reset_at,
+            upstream.seen_at,
+        ]
+        tokens = self._observe_script(keys=[self._key], args=args)
+        return BucketState(float(tokens), self.capacity, self.rate, upstream)
+
+
+_limiter_lock = Lock()
+_limiter: Optional[TokenBucketBackend] = None
+_limiter_key: Optional[Tuple[Any, ...]] = None
+
+
+def _build_limiter(backend: str, capacity: int, rate: float) -> TokenBucketBackend:
+    if backend == "memory":
+        return MemoryTokenBucket(BUCKET_NAME, capacity, rate)
+    if backend == "redis":
+        url = getattr(settings, "FINNHUB_RATE_LIMIT_REDIS_URL", "") or ""
+        if redis is not None and url:
+            return RedisTokenBucket(BUCKET_NAME, capacity, rate, url)
+        logger.warning("Redis rate limiter requested but unavailable; falling back to the database backend")
+    return DatabaseTokenBucket(BUCKET_NAME, capacity, rate)
+
+
+def get_rate_limiter() -> Optional[TokenBucketBackend]:
+    """Return the process-wide limiter, or None when rate limiting is disabled."""
+    global _limiter, _limiter_key
+    limit = _get_rate_limit_setting()
+    if limit <= 0:
+        return None
+    capacity = _get_burst_setting(limit)
+    backend = str(getattr(settings, "FINNHUB_RATE_LIMIT_BACKEND", "database") or "database").lower()
+    key = (backend, capacity, limit)
+    with _limiter_lock:
+        if _limiter is None or _limiter_key != key:
+            _limiter = _build_limiter(backend, capacity, limit / 60.0)
+            _limiter_key = key
+        return _limiter
+
+
+def rate_limit_snapshot() -> Dict[str, Any]:
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return {"limit": 0, "used": 0, "remaining": 0, "resetIn": 0}
+    return limiter.state().snapshot()
+
+
+SNAPSHOT_MAX_AGE = 1.0  # seconds
+_snapshot_lock = Lock()
+_snapshot: Optional[Tuple[float, Dict[str, Any]]] = None  # (monotonic time taken, snapshot)
+
+
+def cached_rate_limit_snapshot() -> Dict[str, Any]:
+    """`rate_limit_snapshot`, re-read at most once per `SNAPSHOT_MAX_AGE` in this process.
+
+    For cache-only read paths, which report the quota but must not query the bucket per request.
+    Returns a copy the caller may update.
+    """
+    global _snapshot
+    with _snapshot_lock:
+        now = time.monotonic()
+        if _snapshot is None or now - _snapshot[0] >= SNAPSHOT_MAX_AGE:
+            _snapshot = (now, rate_limit_snapshot())
+        return dict(_snapshot[1])
+
+
+def class_floor(quota_class: str, capacity: int) -> int:
+    """Tokens `quota_class` must leave in the bucket for the classes ranked above it."""
+    floor = 0
+    for cls in QUOTA_CLASSES:
+        if cls == quota_class:
+            break
+        name, default = _RESERVE_SETTINGS.get(cls, ("", 0))
+        try:
+            floor += max(0, int(getattr(settings, name, default))) if name else 0
+        except (TypeError, ValueError):
+            floor += default
+    # Never reserve the whole bucket, or the lowest class could not run at all
+    return min(floor, max(0, capacity - 1))
+
+
+_class_lock = Lock()
+_class_stats: Dict[str, Dict[str, int]] = {cls: {"requested": 0, "granted": 0, "denied": 0} for cls in QUOTA_CLASSES}
+
+
+def acquire(quota_class: str, requested: int = 1) -> Tuple[int, Dict[str, Any]]:
+    """Take up to `requested` tokens for `quota_class`; returns (granted, snapshot)."""
+    if quota_class not in _class_stats:
+        raise ValueError(f"Unknown quota class: {quota_class}")
+    limiter = get_rate_limiter()
+    if limiter is None:
+        granted = requested
+        snapshot = {"limit": 0, "used": 0, "remaining": 0, "resetIn": 0}
+    else:
+        granted, state = limiter.reserve(requested, class_floor(quota_class, limiter.capacity))
+        snapshot = state.snapshot()
+    with _class_lock:
+        stats = _class_stats[quota_class]
+        stats["requested"] += requested
+        stats["granted"] += granted
+        stats["denied"] += requested - granted
+    snapshot.update({"requested": requested, "granted": granted})
+    return granted, snapshot
+
+
+def reserve_quote_slots(requested: int) -> Tuple[int, Dict[str, Any]]:
+    return acquire("quote", requested)
+
+
+_upstream_lock = Lock()
+_upstream_applied_at = 0.0
+
+
+def upstream_sync_due(remaining: Optional[int], throttled: bool = False) -> bool:
+    """Whether an upstream observation should be written to the shared bucket now.
+
+    Exhaustion and 429s always sync; otherwise at most once per `FINNHUB_UPSTREAM_SYNC_SECONDS`
+    per process, which keeps the database backend from taking a write lock on every response.
+    """
+    global _upstream_applied_at
+    try:
+        every = float(getattr(settings, "FINNHUB_UPSTREAM_SYNC_SECONDS", 1.0))
+    except (TypeError, ValueError):
+        every = 1.0
+    now = time.monotonic()
+    with _upstream_lock:
+        if not throttled and (remaining is None or remaining > 0) and now - _upstream_applied_at < every:
+            return False
+        _upstream_applied_at = now
+    return True
+
+
+def observe_upstream(limit: Optional[int], remaining: Optional[int], reset_at: Optional[float]) -> None:
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+    try:
+        limiter.observe(Upstream(limit, remaining, reset_at, time.time()))
+    except Exception as exc:  # never fail an upstream call over bookkeeping
+        logger.warning("Could not record upstream rate limit: %s", exc)
+
+
+def quota_stats() -> Dict[str, Any]:
+    limiter = get_rate_limiter()
+    capacity = limiter.capacity if limiter else 0
+    with _class_lock:
+        classes = {cls: dict(stats) for cls, stats in _class_stats.items()}
+    for cls in classes:
+        classes[cls]["floor"] = class_floor(cls, capacity) if limiter else 0
+    return {"bucket": rate_limit_snapshot(), "classes": classes}
@@ -0,0 +1,145 @@
+"""Fair ordering of stale symbols when the rate limiter grants fewer fetches than requested.
+
+Stale symbols are ranked by how overdue their last *attempt* is: the attempt age divided by the
+symbol's planned interval (see `quota_planner`), or the age scaled by `QuoteRefreshState.priority`
+before a plan exists. This happens before the grant is applied. Whatever does not fit keeps its
+old attempt time and moves up for the next round. Every symbol is therefore retried within a
+bounded time, however short the quota. Ranking by attempt rather than success keeps a symbol that
+keeps failing from taking a slot every round.
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from ..models import CachedQuote, QuoteRefreshState
+from .quota_planner import update_actual_interval, update_volatility
+
+
+def load_states(symbols: Iterable[str]) -> Dict[str, QuoteRefreshState]:
+    return {s.symbol: s for s in QuoteRefreshState.objects.filter(symbol__in=list(symbols))}
+
+
+def order_by_need(symbols: List[str], states: Dict[str, QuoteRefreshState], now: datetime) -> List[str]:
+    """Most overdue first: never-attempted symbols, then by attempt age / planned interval."""
+
+    def score(sym: str) -> float:
+        state = states.get(sym)
+        if state is None or state.last_attempt_at is None:
+            return math.inf
+        age = max(0.0, (now - state.last_attempt_at).total_seconds())
+        if state.planned_interval:
+            return age / state.planned_interval
+        return age * (1 + max(0, state.priority))
+
+    # sorted() is stable, so equal scores keep the caller's order
+    return sorted(symbols, key=score, reverse=True)
+
+
+def record_attempts(
+    attempted: List[str],
+    prices: Dict[str, Tuple[Any, Any]],
+    states: Dict[str, QuoteRefreshState],
+    now: datetime,
+) -> None:
+    """Upsert attempt/success bookkeeping for the symbols fetched this round, one statement each.
+
+    `prices` maps every successfully fetched symbol to its (previous, new) price, which feeds the
+    planner's volatility and observed-interval averages.
+    """
+    if not attempted:
+        return
+    good: List[QuoteRefreshState] = []
+    bad: List[QuoteRefreshState] = []
+    for sym in attempted:
+        prior = states.get(sym)
+        if sym in prices:
+            last = prior.last_success_at if prior else None
+            elapsed = (now - last).total_seconds() if last else None
+            old_price, new_price = prices[sym]
+            good.append(QuoteRefreshState(
+                symbol=sym,
+                last_attempt_at=now,
+                last_success_at=now,
+                failures=0,
+                volatility=update_volatility(prior.volatility if prior else None, old_price, new_price, elapsed),
+                actual_interval=update_actual_interval(prior.actual_interval if prior else None, elapsed),
+            ))
+        else:
+            failures = (prior.failures if prior else 0) + 1
+            bad.append(QuoteRefreshState(symbol=sym, last_attempt_at=now, failures=failures))
+    if good:
+        QuoteRefreshState.objects.bulk_create(
+            good,
+            update_conflicts=True,
+            unique_fields=["symbol"],
+            update_fields=["last_attempt_at", "last_success_at", "failures", "volatility", "actual_interval"],
+        )
+    if bad:
+        QuoteRefreshState.objects.bulk_create(
+            bad,
+            update_conflicts=True,
+            unique_fields=["symbol"],
+            update_fields=["last_attempt_at", "failures"],
+        )
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(math.ceil(pct * len(sorted_values))) - 1))
+    return round(sorted_values[idx], 1)
+
+
+def refresh_age_stats(symbols: List[str], now: datetime, per_symbol: bool = False) -> Dict[str, Any]:
+    """Quote ages (seconds since the last successful fetch) and the expected worst-case bound."""
+    states = load_states(symbols)
+    fetched = dict(CachedQuote.objects.filter(symbol__in=symbols).values_list("symbol", "fetched_at"))
+    ages: Dict[str, Optional[float]] = {}
+    for sym in symbols:
+        state = states.get(sym)
+        last = state.last_success_at if state and state.last_success_at else fetched.get(sym)
+        ages[sym] = (now - last).total_seconds() if last else None
+
+    known = sorted(a for a in ages.values() if a is not None)
+    oldest = max((s for s in symbols if ages[s] is not None), key=lambda s: ages[s], default=None)
+    try:
+        per_min = int(getattr(settings, "FINNHUB_RATE_LIMIT_PER_MIN", 60))
+    except (TypeError, ValueError):
+        per_min = 60
+    max_priority = max((max(0, s.priority) for s in states.values()), default=0)
+    planned = [s.planned_interval for s in states.values() if s.planned_interval]
+    bound = None
+    if planned and len(planned) == len(symbols):
+        # The planner already fits every interval into the budget
+        bound = math.ceil(max(planned))
+    elif per_min > 0 and symbols:
+        ttl = int(getattr(settings, "FINNHUB_QUOTE_TTL_SECONDS", 10) or 0)
+        bound = math.ceil(len(symbols) / per_min) * 60 * (1 + max_priority) + ttl
+
+    out: Dict[str, Any] = {
+        "symbols": len(symbols),
+        "neverFetched": sum(1 for a in ages.values() if a is None),
+        "p50": _percentile(known, 0.5),
+        "p95": _percentile(known, 0.95),
+        "max": round(known[-1], 1) if known else None,
+        "oldest": oldest,
+        "boundSeconds": bound,
+    }
+    if per_symbol:
+        out["bySymbol"] = {
+            sym: {
+                "age": round(ages[sym], 1) if ages[sym] is not None else None,
+                "priority": states[sym].priority if sym in states else 0,
+                "failures": states[sym].failures if sym in states else 0,
+                "lastAttempt": int(states[sym].last_attempt_at.timestamp()) if sym in states and states[sym].last_attempt_at else None,
+                "weight": states[sym].weight if sym in states else None,
+                "plannedInterval": states[sym].planned_interval if sym in states else None,
+                "actualInterval": round(states[sym].actual_interval, 1) if sym in states and states[sym].actual_interval else None,
+            }
+            for sym in symbols
+        }
+    return out
@@ -0,0 +1,152 @@
+"""Incremental OHLC rollups of quote history at 1-minute, 5-minute, 1-hour and 1-day resolution.
+
+`apply_ticks` folds newly recorded ticks into their `QuoteBar` rows as they land, with one
+``INSERT ... ON CONFLICT (symbol, resolution, start) DO UPDATE`` per batch of bars: a new bar is
+inserted as is, an existing one is merged so that `open`/`close` follow the earliest/latest
+quote time and `high`/`low` take the max/min. Because the merge runs in SQL and re-applying a
+tick is a no-op, concurrent writers and retries cannot corrupt a bar. Bars use the tick price
+(`c`). Daily bars start at midnight New York time.
+
+Reads pick a resolution with `choose_resolution`; `prune_quote_history` expires each resolution
+after `RETENTION_DAYS`.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+
+from ..models import QuoteBar
+from .schedule import MARKET_TZ
+
+
+DAY = 86400
+# Finest first
+RESOLUTIONS: Tuple[Tuple[str, int], ...] = (("1m", 60), ("5m", 300), ("1h", 3600), ("1d", DAY))
+RETENTION_DAYS: Dict[str, Optional[int]] = {"1m": 7, "5m": 60, "1h": 730, "1d": None}
+MAX_BARS = 5000
+DELETE_BATCH_SIZE = 5000
+INSERT_BATCH_SIZE = 100  # 9 columns per row, below SQLite's 999 bound parameters
+BAR_FIELDS = ("start", "open", "high", "low", "close")
+UPSERT_COLUMNS = ("symbol", "resolution", "start", "open", "high", "low", "close", "first_t", "last_t")
+
+
+def bucket_start(t: int, seconds: int) -> int:
+    if seconds == DAY:
+        local = datetime.fromtimestamp(t, tz=dt_timezone.utc).astimezone(MARKET_TZ)
+        return int(local.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+    return t - t % seconds
+
+
+def _partial_bars(ticks: Iterable[Tuple[str, int, float]]) -> Dict[Tuple[str, str, int], Dict[str, Any]]:
+    """OHLC of the given (symbol, t, price) ticks alone, per (symbol, resolution, start)."""
+    bars: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+    for symbol, t, price in ticks:
+        for resolution, seconds in RESOLUTIONS:
+            key = (symbol, resolution, bucket_start(t, seconds))
+            bar = bars.get(key)
+            if bar is None:
+                bars[key] = {"open": price, "high": price, "low": price, "close": price, "first_t": t, "last_t": t}
+                continue
+            bar["high"] = max(bar["high"], price)
+            bar["low"] = min(bar["low"], price)
+            if t < bar["first_t"]:
+                bar["open"], bar["first_t"] = price, t
+            if t > bar["last_t"]:
+                bar["close"], bar["last_t"] = price, t
+    return bars
+
+
+def _upsert_sql(rows: int) -> str:
+    """Bar upsert for `rows` rows; right-hand sides see the stored row as it was."""
+    qn = connection.ops.quote_name
+    table = qn(QuoteBar._meta.db_table)
+    # SQLite's two-argument MAX/MIN are scalar; Postgres spells them GREATEST/LEAST
+    greatest, least = ("MAX", "MIN") if connection.vendor == "sqlite" else ("GREATEST", "LEAST")
+
+    def col(name: str) -> str:
+        return f"{table}.{qn(name)}"
+
+    def new(name: str) -> str:
+        return f"excluded.{qn(name)}"
+
+    placeholders = "(" + ", ".join(["%s"] * len(UPSERT_COLUMNS)) + ")"
+    return (
+        f"INSERT INTO {table} ({', '.join(qn(name) for name in UPSERT_COLUMNS)}) "
+        f"VALUES {', '.join([placeholders] * rows)} "
+        f"ON CONFLICT ({qn('symbol')}, {qn('resolution')}, {qn('start')}) DO UPDATE SET "
+        f"{qn('open')} = CASE WHEN {new('first_t')} < {col('first_t')} THEN {new('open')} ELSE {col('open')} END, "
+        f"{qn('first_t')} = {least}({col('first_t')}, {new('first_t')}), "
+        f"{qn('high')} = {greatest}({col('high')}, {new('high')}), "
+        f"{qn('low')} = {least}({col('low')}, {new('low')}), "
+        f"{qn('close')} = CASE WHEN {new('last_t')} > {col('last_t')} THEN {new('close')} ELSE {col('close')} END, "
+        f"{qn('last_t')} = {greatest}({col('last_t')}, {new('last_t')})"
+    )
+
+
+def apply_ticks(ticks: Iterable[Tuple[str, int, Optional[float]]]) -> int:
+    """Fold (symbol, t, price) ticks into their bars; returns how many bars were touched."""
+    bars = _partial_bars((symbol, t, price) for symbol, t, price in ticks if price is not None)
+    if not bars:
+        return 0
+    rows = [
+        (symbol, resolution, start, bar["open"], bar["high"], bar["low"], bar["close"], bar["first_t"], bar["last_t"])
+        for (symbol, resolution, start), bar in bars.items()
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[offset:offset + INSERT_BATCH_SIZE]
+            cursor.execute(_upsert_sql(len(batch)), [value for row in batch for value in row])
+    return len(bars)
+
+
+def _covers(resolution: str, start: int, now: int) -> bool:
+    days = RETENTION_DAYS[resolution]
+    return days is None or start >= now - days * DAY
+
+
+def choose_resolution(start: int, end: int, points: int, now: int) -> str:
+    """Coarsest resolution that still gives `points` bars over [start, end) and is kept that far back.
+
+    Falls back to the finest resolution still kept for `start` when none gives enough bars.
+    """
+    span = max(0, end - start)
+    kept = [(resolution, seconds) for resolution, seconds in RESOLUTIONS if _covers(resolution, start, now)]
+    if not kept:
+        return RESOLUTIONS[-1][0]
+    enough = [resolution for resolution, seconds in kept if span // seconds >= points]
+    return enough[-1] if enough else kept[0][0]
+
+
+def bar_range(
+    symbol: str,
+    resolution: str,
+    start: int,
+    end: int,
+    after: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Bars of `symbol` starting in [start, end), oldest first, and the cursor of the next page."""
+    qs = QuoteBar.objects.filter(symbol=symbol, resolution=resolution, start__gte=start, start__lt=end)
+    if after is not None:
+        qs = qs.filter(start__gt=after)
+    rows = list(qs.order_by("start").values(*BAR_FIELDS)[:MAX_BARS + 1])
+    more = len(rows) > MAX_BARS
+    rows = rows[:MAX_BARS]
+    return rows, (rows[-1]["start"] if more else None)
+
+
+def prune_bars(now: int) -> int:
+    """Delete bars older than their resolution's retention, in id batches."""
+    deleted = 0
+    for resolution, _ in RESOLUTIONS:
+        days = RETENTION_DAYS[resolution]
+        if days is None:
+            continue
+        expired = QuoteBar.objects.filter(resolution=resolution, start__lt=now - days * DAY)
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:DELETE_BATCH_SIZE])
+            if not ids:
+                break
+            deleted += QuoteBar.objects.filter(id__in=ids).delete()[0]
+    return deleted
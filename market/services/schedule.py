@@ -0,0 +1,102 @@
+"""Market-session-aware quote freshness.
+
+How long a cached quote stays fresh depends on the US session it is read in:
+
+- Regular: `FINNHUB_QUOTE_TTL_SECONDS` (prices move constantly).
+- Pre-/Post-Market: `FINNHUB_QUOTE_TTL_EXTENDED_SECONDS` (thin extended-hours trading).
+- Closed: until the next session opens, provided the quote was fetched after the last one ended;
+  prices cannot change overnight, on weekends or on exchange holidays, so one post-close fetch
+  is enough.
+
+Both the request path and the background ingestor go through `plan_refresh`, which uses this
+policy and counts the upstream calls it avoided compared with the flat regular-session TTL.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
+from .finnhub import compute_us_market_status
+from .trading_calendar import previous_trading_day, trading_day
+
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+def _ttl_setting(name: str, default: int) -> int:
+    try:
+        value = int(getattr(settings, name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(0, value)
+
+
+def last_session_end(now: datetime) -> datetime:
+    """End of the most recent trading day's post-market session at or before `now`."""
+    local = now.astimezone(MARKET_TZ)
+    day = trading_day(local.date())
+    if not day.is_open:
+        day = previous_trading_day(day.day)
+    end = datetime.combine(day.day, day.post_market_end, tzinfo=MARKET_TZ)
+    if end > local:
+        day = previous_trading_day(day.day)
+        end = datetime.combine(day.day, day.post_market_end, tzinfo=MARKET_TZ)
+    return end
+
+
+@dataclass
+class FreshnessPolicy:
+    session: str
+    ttl: Optional[int]  # None: fresh until the next session when fetched after `closed_since`
+    closed_since: Optional[datetime] = None
+
+    def is_fresh(self, fetched_at: Optional[datetime], now: datetime, interval: Optional[float] = None) -> bool:
+        """`interval` is a per-symbol planned refresh interval; it can only lengthen the session TTL."""
+        if fetched_at is None:
+            return False
+        if self.ttl is None:
+            return self.closed_since is not None and fetched_at >= self.closed_since
+        ttl = max(self.ttl, interval or 0) if self.ttl > 0 else 0
+        return ttl > 0 and (now - fetched_at).total_seconds() < ttl
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "session": self.session,
+            "ttl": self.ttl,
+            "closedSince": int(self.closed_since.timestamp()) if self.closed_since else None,
+        }
+
+
+def current_policy(now: datetime) -> FreshnessPolicy:
+    session = compute_us_market_status(now.timestamp()).get("session") or "Closed"
+    if session == "Regular":
+        return FreshnessPolicy(session, _ttl_setting("FINNHUB_QUOTE_TTL_SECONDS", 10))
+    if session in ("Pre-Market", "Post-Market"):
+        return FreshnessPolicy(session, _ttl_setting("FINNHUB_QUOTE_TTL_EXTENDED_SECONDS", 120))
+    return FreshnessPolicy(session, None, last_session_end(now))
+
+
+_stats_lock = Lock()
+_saved_by_session: Dict[str, int] = {}
+
+
+def record_saved(session: str, count: int) -> None:
+    """Count quote fetches skipped because the session policy kept a cached quote fresh."""
+    if count <= 0:
+        return
+    with _stats_lock:
+        _saved_by_session[session] = _saved_by_session.get(session, 0) + count
+
+
+def schedule_stats(now: Optional[datetime] = None) -> Dict[str, Any]:
+    out = current_policy(now or timezone.now()).describe()
+    with _stats_lock:
+        out["saved"] = sum(_saved_by_session.values())
+        out["savedBySession"] = dict(_saved_by_session)
+    return out
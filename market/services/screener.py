@@ -0,0 +1,88 @@
+"""Server-side sorting, screening and top movers over the typed `CachedQuote` columns.
+
+Everything runs as one indexed SQL query (`price` and `change_pct` carry indexes); no quote
+payload is decoded. Only tracked tickers are considered.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import CachedQuote, Ticker
+
+
+MAX_LIMIT = 100
+
+# Public sort key -> column; prefix with "-" for descending
+SORT_COLUMNS = {
+    "dp": "change_pct",
+    "d": "change",
+    "c": "price",
+    "symbol": "symbol",
+}
+
+
+def _rows(qs) -> List[Dict[str, Any]]:
+    now = timezone.now()
+    out = []
+    for row in qs.values("symbol", "fetched_at", *CachedQuote.COLUMNS.values()):
+        quote: Dict[str, Any] = {"symbol": row["symbol"]}
+        for key, column in CachedQuote.COLUMNS.items():
+            quote[key] = row[column]
+        quote["age"] = round(max(0.0, (now - row["fetched_at"]).total_seconds()), 1) if row["fetched_at"] else None
+        out.append(quote)
+    return out
+
+
+def _tracked(sector: Optional[int]):
+    tickers = Ticker.objects.all()
+    if sector is not None:
+        tickers = tickers.filter(sector_id=sector)
+    return CachedQuote.objects.filter(symbol__in=tickers.values("symbol"))
+
+
+def _sorted(qs, sort: str, limit: int) -> List[Dict[str, Any]]:
+    descending = sort.startswith("-")
+    column = SORT_COLUMNS.get(sort.lstrip("-"))
+    if column is None:
+        raise ValueError(f"Unknown sort '{sort}'; use one of {', '.join(SORT_COLUMNS)}")
+    order = F(column).desc() if descending else F(column).asc()
+    limit = max(1, min(MAX_LIMIT, limit))
+    return _rows(qs.exclude(**{f"{column}__isnull": True}).order_by(order, "symbol")[:limit])
+
+
+def screen_quotes(
+    sort: str = "-dp",
+    limit: int = 20,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_change_pct: Optional[float] = None,
+    max_change_pct: Optional[float] = None,
+    sector: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Tracked quotes within the (inclusive) bounds, ordered by `sort`.
+
+    `sort` is a `SORT_COLUMNS` key, prefixed with "-" for descending; quotes without a value to
+    sort by are left out. Raises ValueError for an unknown sort key.
+    """
+    qs = _tracked(sector)
+    if min_price is not None:
+        qs = qs.filter(price__gte=min_price)
+    if max_price is not None:
+        qs = qs.filter(price__lte=max_price)
+    if min_change_pct is not None:
+        qs = qs.filter(change_pct__gte=min_change_pct)
+    if max_change_pct is not None:
+        qs = qs.filter(change_pct__lte=max_change_pct)
+    return _sorted(qs, sort, limit)
+
+
+def top_movers(limit: int = 5, sector: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Biggest percent gainers (dp > 0) and losers (dp < 0) among tracked tickers."""
+    qs = _tracked(sector)
+    return {
+        "gainers": _sorted(qs.filter(change_pct__gt=0), "-dp", limit),
+        "losers": _sorted(qs.filter(change_pct__lt=0), "dp", limit),
+    }
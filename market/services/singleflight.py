@@ -0,0 +1,234 @@
+"""Request coalescing for upstream fetches.
+
+Concurrent callers asking for the same key share one in-flight call and its result instead of
+each hitting Finnhub. The in-process layer always applies; when `FINNHUB_SINGLEFLIGHT_BACKEND`
+is ``redis`` a second layer coalesces calls across worker processes and hosts too.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+
+try:  # Optional dependency, only needed for the cross-process layer
+    import redis  # type: ignore
+except Exception:  # pragma: no cover - optional
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+
+
+class SingleFlight:
+    """In-process coalescing: one thread runs `fn`, the others wait on its Future."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[str, Future] = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._stats["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self._stats["executed"] += 1
+                leader = True
+        if not leader:
+            return future.result()
+        try:
+            value = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["inFlight"] = len(self._calls)
+        return out
+
+
+_async_stats_lock = Lock()
+_async_stats = {"calls": 0, "executed": 0, "coalesced": 0}
+
+
+class AsyncSingleFlight:
+    """asyncio flavour of `SingleFlight`; one instance per event loop, counters shared process-wide."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _bump(name: str) -> None:
+        with _async_stats_lock:
+            _async_stats[name] += 1
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._bump("calls")
+        future = self._calls.get(key)
+        if future is not None:
+            self._bump("coalesced")
+            return await asyncio.shield(future)
+        self._bump("executed")
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved so an unawaited failure is not logged
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._calls.pop(key, None)
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        with _async_stats_lock:
+            return dict(_async_stats)
+
+
+class RedisSingleFlight:
+    """Cross-process coalescing through a Redis lease.
+
+    The caller that wins ``SET NX`` on the lease runs `fn` and publishes the encoded result under
+    a key tied to its lease token; other processes poll for that result until the lease goes away,
+    then fall back to fetching themselves. Redis failures degrade to a direct call.
+    """
+
+    def __init__(self, url: str, lease_seconds: float = 15.0, result_ttl_seconds: float = 5.0, poll_seconds: float = 0.05):
+        self._client = redis.Redis.from_url(url)
+        self.lease_ms = max(1, int(lease_seconds * 1000))
+        self.result_ttl_ms = max(1, int(result_ttl_seconds * 1000))
+        self.poll_seconds = poll_seconds
+        self._lock = Lock()
+        self._stats = {"executed": 0, "coalesced": 0, "fallbacks": 0}
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def do(self, key: str, fn: Callable[[], Any], encode: Encoder = json.dumps, decode: Decoder = json.loads) -> Any:
+        lease_key = f"heatmap:flight:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = self._client.set(lease_key, token, nx=True, px=self.lease_ms)
+        except Exception as exc:
+            logger.warning("Single-flight lease failed for %s: %s", key, exc)
+            self._bump("fallbacks")
+            return fn()
+
+        if acquired:
+            self._bump("executed")
+            try:
+                value = fn()
+                try:
+                    self._client.set(f"{lease_key}:{token}", encode(value), px=self.result_ttl_ms)
+                except Exception as exc:
+                    logger.warning("Single-flight publish failed for %s: %s", key, exc)
+                return value
+            finally:
+                try:
+                    if self._client.get(lease_key) == token.encode():
+                        self._client.delete(lease_key)
+                except Exception:
+                    pass
+
+        deadline = time.monotonic() + self.lease_ms / 1000.0
+        try:
+            leader_token = self._client.get(lease_key)
+            while leader_token and time.monotonic() < deadline:
+                raw = self._client.get(lease_key.encode() + b":" + leader_token)
+                if raw is not None:
+                    self._bump("coalesced")
+                    return decode(raw)
+                if self._client.get(lease_key) != leader_token:
+                    raw = self._client.get(lease_key.encode() + b":" + leader_token)
+                    if raw is not None:
+                        self._bump("coalesced")
+                        return decode(raw)
+                    break
+                time.sleep(self.poll_seconds)
+        except Exception as exc:
+            logger.warning("Single-flight wait failed for %s: %s", key, exc)
+        self._bump("fallbacks")
+        return fn()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+class FlightGroup:
+    """In-process coalescing, optionally layered over a cross-process `RedisSingleFlight`."""
+
+    def __init__(self, remote: Optional[RedisSingleFlight] = None) -> None:
+        self.local = SingleFlight()
+        self.remote = remote
+
+    def do(self, key: str, fn: Callable[[], Any], encode: Encoder = json.dumps, decode: Decoder = json.loads) -> Any:
+        if self.remote is None:
+            return self.local.do(key, fn)
+        return self.local.do(key, lambda: self.remote.do(key, fn, encode, decode))
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = self.local.stats()
+        out["async"] = AsyncSingleFlight.stats()
+        if self.remote is not None:
+            out["remote"] = self.remote.stats()
+        return out
+
+
+_group_lock = Lock()
+_group: Optional[FlightGroup] = None
+
+
+def get_flight_group() -> FlightGroup:
+    global _group
+    with _group_lock:
+        if _group is None:
+            remote = None
+            backend = str(getattr(settings, "FINNHUB_SINGLEFLIGHT_BACKEND", "local") or "local").lower()
+            if backend == "redis":
+                url = getattr(settings, "FINNHUB_SINGLEFLIGHT_REDIS_URL", "") or getattr(settings, "FINNHUB_RATE_LIMIT_REDIS_URL", "")
+                if redis is not None and url:
+                    remote = RedisSingleFlight(url, lease_seconds=float(getattr(settings, "FINNHUB_TIMEOUT_SECONDS", 10)) * 1.5)
+                else:
+                    logger.warning("Redis single-flight requested but unavailable; coalescing in-process only")
+            _group = FlightGroup(remote)
+        return _group
+
+
+def singleflight_stats() -> Dict[str, Any]:
+    return get_flight_group().stats()
@@ -0,0 +1,117 @@
+"""NYSE trading calendar: full-day holidays and 13:00 early closes.
+
+Dates follow the exchange's published rules: a holiday on a Saturday moves to Friday, one on a
+Sunday to Monday, except that New Year's Day on a Saturday is not observed. Each year is
+computed once and cached, so a lookup is a dict hit.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, time as dtime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+REGULAR_CLOSE = dtime(16, 0)
+EARLY_CLOSE = dtime(13, 0)
+POST_MARKET_END = dtime(20, 0)
+EARLY_POST_MARKET_END = dtime(17, 0)
+
+
+@dataclass(frozen=True)
+class TradingDay:
+    day: date
+    is_open: bool
+    holiday: Optional[str] = None
+    early_close: bool = False
+
+    @property
+    def regular_close(self) -> dtime:
+        return EARLY_CLOSE if self.early_close else REGULAR_CLOSE
+
+    @property
+    def post_market_end(self) -> dtime:
+        return EARLY_POST_MARKET_END if self.early_close else POST_MARKET_END
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def holidays(year: int) -> Dict[date, str]:
+    out: Dict[date, str] = {}
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # a Saturday New Year's Day is not observed on Dec 31
+        out[_observed(new_year)] = "New Year's Day"
+    out[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    out[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    out[_easter(year) - timedelta(days=2)] = "Good Friday"
+    out[_last_weekday(year, 5, 0)] = "Memorial Day"
+    if year >= 2022:
+        out[_observed(date(year, 6, 19))] = "Juneteenth"
+    out[_observed(date(year, 7, 4))] = "Independence Day"
+    out[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    out[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    out[_observed(date(year, 12, 25))] = "Christmas Day"
+    return out
+
+
+@lru_cache(maxsize=None)
+def early_closes(year: int) -> Dict[date, str]:
+    out: Dict[date, str] = {}
+    closed = holidays(year)
+    july_3 = date(year, 7, 3)
+    if july_3.weekday() < 4 and july_3 not in closed:
+        out[july_3] = "Independence Day (eve)"
+    out[_nth_weekday(year, 11, 3, 4) + timedelta(days=1)] = "Day after Thanksgiving"
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5 and christmas_eve not in closed:
+        out[christmas_eve] = "Christmas Eve"
+    return out
+
+
+def trading_day(day: date) -> TradingDay:
+    if day.weekday() >= 5:
+        return TradingDay(day, False)
+    holiday = holidays(day.year).get(day)
+    if holiday:
+        return TradingDay(day, False, holiday=holiday)
+    return TradingDay(day, True, early_close=day in early_closes(day.year))
+
+
+def previous_trading_day(day: date) -> TradingDay:
+    """Closest trading day strictly before `day`."""
+    info = trading_day(day - timedelta(days=1))
+    while not info.is_open:
+        info = trading_day(info.day - timedelta(days=1))
+    return info
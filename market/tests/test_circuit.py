@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from market.services.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 100.0
+        patcher = mock.patch("market.services.circuit.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("quote", threshold=3, reset_seconds=30)
+
+    def _trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.stats()["state"], CLOSED)
+        self._trip()
+        self.assertEqual(self.breaker.stats()["state"], OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_lets_one_probe_through(self):
+        self._trip()
+        self.now += 30
+        self.assertEqual(self.breaker.stats()["state"], HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.stats()["state"], CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_opens_for_another_period(self):
+        self._trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.stats()["state"], OPEN)
+        self.now += 29
+        self.assertFalse(self.breaker.allow())
+
+    def test_lost_probe_is_replaced_after_a_period(self):
+        self._trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
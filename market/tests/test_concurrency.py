@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from market.services.concurrency import AdaptiveLimiter
+
+
+class AdaptiveLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 100.0
+        patcher = mock.patch("market.services.concurrency.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8, latency_target=1.0)
+
+    def _round(self, congested=False, latency=0.1):
+        slots = [self.limiter.acquire(0) for _ in range(self.limiter.limit)]
+        self.now += latency
+        for slot in slots:
+            self.limiter.release(slot, congested)
+
+    def test_healthy_saturated_rounds_grow_the_limit_by_about_one(self):
+        self._round()
+        self.assertEqual(self.limiter.limit, 4)  # only the slot that filled the limit counts
+        for _ in range(4):
+            self._round()
+        self.assertEqual(self.limiter.limit, 5)
+
+    def test_one_congested_round_halves_the_limit_once(self):
+        self._round(congested=True)
+        self.assertEqual(self.limiter.limit, 2)
+        self.assertEqual(self.limiter.stats()["decreases"], 1)
+        self._round(congested=True)
+        self.assertEqual(self.limiter.limit, 1)
+        self._round(congested=True)
+        self.assertEqual(self.limiter.limit, 1)
+
+    def test_slow_requests_hold_the_limit(self):
+        self._round(latency=2.0)
+        self._round(latency=2.0)
+        self.assertEqual(self.limiter.limit, 4)
+
+    def test_acquire_times_out_when_the_limit_is_in_use(self):
+        slots = [self.limiter.acquire(0) for _ in range(4)]
+        self.assertTrue(all(slots))
+        self.assertIsNone(self.limiter.acquire(0))
+        self.assertEqual(self.limiter.stats()["timedOut"], 1)
@@ -0,0 +1,35 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from market.services.executor import FetchExecutor
+
+
+class FetchExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = FetchExecutor(workers=1, queue_size=1)
+        self.release = threading.Event()
+        self.addCleanup(self.executor._pool.shutdown)
+        self.addCleanup(self.release.set)
+
+    def _blocked(self):
+        self.release.wait(5)
+        return threading.current_thread().name
+
+    def test_full_queue_runs_the_task_in_the_caller(self):
+        running = self.executor.submit(self._blocked)
+        queued = self.executor.submit(self._blocked)
+        inline = self.executor.submit(threading.current_thread)
+        self.assertTrue(inline.done())
+        self.assertIs(inline.result(), threading.current_thread())
+        self.release.set()
+        self.assertTrue(running.result(5).startswith("finnhub-fetch"))
+        self.assertTrue(queued.result(5).startswith("finnhub-fetch"))
+        stats = self.executor.stats()
+        self.assertEqual((stats["submitted"], stats["callerRuns"], stats["completed"]), (2, 1, 2))
+
+    def test_caller_run_failure_lands_in_the_future(self):
+        self.executor.submit(self._blocked)
+        self.executor.submit(self._blocked)
+        future = self.executor.submit(int, "not a number")
+        self.assertIsInstance(future.exception(), ValueError)
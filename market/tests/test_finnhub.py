@@ -0,0 +1,90 @@
+import socket
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from market.services.finnhub import ConnectionPool, FinnhubClient
+
+
+BODY = b'{"c": 1}'
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(BODY), BODY)
+
+
+class _Server:
+    """Local HTTP server that answers `responses` requests per connection, then hangs or closes."""
+
+    def __init__(self, responses: int, then: str):
+        self.responses = responses
+        self.then = then
+        self.accepted = 0
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(8)
+        self._open = []
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            self._open.append(conn)
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            for _ in range(self.responses):
+                conn.recv(65536)
+                conn.sendall(RESPONSE)
+            if self.then == "close":
+                conn.close()
+        except OSError:
+            pass
+
+    def close(self):
+        self._sock.close()
+        for conn in self._open:
+            conn.close()
+
+
+class SendRetryTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = ConnectionPool()
+        patcher = mock.patch("market.services.finnhub.get_connection_pool", return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = FinnhubClient(api_key="test")
+
+    def _server(self, responses, then):
+        server = _Server(responses, then)
+        self.addCleanup(server.close)
+        return server, ("http", "127.0.0.1", server.port)
+
+    def test_stale_keep_alive_connection_is_retried_once_on_a_fresh_one(self):
+        server, key = self._server(1, then="close")
+        self.assertEqual(self.client._send(key, "/quote", 2.0)[0], 200)
+        time.sleep(0.1)  # let the server drop the idle connection
+        status, body, _ = self.client._send(key, "/quote", 2.0)
+        self.assertEqual((status, body), (200, BODY))
+        self.assertEqual(server.accepted, 2)
+        self.assertEqual(self.pool.stats()["discarded"], 1)
+
+    def test_timeout_on_a_reused_connection_is_not_retried(self):
+        server, key = self._server(1, then="hang")
+        self.client._send(key, "/quote", 2.0)
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            self.client._send(key, "/quote", 0.3)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(server.accepted, 1)
+
+    def test_failure_on_a_fresh_connection_is_not_retried(self):
+        server, key = self._server(0, then="close")
+        with self.assertRaises(ConnectionError):
+            self.client._send(key, "/quote", 2.0)
+        self.assertEqual(server.accepted, 1)
@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from market.models import QuoteTick
+from market.services.history import record_ticks, tick_range
+
+
+BASE = 1_760_700_000
+
+
+def _tick(t, price):
+    return {"c": price, "pc": 99.0, "h": price, "l": price, "d": 1.0, "dp": 1.0, "t": t}
+
+
+class RecordTicksTests(TestCase):
+    def test_repeated_quote_time_adds_nothing(self):
+        self.assertEqual(record_ticks({"AAPL": _tick(BASE, 100.0), "MSFT": _tick(BASE, 400.0)}), 2)
+        self.assertEqual(record_ticks({"AAPL": _tick(BASE, 100.0), "MSFT": _tick(BASE + 5, 401.0)}), 1)
+        self.assertEqual(record_ticks({"AAPL": _tick(0, 100.0)}), 0)
+        self.assertEqual(QuoteTick.objects.count(), 3)
+
+
+class TickRangeTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            record_ticks({"AAPL": _tick(BASE + i, 100.0 + i)})
+
+    def test_pages_follow_the_cursor(self):
+        first, cursor = tick_range("AAPL", BASE, BASE + 10, limit=3)
+        self.assertEqual([row["t"] for row in first], [BASE, BASE + 1, BASE + 2])
+        rest, last = tick_range("AAPL", BASE, BASE + 10, limit=3, after=cursor)
+        self.assertEqual([row["t"] for row in rest], [BASE + 3, BASE + 4])
+        self.assertIsNone(last)
+
+    def test_history_view_keeps_an_explicit_zero_end(self):
+        everything = self.client.get(f"/api/quotes/history?symbol=AAPL&from={BASE}").json()
+        self.assertEqual(len(everything["ticks"]), 5)
+        response = self.client.get(f"/api/quotes/history?symbol=AAPL&from={BASE}&to=0").json()
+        self.assertEqual(response["to"], 0)
+        self.assertEqual(response["ticks"], [])
+        bars = self.client.get(f"/api/quotes/bars?symbol=AAPL&from={BASE}&to=0&resolution=1m").json()
+        self.assertEqual((bars["to"], bars["bars"]), (0, []))
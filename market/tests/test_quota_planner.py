@@ -0,0 +1,54 @@
+from concurrent.futures import Future
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from market.models import QuoteRefreshState, Sector, Ticker
+from market.services import quota_planner
+from market.services.quota_planner import allocate_intervals, replan_if_due
+
+
+class AllocateIntervalsTests(TestCase):
+    def test_busier_symbols_get_shorter_intervals_within_budget(self):
+        intervals = allocate_intervals({"A": 4.0, "B": 1.0}, calls_per_second=0.5, low=1.0, high=900.0)
+        self.assertAlmostEqual(intervals["B"] / intervals["A"], 2.0)
+        self.assertAlmostEqual(sum(1 / t for t in intervals.values()), 0.5)
+
+    def test_clamped_symbols_return_their_budget(self):
+        intervals = allocate_intervals({"A": 10000.0, "B": 1.0}, calls_per_second=0.15, low=10.0, high=900.0)
+        self.assertEqual(intervals["A"], 10.0)
+        self.assertAlmostEqual(intervals["B"], 1 / (0.15 - 1 / 10.0))
+
+
+class _InlineExecutor:
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append((fn, args))
+        future = Future()
+        future.set_result(None)
+        return future
+
+
+@override_settings(QUOTE_PLAN_EVERY_SECONDS=60)
+class ReplanIfDueTests(TestCase):
+    def setUp(self):
+        Ticker.objects.create(symbol="AAPL", sector=Sector.objects.create(name="Tech"))
+        self.executor = _InlineExecutor()
+        for patcher in (
+            mock.patch.object(quota_planner, "get_fetch_executor", return_value=self.executor),
+            mock.patch.dict(quota_planner._last_plan, {"at": 0.0}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_due_check_queues_the_replan_without_touching_the_database(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(replan_if_due(1000.0))
+            self.assertFalse(replan_if_due(1030.0))
+        self.assertEqual(len(self.executor.calls), 1)
+        fn, args = self.executor.calls[0]
+        fn(*args)
+        self.assertIsNotNone(QuoteRefreshState.objects.get(symbol="AAPL").planned_interval)
+        self.assertTrue(replan_if_due(1061.0))
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.test import TestCase
+
+from market.models import CachedQuote
+from market.services.quote_cache import QuoteL1Cache
+
+from .test_quotes import T0, _quote
+
+
+class QuoteL1CacheTests(TestCase):
+    def setUp(self):
+        for sym, price in (("AAPL", 200.0), ("MSFT", 400.0), ("TSLA", 300.0)):
+            CachedQuote.objects.create(symbol=sym, data=_quote(price), fetched_at=T0, changed_at=T0)
+        self.cache = QuoteL1Cache(max_entries=2, check_seconds=0)
+
+    def test_hits_cost_only_the_generation_check(self):
+        self.cache.get_many(["AAPL", "NVDA"])
+        with self.assertNumQueries(1):
+            found = self.cache.get_many(["AAPL", "NVDA"])
+        # Symbols without a row are remembered too
+        self.assertEqual(list(found), ["AAPL"])
+        self.assertGreaterEqual(self.cache.stats()["hits"], 2)
+
+    def test_rows_written_by_another_process_are_reloaded(self):
+        self.cache.get_many(["AAPL"])
+        CachedQuote.objects.filter(symbol="AAPL").update(data=_quote(201.0), changed_at=T0 + timedelta(seconds=1))
+        self.assertEqual(self.cache.get_many(["AAPL"])["AAPL"].data["c"], 201.0)
+        self.assertEqual(self.cache.stats()["reloaded"], 1)
+
+    def test_deleted_rows_flush_the_cache(self):
+        self.cache.get_many(["AAPL", "MSFT"])
+        CachedQuote.objects.filter(symbol="MSFT").delete()
+        self.assertEqual(list(self.cache.get_many(["AAPL", "MSFT"])), ["AAPL"])
+        self.assertEqual(self.cache.stats()["flushes"], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.get_many(["AAPL", "MSFT"])
+        self.cache.get_many(["AAPL"])
+        self.cache.get_many(["TSLA"])
+        stats = self.cache.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (2, 1))
+        with self.assertNumQueries(1):
+            self.cache.get_many(["AAPL", "TSLA"])
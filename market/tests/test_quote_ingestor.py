@@ -0,0 +1,49 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from market.models import CachedQuote, Sector, Ticker
+
+from .test_finnhub import _Server
+from .test_quotes import QuoteTestCase
+
+
+class QuoteIngestorTests(QuoteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = _Server(responses=100, then="close")
+        self.addCleanup(self.server.close)
+        overrides = override_settings(
+            FINNHUB_BASE_URL=f"http://127.0.0.1:{self.server.port}",
+            FINNHUB_API_KEY="test",
+            FINNHUB_RATE_LIMIT_BACKEND="memory",
+            FINNHUB_QUOTA_RESERVE_INTERACTIVE=0,
+            FINNHUB_QUOTA_RESERVE_QUOTE=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # Keep the test runner's own signal handlers, and the quota replan off the executor threads
+        for target in (
+            "market.management.commands.quote_ingestor.signal.signal",
+            "market.services.quotes.replan_if_due",
+        ):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        sector = Sector.objects.create(name="Tech")
+        for sym in ("AAPL", "MSFT"):
+            Ticker.objects.create(symbol=sym, sector=sector)
+
+    def test_one_cycle_fills_the_cache_for_every_ticker(self):
+        out = StringIO()
+        call_command("quote_ingestor", "--once", stdout=out)
+        self.assertEqual(set(CachedQuote.objects.values_list("symbol", flat=True)), {"AAPL", "MSFT"})
+        self.assertIn("symbols=2 fetched=2", out.getvalue())
+
+    def test_failed_cycle_is_reported_not_raised(self):
+        err = StringIO()
+        with mock.patch("market.management.commands.quote_ingestor.refresh_quotes", side_effect=RuntimeError("db gone")):
+            call_command("quote_ingestor", "--once", stdout=StringIO(), stderr=err)
+        self.assertIn("Refresh cycle failed: db gone", err.getvalue())
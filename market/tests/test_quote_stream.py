@@ -0,0 +1,76 @@
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import SimpleTestCase
+
+from market.services.quote_stream import QuoteLines, QuoteStream
+from market.services.quotes import version_ms
+
+from .test_quotes import T0, QuoteTestCase, _quote
+
+
+def _events(raw):
+    """(event, data) pairs of the `quotes`/`snapshot` events in `raw`."""
+    out = []
+    for block in raw:
+        fields = dict(line.split(": ", 1) for line in block.strip().splitlines() if ": " in line)
+        if fields.get("event") in ("quotes", "snapshot"):
+            out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+class QuoteStreamTests(QuoteTestCase):
+    def test_snapshot_then_changes_with_versions(self):
+        self.save_at(T0, {"AAPL": _quote(200.0)})
+        stream = QuoteStream(["AAPL", "MSFT"])
+        [(kind, snapshot)] = _events(stream.open())
+        self.assertEqual(kind, "snapshot")
+        self.assertEqual(snapshot["versions"], {"AAPL": version_ms(T0)})
+        self.assertEqual(stream.poll(), [])
+
+        self.save_at(T0 + timedelta(seconds=2), {"MSFT": _quote(400.0)})
+        [(kind, delta)] = _events(stream.poll())
+        self.assertEqual(list(delta["quotes"]), ["MSFT"])
+
+    def test_row_committed_late_with_an_older_version_is_streamed(self):
+        self.save_at(T0 + timedelta(seconds=1), {"MSFT": _quote(400.0)})
+        stream = QuoteStream(["AAPL", "MSFT"])
+        stream.open()
+        self.save_at(T0, {"AAPL": _quote(200.0)})
+        [(_, delta)] = _events(stream.poll())
+        self.assertEqual(list(delta["quotes"]), ["AAPL"])
+        self.assertEqual(stream.cursor, T0 + timedelta(seconds=1))
+
+    def test_resume_resends_the_overlap_with_versions_for_the_client_to_drop(self):
+        self.save_at(T0, {"AAPL": _quote(200.0)})
+        stream = QuoteStream(["AAPL"], last_event_id=str(version_ms(T0)))
+        [(kind, delta)] = _events(stream.open())
+        self.assertEqual(kind, "quotes")
+        self.assertEqual(delta["versions"], {"AAPL": version_ms(T0)})
+
+
+class QuoteLinesAsyncTests(SimpleTestCase):
+    def test_body_does_not_hold_the_thread_sensitive_executor(self):
+        release = threading.Event()
+
+        def lines(self):
+            yield "first\n"
+            # Blocks like a refresh waiting on Finnhub; a thread-sensitive call must still get through
+            yield "released\n" if release.wait(2) else "timed out\n"
+
+        async def consume():
+            body = QuoteLines(["AAPL"]).__aiter__()
+            out = [await body.__anext__()]
+            pending = asyncio.ensure_future(body.__anext__())
+            await asyncio.sleep(0.05)
+            await sync_to_async(release.set)()
+            out.append(await pending)
+            out.extend([line async for line in body])
+            return out
+
+        with mock.patch.object(QuoteLines, "_lines", lines):
+            self.assertEqual(async_to_sync(consume)(), ["first\n", "released\n"])
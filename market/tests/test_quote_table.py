@@ -0,0 +1,125 @@
+import os
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from market.models import CachedQuote
+from market.services import quote_table
+from market.services.quote_table import SEQ, QuoteTable
+from market.services.quotes import read_cached_quotes
+from market.services.schedule import FreshnessPolicy
+
+from .test_quotes import QuoteTestCase
+
+
+FETCHED = datetime(2025, 10, 17, 14, 0, tzinfo=dt_timezone.utc)
+
+
+def _row(symbol, price, fetched_at=FETCHED):
+    return CachedQuote(symbol=symbol, data={"c": price, "pc": price, "h": price, "t": 1}, fetched_at=fetched_at, changed_at=fetched_at)
+
+
+@unittest.skipIf(quote_table.fcntl is None or quote_table.shared_memory is None, "needs POSIX shared memory")
+class QuoteTableTests(SimpleTestCase):
+    def setUp(self):
+        self.table = QuoteTable(f"heatmap-test-{os.getpid()}-{id(self)}", slots=8)
+        self.addCleanup(self._unlink)
+
+    def _unlink(self):
+        # The table unregistered the segment from the resource tracker; unlink() unregisters again
+        quote_table.resource_tracker.register(self.table._shm._name, "shared_memory")
+        self.table._shm.close()
+        self.table._shm.unlink()
+
+    def test_round_trip(self):
+        self.table.put_many([_row("AAPL", 101.5)])
+        found = self.table.get_many(["AAPL", "MSFT"])
+        self.assertEqual(list(found), ["AAPL"])
+        self.assertEqual(found["AAPL"].data, {"c": 101.5, "pc": 101.5, "h": 101.5, "t": 1})
+        self.assertEqual(found["AAPL"].fetched_at, FETCHED)
+
+    def test_older_write_does_not_replace_newer(self):
+        self.table.put_many([_row("AAPL", 2.0)])
+        self.table.put_many([_row("AAPL", 1.0, FETCHED - timedelta(seconds=5))])
+        self.assertEqual(self.table.get_many(["AAPL"])["AAPL"].data["c"], 2.0)
+
+    def test_colliding_symbols_use_separate_slots(self):
+        symbols = [f"S{i}" for i in range(8)]
+        self.table.put_many([_row(sym, float(i)) for i, sym in enumerate(symbols)])
+        found = self.table.get_many(symbols)
+        self.assertEqual({sym: q.data["c"] for sym, q in found.items()}, {sym: float(i) for i, sym in enumerate(symbols)})
+        self.table.put_many([_row("FULL", 1.0)])
+        self.assertEqual(self.table.stats()["full"], 1)
+
+    def test_slot_being_written_is_not_read(self):
+        self.table.put_many([_row("AAPL", 1.0)])
+        offset = next(
+            self.table._offset(index) for index in range(self.table.slots)
+            if SEQ.unpack_from(self.table._buf, self.table._offset(index))[0]
+        )
+        seq = SEQ.unpack_from(self.table._buf, offset)[0]
+        SEQ.pack_into(self.table._buf, offset, seq + 1)  # a writer is mid-update
+        self.assertEqual(self.table.get_many(["AAPL"]), {})
+        self.assertEqual(self.table.stats()["retries"], quote_table.READ_RETRIES)
+        SEQ.pack_into(self.table._buf, offset, seq + 2)
+        self.assertIn("AAPL", self.table.get_many(["AAPL"]))
+
+    def test_concurrent_reads_never_see_a_torn_slot(self):
+        stop = threading.Event()
+
+        def write():
+            price = 0.0
+            while not stop.is_set():
+                price += 1
+                self.table.put_many([_row("AAPL", price)])
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            seen = 0
+            for _ in range(5000):
+                quote = self.table.get_many(["AAPL"]).get("AAPL")
+                if quote is not None:
+                    seen += 1
+                    self.assertEqual(quote.data["c"], quote.data["pc"])
+                    self.assertEqual(quote.data["c"], quote.data["h"])
+        finally:
+            stop.set()
+            writer.join()
+        self.assertGreater(seen, 0)
+
+
+@unittest.skipIf(quote_table.fcntl is None or quote_table.shared_memory is None, "needs POSIX shared memory")
+class ReadCachedQuotesTableTests(QuoteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.table = QuoteTable(f"heatmap-test-{os.getpid()}-{id(self)}", slots=8)
+        self.addCleanup(QuoteTableTests._unlink, self)
+        for target, value in (
+            ("market.services.quotes.get_quote_table", lambda: self.table),
+            ("market.services.quotes.current_policy", lambda now: FreshnessPolicy("Regular", 10)),
+            # Re-read from the bucket once a second; not part of what these tests count
+            ("market.services.quotes.cached_rate_limit_snapshot", lambda: {}),
+        ):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fresh_table_entry_is_served_without_the_database(self):
+        self.table.put_many([_row("AAPL", 1.0, timezone.now())])
+        with self.assertNumQueries(0):
+            result = read_cached_quotes(["AAPL"])
+        self.assertEqual(result.quotes["AAPL"]["c"], 1.0)
+
+    def test_entry_past_the_ttl_falls_back_to_the_database(self):
+        # Another container's ingestor saved a newer quote this host's table never saw
+        now = timezone.now()
+        self.table.put_many([_row("AAPL", 1.0, now - timedelta(seconds=60))])
+        CachedQuote.objects.create(symbol="AAPL", data={"c": 2.0, "pc": 1.0, "h": 2.0, "t": 2}, fetched_at=now, changed_at=now)
+        self.assertEqual(read_cached_quotes(["AAPL"]).quotes["AAPL"]["c"], 2.0)
+        # ... and the fresh row is copied into the table
+        self.assertEqual(self.table.get_many(["AAPL"])["AAPL"].data["c"], 2.0)
@@ -0,0 +1,195 @@
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from market.models import CachedQuote, QuoteRefreshState
+from market.services import quote_cache, quotes, ratelimit
+from market.services.finnhub import Quote
+from market.services.quote_cache import QuoteL1Cache
+from market.services.quotes import (
+    CURSOR_OVERLAP_MS,
+    PENDING_ERROR,
+    plan_refresh,
+    read_cached_quotes,
+    refresh_quotes,
+    release_revalidation,
+    save_quote_payloads,
+)
+
+
+T0 = datetime(2025, 10, 17, 14, 0, tzinfo=dt_timezone.utc)
+
+
+def _quote(price):
+    return {"c": price, "pc": price - 1, "d": 1.0, "dp": 1.0, "t": 1760709600}
+
+
+class QuoteTestCase(TestCase):
+    """Runs with the per-worker L1 cache off, so every read sees the test's own rows."""
+
+    def setUp(self):
+        patcher = mock.patch.object(quote_cache, "_cache", QuoteL1Cache(0, 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def save_at(when, payloads):
+        with mock.patch("market.services.quotes.timezone.now", return_value=when):
+            return save_quote_payloads(payloads)
+
+
+class CursorOverlapTests(QuoteTestCase):
+    def test_row_committed_late_with_an_older_version_is_still_delivered(self):
+        # Writer A stamps AAPL at T0 but commits after writer B has stamped and committed MSFT at T0 + 1s
+        self.save_at(T0 + timedelta(seconds=1), {"MSFT": _quote(400.0)})
+        cursor = read_cached_quotes(["AAPL", "MSFT"]).cursor
+        self.save_at(T0, {"AAPL": _quote(200.0)})
+
+        result = read_cached_quotes(["AAPL", "MSFT"])
+        self.assertLess(result.versions["AAPL"], cursor)
+        self.assertIn("AAPL", result.quotes_since(cursor))
+
+    def test_quotes_older_than_the_overlap_are_left_out(self):
+        self.save_at(T0 - timedelta(milliseconds=CURSOR_OVERLAP_MS + 1000), {"AAPL": _quote(200.0)})
+        self.save_at(T0, {"MSFT": _quote(400.0)})
+        result = read_cached_quotes(["AAPL", "MSFT"])
+        self.assertEqual(list(result.quotes_since(result.cursor)), ["MSFT"])
+        self.assertEqual(set(result.quotes_since(None)), {"AAPL", "MSFT"})
+
+    def test_unchanged_payload_keeps_its_version(self):
+        first = self.save_at(T0, {"AAPL": _quote(200.0)})
+        second = self.save_at(T0 + timedelta(minutes=1), {"AAPL": _quote(200.0)})
+        self.assertEqual(first, second)
+
+
+class BulkUpsertTests(QuoteTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("market.services.quotes.get_quote_table", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_many_symbols_take_one_read_and_one_write(self):
+        self.save_at(T0, {"AAPL": _quote(200.0)})
+        payloads = {f"S{i}": _quote(10.0 + i) for i in range(50)}
+        payloads["AAPL"] = _quote(201.0)
+        with self.assertNumQueries(2):
+            save_quote_payloads(payloads)
+        self.assertEqual(CachedQuote.objects.count(), 51)
+        self.assertEqual(CachedQuote.objects.get(symbol="AAPL").data["c"], 201.0)
+
+    def test_untouched_rows_keep_their_fetch_time(self):
+        self.save_at(T0, {"AAPL": _quote(200.0)})
+        with mock.patch("market.services.quotes.timezone.now", return_value=T0 + timedelta(minutes=1)):
+            save_quote_payloads({"AAPL": {**_quote(200.0), "week52High": 250.0}}, touch=False)
+        row = CachedQuote.objects.get(symbol="AAPL")
+        self.assertEqual(row.fetched_at, T0)
+        self.assertEqual(row.changed_at, T0 + timedelta(minutes=1))
+        self.assertEqual(row.data["week52High"], 250.0)
+
+
+@override_settings(
+    FINNHUB_QUOTE_TTL_SECONDS=10,
+    FINNHUB_QUOTE_HARD_TTL_SECONDS=300,
+    FINNHUB_RATE_LIMIT_BACKEND="memory",
+    FINNHUB_RATE_LIMIT_PER_MIN=600,
+    FINNHUB_QUOTA_RESERVE_INTERACTIVE=0,
+    FINNHUB_QUOTA_RESERVE_QUOTE=0,
+)
+class StaleWhileRevalidateTests(QuoteTestCase):
+    SYMBOLS = ["AAPL", "MSFT", "TSLA", "NVDA"]
+
+    def setUp(self):
+        super().setUp()
+        for target in ("market.services.quotes.replan_if_due", "market.services.quotes.get_quote_table"):
+            patcher = mock.patch(target, return_value=None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(ratelimit, "_limiter", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.save_at(T0 - timedelta(seconds=5), {"AAPL": _quote(200.0)})
+        self.save_at(T0 - timedelta(seconds=60), {"MSFT": _quote(400.0)})
+        self.save_at(T0 - timedelta(seconds=600), {"TSLA": _quote(300.0)})
+
+    def plan_at(self, when, **kwargs):
+        with mock.patch("market.services.quotes.timezone.now", return_value=when):
+            plan = plan_refresh(self.SYMBOLS, **kwargs)
+        self.addCleanup(release_revalidation, plan.revalidate)
+        return plan
+
+    def test_stale_quotes_are_served_and_revalidated_in_the_background(self):
+        plan = self.plan_at(T0)
+        self.assertEqual(set(plan.fresh_cached), {"AAPL", "MSFT"})
+        self.assertEqual(plan.revalidate, ["MSFT"])
+        self.assertEqual(set(plan.symbols_to_fetch), {"TSLA", "NVDA"})
+
+    def test_one_request_at_a_time_revalidates_a_symbol(self):
+        self.assertEqual(self.plan_at(T0).revalidate, ["MSFT"])
+        self.assertEqual(self.plan_at(T0).revalidate, [])
+
+    def test_ingestor_fetches_every_stale_quote(self):
+        plan = self.plan_at(T0, revalidate_in_background=False)
+        self.assertEqual(plan.revalidate, [])
+        self.assertEqual(set(plan.symbols_to_fetch), {"MSFT", "TSLA", "NVDA"})
+
+
+class _GatedClient:
+    """Stands in for `FinnhubClient`: quotes for `held` symbols block until `release` is set."""
+
+    def __init__(self, held):
+        self.held = set(held)
+        self.release = threading.Event()
+
+    def quote(self, symbol, reserved=False):
+        if symbol in self.held:
+            self.release.wait(5)
+        return Quote(symbol=symbol, c=100.0, pc=99.0, d=1.0, dp=1.0, t=1760709600)
+
+    def metrics(self, symbol, reserved=False):
+        return {"week52High": 120.0, "week52Low": 80.0}
+
+
+@override_settings(
+    QUOTE_INGESTOR_ENABLED=False,
+    FINNHUB_RATE_LIMIT_BACKEND="memory",
+    FINNHUB_QUOTA_RESERVE_INTERACTIVE=0,
+    FINNHUB_QUOTA_RESERVE_QUOTE=0,
+)
+class DeadlineTests(TransactionTestCase):
+    """Late symbols are saved from the fetch executor's threads, so rows must really commit."""
+
+    def setUp(self):
+        patcher = mock.patch.object(quote_cache, "_cache", QuoteL1Cache(0, 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("market.services.quotes.replan_if_due", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_late_symbols_are_pending_and_saved_when_they_finish(self):
+        client = _GatedClient(held=["MSFT"])
+        self.addCleanup(client.release.set)
+        saved = threading.Event()
+
+        def finish_late(*args):
+            try:
+                finish(*args)
+            finally:
+                saved.set()
+
+        # Polling the table while the executor writes it would trip SQLite's shared-cache table locks
+        finish = quotes._finish_late
+        with mock.patch.object(quotes, "_finish_late", finish_late):
+            result = refresh_quotes(["AAPL", "MSFT"], client=client, wait=0.2)
+            self.assertEqual(result.pending, ["MSFT"])
+            self.assertEqual(result.errors["MSFT"], PENDING_ERROR)
+            self.assertEqual(result.quotes["AAPL"]["c"], 100.0)
+            self.assertFalse(CachedQuote.objects.filter(symbol="MSFT").exists())
+            client.release.set()
+            self.assertTrue(saved.wait(5))
+        row = CachedQuote.objects.get(symbol="MSFT")
+        self.assertEqual((row.data["c"], row.data["week52High"]), (100.0, 120.0))
+        self.assertTrue(QuoteRefreshState.objects.filter(symbol="MSFT").exists())
@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from market.models import RateLimitBucket
+from market.services import ratelimit
+from market.services.finnhub import FinnhubClient
+from market.services.ratelimit import DatabaseTokenBucket, MemoryTokenBucket, Upstream, acquire, class_floor
+
+
+class DatabaseTokenBucketTests(TestCase):
+    def setUp(self):
+        self.now = 1_000_000.0
+        patcher = mock.patch("market.services.ratelimit.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = DatabaseTokenBucket("test", capacity=10, rate=1.0)
+
+    def test_reserve_grants_at_most_the_tokens_left(self):
+        self.assertEqual(self.bucket.reserve(4)[0], 4)
+        granted, state = self.bucket.reserve(20)
+        self.assertEqual(granted, 6)
+        self.assertAlmostEqual(state.tokens, 0.0)
+        self.assertEqual(self.bucket.reserve(1)[0], 0)
+
+    def test_reserve_never_goes_below_the_floor(self):
+        granted, state = self.bucket.reserve(10, floor=3)
+        self.assertEqual(granted, 7)
+        self.assertAlmostEqual(state.tokens, 3.0)
+        self.assertEqual(self.bucket.reserve(1, floor=3)[0], 0)
+        # A higher class may still spend the reserved headroom
+        self.assertEqual(self.bucket.reserve(3)[0], 3)
+
+    def test_refill_is_continuous_and_capped(self):
+        self.bucket.reserve(10)
+        self.now += 2.5
+        self.assertEqual(self.bucket.reserve(10)[0], 2)
+        self.now += 3600
+        self.assertAlmostEqual(self.bucket.state().tokens, 10.0)
+
+    def test_reservations_are_persisted_across_instances(self):
+        self.bucket.reserve(7)
+        other = DatabaseTokenBucket("test", capacity=10, rate=1.0)
+        self.assertEqual(other.reserve(10)[0], 3)
+        self.assertAlmostEqual(RateLimitBucket.objects.get(name="test").tokens, 0.0)
+
+    def test_state_is_a_single_read(self):
+        self.bucket.reserve(4)
+        before = RateLimitBucket.objects.values_list("tokens", "updated_at").get(name="test")
+        self.now += 1
+        with self.assertNumQueries(1):
+            state = self.bucket.state()
+        self.assertAlmostEqual(state.tokens, 7.0)
+        self.assertEqual(RateLimitBucket.objects.values_list("tokens", "updated_at").get(name="test"), before)
+
+    def test_state_of_a_missing_bucket_is_full_and_creates_nothing(self):
+        self.assertAlmostEqual(self.bucket.state().tokens, 10.0)
+        self.assertFalse(RateLimitBucket.objects.filter(name="test").exists())
+
+    def test_reserving_nothing_does_not_write(self):
+        self.bucket.reserve(1)
+        with self.assertNumQueries(1):
+            granted, state = self.bucket.reserve(0)
+        self.assertEqual(granted, 0)
+        self.assertAlmostEqual(state.tokens, 9.0)
+
+
+@override_settings(
+    FINNHUB_RATE_LIMIT_BACKEND="memory",
+    FINNHUB_RATE_LIMIT_PER_MIN=10,
+    FINNHUB_RATE_LIMIT_BURST=0,
+    FINNHUB_QUOTA_RESERVE_INTERACTIVE=2,
+    FINNHUB_QUOTA_RESERVE_QUOTE=3,
+)
+class QuotaClassTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ratelimit, "_limiter", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_floors_add_up_the_reserves_of_higher_classes(self):
+        self.assertEqual([class_floor(cls, 10) for cls in ("interactive", "quote", "background")], [0, 2, 5])
+        # The lowest class always keeps at least one token it can use
+        self.assertEqual(class_floor("background", 4), 3)
+
+    def test_lower_classes_leave_headroom_for_higher_ones(self):
+        self.assertEqual(acquire("background", 10)[0], 5)
+        self.assertEqual(acquire("quote", 10)[0], 3)
+        self.assertEqual(acquire("interactive", 10)[0], 2)
+
+    def test_unknown_class_is_rejected(self):
+        with self.assertRaises(ValueError):
+            acquire("bulk")
+
+
+class UpstreamObservationTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1_000_000.0
+        patcher = mock.patch("market.services.ratelimit.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = MemoryTokenBucket("test", capacity=10, rate=1.0)
+
+    def test_upstream_remaining_only_ever_lowers_the_tokens(self):
+        self.assertAlmostEqual(self.bucket.observe(Upstream(60, 4, None, self.now)).tokens, 4.0)
+        self.assertAlmostEqual(self.bucket.observe(Upstream(60, 9, None, self.now)).tokens, 4.0)
+
+    def test_exhausted_upstream_blocks_until_its_reset(self):
+        self.bucket.observe(Upstream(60, 0, self.now + 6, self.now))
+        self.now += 5
+        self.assertEqual(self.bucket.reserve(1)[0], 0)
+        self.now += 1
+        self.assertEqual(self.bucket.reserve(1)[0], 1)
+
+    def test_headers_are_read_from_responses(self):
+        headers = {"X-Ratelimit-Limit": "60", "X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "1000006"}
+        self.assertEqual(FinnhubClient._upstream_quota(200, headers), (60, 0, 1000006.0))
+        # A 429 without headers still counts as exhausted
+        self.assertEqual(FinnhubClient._upstream_quota(429, {}), (None, 0, None))
+        self.assertIsNone(FinnhubClient._upstream_quota(200, {}))
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from market.models import QuoteRefreshState
+from market.services.refresh_state import load_states, order_by_need, record_attempts
+
+
+T0 = datetime(2025, 10, 17, 14, 0, tzinfo=dt_timezone.utc)
+
+
+class OrderByNeedTests(TestCase):
+    def test_never_attempted_first_then_most_overdue(self):
+        states = {
+            "OLD": QuoteRefreshState(symbol="OLD", last_attempt_at=T0 - timedelta(seconds=60)),
+            "NEW": QuoteRefreshState(symbol="NEW", last_attempt_at=T0 - timedelta(seconds=5)),
+            "PLANNED": QuoteRefreshState(symbol="PLANNED", last_attempt_at=T0 - timedelta(seconds=20), planned_interval=2),
+        }
+        order = order_by_need(["NEW", "OLD", "PLANNED", "UNSEEN"], states, T0)
+        self.assertEqual(order, ["UNSEEN", "OLD", "PLANNED", "NEW"])
+
+    def test_symbols_left_out_move_up_next_round(self):
+        symbols = ["A", "B", "C", "D"]
+        now = T0
+        served = []
+        for _ in range(4):
+            states = load_states(symbols)
+            granted = order_by_need(symbols, states, now)[:1]  # quota for one fetch per round
+            record_attempts(granted, {sym: (None, 1.0) for sym in granted}, states, now)
+            served += granted
+            now += timedelta(seconds=10)
+        self.assertEqual(sorted(served), symbols)
+
+    def test_failed_attempts_still_count_as_attempts(self):
+        record_attempts(["A"], {}, {}, T0)
+        record_attempts(["A", "B"], {"B": (None, 1.0)}, load_states(["A"]), T0 + timedelta(seconds=1))
+        states = load_states(["A", "B"])
+        self.assertEqual(states["A"].failures, 2)
+        self.assertIsNone(states["A"].last_success_at)
+        self.assertEqual(states["A"].last_attempt_at, T0 + timedelta(seconds=1))
+        self.assertEqual(states["B"].last_success_at, T0 + timedelta(seconds=1))
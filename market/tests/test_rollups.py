@@ -0,0 +1,61 @@
+import random
+
+from django.test import TestCase
+
+from market.models import QuoteBar
+from market.services.rollups import _partial_bars, apply_ticks, bucket_start
+
+
+BASE = 1_760_700_000  # a Friday, 07:20 New York time
+
+
+def _bars(symbol):
+    return {
+        (bar.resolution, bar.start): (bar.open, bar.high, bar.low, bar.close, bar.first_t, bar.last_t)
+        for bar in QuoteBar.objects.filter(symbol=symbol)
+    }
+
+
+class ApplyTicksTests(TestCase):
+    def test_out_of_order_ticks_fold_by_quote_time(self):
+        start = bucket_start(BASE, 60)
+        apply_ticks([("AAPL", start + 30, 102.0)])
+        apply_ticks([("AAPL", start + 50, 101.0), ("AAPL", start + 10, 100.0)])
+        apply_ticks([("AAPL", start + 20, 105.0), ("AAPL", start + 40, 99.0)])
+        bar = QuoteBar.objects.get(symbol="AAPL", resolution="1m", start=start)
+        self.assertEqual((bar.open, bar.high, bar.low, bar.close), (100.0, 105.0, 99.0, 101.0))
+        self.assertEqual((bar.first_t, bar.last_t), (start + 10, start + 50))
+
+    def test_every_resolution_gets_a_bar(self):
+        apply_ticks([("AAPL", BASE, 100.0)])
+        self.assertEqual(
+            set(QuoteBar.objects.filter(symbol="AAPL").values_list("resolution", flat=True)),
+            {"1m", "5m", "1h", "1d"},
+        )
+
+    def test_batches_and_replays_match_folding_all_ticks_at_once(self):
+        rng = random.Random(7)
+        ticks = list({
+            (sym, t): (sym, t, round(rng.uniform(90, 110), 2))
+            for sym, t in ((rng.choice("XYZ"), BASE + rng.randint(0, 7200)) for _ in range(400))
+        }.values())
+        rng.shuffle(ticks)
+        for offset in range(0, len(ticks), 37):
+            apply_ticks(ticks[offset:offset + 37])
+        apply_ticks(ticks[:50])
+        expected = _partial_bars(ticks)
+        for sym in "XYZ":
+            self.assertEqual(_bars(sym), {
+                (resolution, start): (bar["open"], bar["high"], bar["low"], bar["close"], bar["first_t"], bar["last_t"])
+                for (symbol, resolution, start), bar in expected.items()
+                if symbol == sym
+            })
+
+    def test_ticks_without_a_price_are_ignored(self):
+        self.assertEqual(apply_ticks([("AAPL", BASE, None)]), 0)
+        self.assertFalse(QuoteBar.objects.exists())
+
+    def test_one_statement_per_batch(self):
+        ticks = [(f"S{i}", BASE, 100.0) for i in range(50)]  # 200 bars
+        with self.assertNumQueries(2 + 2):  # savepoint pair around two upserts
+            self.assertEqual(apply_ticks(ticks), 200)
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase, override_settings
+
+from market.services.schedule import current_policy, last_session_end
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _ny(*args):
+    return datetime(*args, tzinfo=NEW_YORK)
+
+
+@override_settings(FINNHUB_QUOTE_TTL_SECONDS=10, FINNHUB_QUOTE_TTL_EXTENDED_SECONDS=120)
+class FreshnessPolicyTests(SimpleTestCase):
+    def test_regular_session_uses_the_short_ttl(self):
+        now = _ny(2025, 10, 17, 11, 0)
+        policy = current_policy(now)
+        self.assertEqual((policy.session, policy.ttl), ("Regular", 10))
+        self.assertTrue(policy.is_fresh(now - timedelta(seconds=9), now))
+        self.assertFalse(policy.is_fresh(now - timedelta(seconds=11), now))
+        self.assertTrue(policy.is_fresh(now - timedelta(seconds=11), now, interval=30))
+
+    def test_extended_hours_use_the_extended_ttl(self):
+        policy = current_policy(_ny(2025, 10, 17, 8, 0))
+        self.assertEqual((policy.session, policy.ttl), ("Pre-Market", 120))
+
+    def test_weekend_quote_fetched_after_friday_close_stays_fresh(self):
+        now = _ny(2025, 10, 19, 12, 0)  # Sunday
+        policy = current_policy(now)
+        self.assertIsNone(policy.ttl)
+        self.assertEqual(policy.closed_since, _ny(2025, 10, 17, 20, 0))
+        self.assertTrue(policy.is_fresh(_ny(2025, 10, 17, 20, 5), now))
+        self.assertFalse(policy.is_fresh(_ny(2025, 10, 17, 19, 55), now))
+
+    def test_session_end_skips_holidays_and_early_closes(self):
+        # The Monday after Thanksgiving weekend: Friday closed early, post-market ended at 17:00
+        self.assertEqual(last_session_end(_ny(2025, 12, 1, 3, 0)), _ny(2025, 11, 28, 17, 0))
+        # Christmas Day looks back to the Christmas Eve early close
+        self.assertEqual(last_session_end(_ny(2025, 12, 25, 12, 0)), _ny(2025, 12, 24, 17, 0))
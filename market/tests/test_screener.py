@@ -0,0 +1,54 @@
+from django.test import TestCase
+
+from market.models import CachedQuote, Sector, Ticker
+from market.services.screener import screen_quotes, top_movers
+
+
+def _payload(price, dp):
+    return {"c": price, "pc": price, "d": dp, "dp": dp, "t": 1760709600, "week52High": "n/a"}
+
+
+class TypedColumnTests(TestCase):
+    def test_save_copies_payload_fields_into_columns(self):
+        row = CachedQuote.objects.create(symbol="AAPL", data=_payload(200.5, 1.25))
+        row.refresh_from_db()
+        self.assertEqual((row.price, row.change_pct, row.quote_time), (200.5, 1.25, 1760709600))
+        self.assertIsNone(row.week52_high)
+
+    def test_update_fields_with_data_keeps_columns_in_step(self):
+        row = CachedQuote.objects.create(symbol="AAPL", data=_payload(200.0, 1.0))
+        row.data = _payload(190.0, -4.0)
+        row.save(update_fields=["data"])
+        self.assertEqual(CachedQuote.objects.values_list("price", "change_pct").get(symbol="AAPL"), (190.0, -4.0))
+
+
+class ScreenerTests(TestCase):
+    def setUp(self):
+        tech = Sector.objects.create(name="Tech")
+        energy = Sector.objects.create(name="Energy")
+        for sym, sector, price, dp in (
+            ("AAPL", tech, 200.0, 2.0),
+            ("MSFT", tech, 400.0, -1.0),
+            ("NVDA", tech, 120.0, 5.0),
+            ("XOM", energy, 110.0, -3.0),
+        ):
+            Ticker.objects.create(symbol=sym, sector=sector)
+            CachedQuote.objects.create(symbol=sym, data=_payload(price, dp))
+        CachedQuote.objects.create(symbol="UNTRACKED", data=_payload(1.0, 50.0))
+        self.tech = tech
+
+    def test_filters_and_sorts_tracked_quotes(self):
+        rows = screen_quotes(sort="c", min_price=115.0, max_change_pct=4.0)
+        self.assertEqual([row["symbol"] for row in rows], ["AAPL", "MSFT"])
+        self.assertEqual(rows[0]["c"], 200.0)
+
+    def test_top_movers_by_sector(self):
+        movers = top_movers(limit=5)
+        self.assertEqual([row["symbol"] for row in movers["gainers"]], ["NVDA", "AAPL"])
+        self.assertEqual([row["symbol"] for row in movers["losers"]], ["XOM", "MSFT"])
+        tech = top_movers(limit=5, sector=self.tech.id)
+        self.assertEqual([row["symbol"] for row in tech["losers"]], ["MSFT"])
+
+    def test_unknown_sort_is_rejected(self):
+        with self.assertRaises(ValueError):
+            screen_quotes(sort="volume")
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from market.services.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"c": 1}
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(flight.do, "quote:AAPL", fetch)
+            started.wait(5)
+            followers = [pool.submit(flight.do, "quote:AAPL", fetch) for _ in range(3)]
+            while flight.stats()["calls"] < 4:
+                time.sleep(0.01)
+            release.set()
+            results = [leader.result(5)] + [f.result(5) for f in followers]
+        self.assertEqual(results, [{"c": 1}] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {"calls": 4, "executed": 1, "coalesced": 3, "inFlight": 0})
+
+    def test_failure_is_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("quote:AAPL", fail)
+        self.assertEqual(flight.do("quote:AAPL", lambda: 2), 2)
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_concurrent_tasks_share_one_call(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 7
+
+        async def run():
+            flight = AsyncSingleFlight()
+            return await asyncio.gather(*(flight.do("quote:AAPL", fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), [7] * 5)
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+
+from market.services.finnhub import compute_us_market_status
+from market.services.trading_calendar import early_closes, holidays, previous_trading_day, trading_day
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _ts(year, month, day, hour, minute=0):
+    return datetime(year, month, day, hour, minute, tzinfo=NEW_YORK).timestamp()
+
+
+class HolidayTests(SimpleTestCase):
+    def test_published_2024_holidays(self):
+        self.assertEqual(sorted(holidays(2024)), [
+            date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29),
+            date(2024, 5, 27), date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2),
+            date(2024, 11, 28), date(2024, 12, 25),
+        ])
+
+    def test_weekend_holidays_are_observed_on_the_nearest_weekday(self):
+        self.assertEqual(holidays(2021)[date(2021, 12, 24)], "Christmas Day")  # Saturday
+        self.assertEqual(holidays(2022)[date(2022, 6, 20)], "Juneteenth")  # Sunday
+        self.assertEqual(holidays(2026)[date(2026, 7, 3)], "Independence Day")  # Saturday
+
+    def test_saturday_new_year_is_not_observed(self):
+        self.assertNotIn("New Year's Day", holidays(2022).values())
+        self.assertTrue(trading_day(date(2021, 12, 31)).is_open)
+
+    def test_juneteenth_starts_in_2022(self):
+        self.assertNotIn("Juneteenth", holidays(2021).values())
+
+    def test_good_friday_follows_easter(self):
+        self.assertEqual(holidays(2025)[date(2025, 4, 18)], "Good Friday")
+        self.assertEqual(holidays(2023)[date(2023, 4, 7)], "Good Friday")
+
+
+class EarlyCloseTests(SimpleTestCase):
+    def test_published_2024_early_closes(self):
+        self.assertEqual(sorted(early_closes(2024)), [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)])
+
+    def test_no_early_close_on_the_eve_of_an_observed_holiday(self):
+        # July 3, 2026 is the observed Independence Day and Dec 24, 2027 the observed Christmas
+        self.assertNotIn(date(2026, 7, 3), early_closes(2026))
+        self.assertNotIn(date(2026, 7, 2), early_closes(2026))
+        self.assertNotIn(date(2027, 12, 24), early_closes(2027))
+        self.assertFalse(trading_day(date(2027, 12, 24)).is_open)
+
+
+class TradingDayTests(SimpleTestCase):
+    def test_previous_trading_day_skips_weekends_and_holidays(self):
+        # Tuesday after Memorial Day 2025 -> Friday before it
+        self.assertEqual(previous_trading_day(date(2025, 5, 27)).day, date(2025, 5, 23))
+
+    def test_market_status_on_a_holiday(self):
+        status = compute_us_market_status(_ts(2025, 12, 25, 11))
+        self.assertEqual((status["session"], status["holiday"]), ("Closed", "Christmas Day"))
+
+    def test_market_status_on_an_early_close(self):
+        self.assertEqual(compute_us_market_status(_ts(2025, 11, 28, 12, 59))["session"], "Regular")
+        status = compute_us_market_status(_ts(2025, 11, 28, 13, 30))
+        self.assertEqual(status["session"], "Post-Market")
+        self.assertTrue(status["earlyClose"])
+        self.assertEqual(compute_us_market_status(_ts(2025, 11, 28, 17))["session"], "Closed")
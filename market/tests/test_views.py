@@ -0,0 +1,76 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+
+from market.models import CachedQuote
+from market.services import finnhub
+
+from .test_finnhub import _Server
+from .test_quotes import T0, QuoteTestCase, _quote
+
+
+class AsyncQuotesViewTests(QuoteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = _Server(responses=100, then="close")
+        self.addCleanup(self.server.close)
+        overrides = override_settings(
+            FINNHUB_BASE_URL=f"http://127.0.0.1:{self.server.port}",
+            FINNHUB_API_KEY="test",
+            FINNHUB_RATE_LIMIT_BACKEND="memory",
+            QUOTE_INGESTOR_ENABLED=False,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_wsgi_request_closes_its_event_loop_client(self):
+        for _ in range(3):
+            response = self.client.get("/api/quotes/async?symbols=AAPL")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["quotes"]["AAPL"]["c"], 1)
+        self.assertEqual(len(finnhub._loop_states), 0)
+        self.assertTrue(CachedQuote.objects.filter(symbol="AAPL").exists())
+
+
+@override_settings(QUOTE_INGESTOR_ENABLED=True)
+class QuotesETagTests(QuoteTestCase):
+    """/api/quotes served from the cache, the way web workers answer next to the ingestor."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("market.services.quotes.get_quote_table", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_at(self, when, query="symbols=AAPL,MSFT", etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        with mock.patch("market.services.quotes.timezone.now", return_value=when):
+            return self.client.get(f"/api/quotes?{query}", **headers)
+
+    def test_unchanged_quotes_return_304(self):
+        self.save_at(T0, {"AAPL": _quote(200.0), "MSFT": _quote(400.0)})
+        first = self.get_at(T0 + timedelta(seconds=60))
+        self.assertEqual(first.status_code, 200)
+        again = self.get_at(T0 + timedelta(seconds=61), etag=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_refetch_with_unchanged_price_refreshes_ages(self):
+        self.save_at(T0, {"AAPL": _quote(200.0), "MSFT": _quote(400.0)})
+        first = self.get_at(T0 + timedelta(seconds=60))
+        self.save_at(T0 + timedelta(seconds=59), {"AAPL": _quote(200.0), "MSFT": _quote(400.0)})
+        second = self.get_at(T0 + timedelta(seconds=60), etag=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["quotes"]["AAPL"]["age"], 1.0)
+
+    def test_since_returns_only_quotes_changed_after_the_cursor(self):
+        self.save_at(T0 - timedelta(minutes=5), {"AAPL": _quote(200.0)})
+        self.save_at(T0, {"MSFT": _quote(400.0)})
+        first = self.get_at(T0).json()
+        self.assertEqual(set(first["quotes"]), {"AAPL", "MSFT"})
+        self.save_at(T0 + timedelta(seconds=30), {"MSFT": _quote(401.0)})
+        delta = self.get_at(T0 + timedelta(seconds=30), query=f"symbols=AAPL,MSFT&since={first['cursor']}").json()
+        self.assertEqual(list(delta["quotes"]), ["MSFT"])
+        self.assertEqual(delta["quotes"]["MSFT"]["c"], 401.0)
+        self.assertGreater(delta["cursor"], first["cursor"])
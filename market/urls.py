@@ -12,6 +12,13 @@ urlpatterns = [
     path('api/lots/', views.api_lots, name='api_lots'),
     path('api/search', views.api_search, name='api_search'),
     path('api/quotes', views.api_quotes, name='api_quotes'),
+    path('api/quotes/stream', views.api_quotes_stream, name='api_quotes_stream'),
+    path('api/quotes/async', views.api_quotes_async, name='api_quotes_async'),
+    path('api/quotes/screen', views.api_screen, name='api_screen'),
+    path('api/quotes/movers', views.api_movers, name='api_movers'),
+    path('api/quotes/history', views.api_quote_history, name='api_quote_history'),
+    path('api/quotes/bars', views.api_quote_bars, name='api_quote_bars'),
     path('api/market-status', views.api_market_status, name='api_market_status'),
     path('api/config', views.api_config, name='api_config'),
+    path('api/diagnostics', views.api_diagnostics, name='api_diagnostics'),
 ]
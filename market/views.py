@@ -1,25 +1,62 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Tuple
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.db.models import Sum, F, DecimalField, ExpressionWrapper
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
 from django.utils import timezone
+from django.utils.http import parse_etags
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_http_methods
 
 from .forms import PurchaseLotForm, SectorForm, TickerForm
-from .models import CachedQuote, PurchaseLot, Sector, Ticker, SiteConfig
-from .services.finnhub import FinnhubClient, FinnhubError, Quote, compute_us_market_status
+from .models import PurchaseLot, Sector, Ticker, SiteConfig
+from .services.circuit import circuit_stats
+from .services.concurrency import concurrency_stats
+from .services.executor import executor_stats
+from .services.finnhub import (
+    FinnhubClient,
+    FinnhubError,
+    close_async_loop_state,
+    compute_us_market_status,
+    connection_pool_stats,
+)
+from .services.history import tick_range
+from .services.quotes import (
+    RefreshResult,
+    ingestor_enabled,
+    read_cached_quotes,
+    refresh_quotes,
+    refresh_quotes_async,
+    tracked_symbols,
+)
+from .services.quote_cache import quote_cache_stats
+from .services.quote_stream import QuoteLines, QuoteStream, stream_offered
+from .services.quote_table import quote_table_stats
+from .services.quota_planner import planner_stats
+from .services.ratelimit import quota_stats
+from .services.refresh_state import refresh_age_stats
+from .services.rollups import RESOLUTIONS, bar_range, choose_resolution
+from .services.schedule import schedule_stats
+from .services.screener import screen_quotes, top_movers
+from .services.singleflight import singleflight_stats
 
 
 PREFERENCE_COLOR_KEYS = ("gain", "flat", "loss")
@@ -66,67 +103,12 @@ def _merge_preferences(existing: Any, update: Any) -> Dict[str, Any]:
     return merged
 
 
-RATE_LIMIT_WINDOW_SECONDS = 60
-_rate_lock = Lock()
-_rate_window_start: float | None = None
-_rate_used = 0
-
-
-def _get_rate_limit_setting() -> int:
-    try:
-        value = int(getattr(settings, "FINNHUB_RATE_LIMIT_PER_MIN", 60))
-    except (TypeError, ValueError):
-        value = 60
-    return value
-
-
-def _rate_limit_snapshot() -> Dict[str, int]:
-    limit = _get_rate_limit_setting()
-    if limit <= 0:
-        return {"limit": 0, "used": 0, "remaining": 0, "resetIn": 0}
-    now = time.monotonic()
-    with _rate_lock:
-        if _rate_window_start is None or (now - _rate_window_start) >= RATE_LIMIT_WINDOW_SECONDS:
-            return {"limit": limit, "used": 0, "remaining": limit, "resetIn": 0}
-        remaining = max(0, limit - _rate_used)
-        reset_in = int(max(0, RATE_LIMIT_WINDOW_SECONDS - (now - _rate_window_start)))
-        return {"limit": limit, "used": min(limit, _rate_used), "remaining": remaining, "resetIn": reset_in}
-
-
-def _reserve_quote_slots(requested: int) -> Tuple[int, Dict[str, int]]:
-    limit = _get_rate_limit_setting()
-    if limit <= 0:
-        snapshot = {"limit": limit, "used": 0, "remaining": 0, "resetIn": 0, "requested": requested, "granted": requested}
-        return requested, snapshot
-    now = time.monotonic()
-    global _rate_window_start, _rate_used
-    with _rate_lock:
-        if _rate_window_start is None or (now - _rate_window_start) >= RATE_LIMIT_WINDOW_SECONDS:
-            _rate_window_start = now
-            _rate_used = 0
-        available = max(0, limit - _rate_used)
-        granted = min(requested, available)
-        _rate_used += granted
-        remaining = max(0, limit - _rate_used)
-        reset_in = int(max(0, RATE_LIMIT_WINDOW_SECONDS - (now - _rate_window_start)))
-        snapshot = {
-            "limit": limit,
-            "used": min(limit, _rate_used),
-            "remaining": remaining,
-            "resetIn": reset_in,
-            "requested": requested,
-            "granted": granted,
-        }
-    return granted, snapshot
-
-
-
-
 @login_required
 @ensure_csrf_cookie
 def index(request: HttpRequest) -> HttpResponse:
     return render(request, 'market/index.html', context={
         'FINNHUB_TIMEOUT_SECONDS': settings.FINNHUB_TIMEOUT_SECONDS,
+        'QUOTE_STREAM': stream_offered(isinstance(request, ASGIRequest)),
     })
 
 
@@ -358,244 +340,267 @@ def api_search(request: HttpRequest) -> JsonResponse:
     return JsonResponse({"ok": True, "results": normalized})
 
 
-@require_http_methods(["GET", "POST"])
-def api_quotes(request: HttpRequest) -> JsonResponse:
+@dataclass
+class _QuotesQuery:
+    symbols: List[str]
+    since: Optional[int] = None
+    stream: bool = False
+    wait: Optional[float] = None  # seconds, from the `deadline` parameter (ms)
+
+
+def _optional_int(raw: Any) -> Optional[int]:
+    try:
+        return int(raw) if raw not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _requested_quotes(request: HttpRequest) -> Optional[_QuotesQuery]:
+    """Quotes parameters from the POST body or query string; None on an invalid JSON body.
+
+    Streaming is requested with ``"stream": true`` / ``?stream=1`` or an
+    ``Accept: application/x-ndjson`` header.
+    """
     if request.method == "POST":
         try:
             data = json.loads(request.body.decode("utf-8")) if request.body else {}
         except Exception:
-            return _json_error("Invalid JSON body")
+            return None
         symbols = data.get("symbols") or []
+        raw_since = data.get("since")
+        raw_deadline = data.get("deadline")
+        stream = data.get("stream") is True
     else:
-        symbols = []
+        raw = request.GET.get("symbols") or ""
+        symbols = [s.strip().upper() for s in raw.split(",") if s.strip()]
+        raw_since = request.GET.get("since")
+        raw_deadline = request.GET.get("deadline")
+        stream = request.GET.get("stream") in ("1", "true", "yes")
+    deadline_ms = _optional_int(raw_deadline)
+    return _QuotesQuery(
+        symbols=symbols,
+        since=_optional_int(raw_since),
+        stream=stream or "application/x-ndjson" in request.headers.get("Accept", ""),
+        wait=max(0, deadline_ms) / 1000.0 if deadline_ms is not None else None,
+    )
+
+
+def _age_bucket(age: Optional[float]) -> Optional[int]:
+    # Doubling buckets: a 304 keeps the client's ages within about a factor of two of the truth,
+    # and a quote refetched with unchanged data (age back near 0) still changes the ETag
+    return None if age is None else int(math.log2(max(0.0, age) + 1))
+
+
+def _quotes_etag(result: RefreshResult, since: Optional[int], market_status: Dict[str, Any]) -> str:
+    ages = sorted((sym, _age_bucket(age)) for sym, age in result.ages.items())
+    basis = json.dumps([sorted(result.versions.items()), ages, sorted(result.errors.items()), market_status.get("session"), since])
+    return 'W/"%s"' % hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def _quotes_response(request: HttpRequest, result: RefreshResult, since: Optional[int]) -> HttpResponse:
+    """JSON quotes (only those changed after `since` when given), or 304 when the ETag still matches."""
+    market_status = compute_us_market_status()
+    etag = _quotes_etag(result, since, market_status)
+    if request.method == "GET":
+        candidates = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in candidates or "*" in candidates:
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+    response = JsonResponse({
+        "ok": True,
+        "asOf": result.as_of,
+        "marketStatus": market_status,
+        "quotes": result.quotes_since(since),
+        "errors": result.errors,
+        "rateLimit": result.rate_limit,
+        "cursor": result.cursor,
+        "since": since,
+        "pending": result.pending,
+    })
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@require_http_methods(["GET", "POST"])
+def api_quotes(request: HttpRequest) -> HttpResponse:
+    query = _requested_quotes(request)
+    if query is None:
+        return _json_error("Invalid JSON body")
+    symbols, since = query.symbols, query.since
 
     if not symbols:
-        symbols = list(Ticker.objects.values_list("symbol", flat=True))
+        symbols = tracked_symbols()
+
+    if query.stream:
+        lines = QuoteLines(symbols, since, wait=query.wait)
+        asgi = isinstance(request, ASGIRequest)
+        response = StreamingHttpResponse(lines.__aiter__() if asgi else iter(lines), content_type="application/x-ndjson")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    if ingestor_enabled():
+        result = read_cached_quotes(symbols)
+    else:
+        result = refresh_quotes(symbols, wait=query.wait)
 
-    client = FinnhubClient()
-    now = timezone.now()
-    now_ts = int(now.timestamp())
+    return _quotes_response(request, result, since)
 
-    metrics_ttl = getattr(settings, "FINNHUB_METRICS_TTL_SECONDS", 21600)
-    try:
-        metrics_ttl = int(metrics_ttl)
-    except (TypeError, ValueError):
-        metrics_ttl = 21600
 
-    max_workers = getattr(settings, "FINNHUB_MAX_CONCURRENCY", 4)
+async def api_quotes_async(request: HttpRequest) -> HttpResponse:
+    # require_http_methods only wraps sync views on Django 4.2
+    if request.method not in ("GET", "POST"):
+        return HttpResponseNotAllowed(["GET", "POST"])
+    query = _requested_quotes(request)
+    if query is None:
+        return _json_error("Invalid JSON body")
+    symbols, since = query.symbols, query.since
+
+    if not symbols:
+        symbols = await sync_to_async(tracked_symbols)()
+
+    asgi = isinstance(request, ASGIRequest)
+    if ingestor_enabled():
+        result = await sync_to_async(read_cached_quotes)(symbols)
+    elif query.wait is not None and not asgi:
+        # Under WSGI this runs on an event loop that ends with the request, so late symbols
+        # must be finished by the shared fetch executor instead
+        result = await sync_to_async(refresh_quotes, thread_sensitive=False)(symbols, wait=query.wait)
+    else:
+        try:
+            result = await refresh_quotes_async(symbols, wait=query.wait)
+        finally:
+            if not asgi:
+                await close_async_loop_state()
+
+    return _quotes_response(request, result, since)
+
+
+def api_quotes_stream(request: HttpRequest) -> HttpResponse:
+    # Plain function so one view serves both handlers: ASGI needs an async iterator, WSGI a sync one
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    raw = request.GET.get("symbols") or ""
+    symbols = [s.strip().upper() for s in raw.split(",") if s.strip()] or tracked_symbols()
+    asgi = isinstance(request, ASGIRequest)
+    stream = QuoteStream(symbols, request.headers.get("Last-Event-ID"), asgi=asgi)
+    response = StreamingHttpResponse(stream.__aiter__() if asgi else iter(stream), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+def api_market_status(request: HttpRequest) -> JsonResponse:
+    return JsonResponse({"ok": True, "status": compute_us_market_status()})
+
+
+def _optional_float(raw: Any) -> Optional[float]:
     try:
-        max_workers = int(max_workers)
+        return float(raw) if raw not in (None, "") else None
     except (TypeError, ValueError):
-        max_workers = 4
-    if max_workers < 1:
-        max_workers = 1
+        return None
 
-    cached_entries = {c.symbol: c for c in CachedQuote.objects.filter(symbol__in=symbols)}
 
-    quote_ttl = getattr(settings, "FINNHUB_QUOTE_TTL_SECONDS", 10)
+@require_GET
+def api_screen(request: HttpRequest) -> JsonResponse:
+    params = request.GET
     try:
-        quote_ttl = int(quote_ttl)
-    except (TypeError, ValueError):
-        quote_ttl = 10
-    if quote_ttl < 0:
-        quote_ttl = 0
-
-    fresh_cached: Dict[str, Dict[str, Any]] = {}
-    symbols_to_fetch: List[str] = []
-    for sym in symbols:
-        cached = cached_entries.get(sym)
-        use_cache = False
-        if cached and quote_ttl > 0 and cached.fetched_at:
-            try:
-                age = (now - cached.fetched_at).total_seconds()
-            except Exception:
-                age = None
-            if age is not None and age < quote_ttl:
-                cached_payload = cached.data if isinstance(cached.data, dict) else {}
-                if cached_payload:
-                    fresh_cached[sym] = dict(cached_payload)
-                    use_cache = True
-        if not use_cache:
-            symbols_to_fetch.append(sym)
-
-    quotes: Dict[str, Dict[str, Any]] = {}
-    errors: Dict[str, str] = {}
-
-    quote_results: Dict[str, Quote] = {}
-    quote_errors: Dict[str, FinnhubError | Exception] = {}
-
-    def format_error(exc: FinnhubError | Exception) -> str:
-        if isinstance(exc, FinnhubError):
-            prefix = exc.code or "ERROR"
-            return f"{prefix}: {exc}"
-        return str(exc)
-
-    total_requested = len(symbols_to_fetch)
-    rate_limited_symbols: List[str] = []
-    rate_limit_info: Dict[str, Any] | None = None
-
-    if symbols_to_fetch:
-        allowed, rate_limit_info = _reserve_quote_slots(total_requested)
-        if allowed < total_requested:
-            rate_limited_symbols = symbols_to_fetch[allowed:]
-            symbols_to_fetch = symbols_to_fetch[:allowed]
-            for sym in rate_limited_symbols:
-                cached = cached_entries.get(sym)
-                if cached and isinstance(cached.data, dict):
-                    fresh_cached[sym] = dict(cached.data)
-        rate_limit_info["requested"] = total_requested
-        rate_limit_info["granted"] = allowed
-        rate_limit_info["skipped"] = len(rate_limited_symbols)
-    else:
-        rate_limit_info = _rate_limit_snapshot()
-        rate_limit_info.update({"requested": 0, "granted": 0, "skipped": 0})
-
-    rate_limited_set = set(rate_limited_symbols)
-    rate_limit_error = "RATE_LIMIT: Using cached data (Finnhub limit reached)"
-    reset_hint = rate_limit_info.get("resetIn") if rate_limit_info else None
-    if isinstance(reset_hint, (int, float)) and reset_hint > 0:
-        rate_limit_error = f"RATE_LIMIT: Using cached data (resets in {int(reset_hint)}s)"
-
-    if symbols_to_fetch:
-        worker_count = min(max_workers, len(symbols_to_fetch))
-        with ThreadPoolExecutor(max_workers=worker_count) as executor:
-            future_map = {executor.submit(client.quote, sym): sym for sym in symbols_to_fetch}
-            for future in as_completed(future_map):
-                sym = future_map[future]
-                try:
-                    quote_results[sym] = future.result()
-                except FinnhubError as exc:
-                    quote_errors[sym] = exc
-                except Exception as exc:
-                    quote_errors[sym] = FinnhubError(str(exc))
-
-    metrics_symbols: List[str] = []
-    if metrics_ttl <= 0:
-        metrics_symbols = [sym for sym in symbols if sym not in quote_errors and sym not in rate_limited_set]
-    else:
-        for sym in symbols:
-            if sym in quote_errors or sym in rate_limited_set:
-                continue
-            cached = cached_entries.get(sym)
-            cached_data = cached.data if cached else {}
-            raw_ts = None
-            if cached_data:
-                raw_ts = cached_data.get("metricsAsOf") or cached_data.get("metrics_as_of")
-            metrics_ts = None
-            if raw_ts is not None:
-                try:
-                    metrics_ts = int(float(raw_ts))
-                except (TypeError, ValueError):
-                    metrics_ts = None
-            if metrics_ts is None or (now_ts - metrics_ts) >= metrics_ttl:
-                metrics_symbols.append(sym)
-
-    metrics_results: Dict[str, Dict[str, Any]] = {}
-    metrics_errors: Dict[str, FinnhubError] = {}
-    if metrics_symbols:
-        worker_count = min(max_workers, len(metrics_symbols))
-        with ThreadPoolExecutor(max_workers=worker_count) as executor:
-            future_map = {executor.submit(client.metrics, sym): sym for sym in metrics_symbols}
-            for future in as_completed(future_map):
-                sym = future_map[future]
-                try:
-                    metrics_results[sym] = future.result()
-                except FinnhubError as exc:
-                    metrics_errors[sym] = exc
-                except Exception as exc:
-                    metrics_errors[sym] = FinnhubError(str(exc))
-
-    for sym in symbols:
-        cached = cached_entries.get(sym)
-        cached_data = cached.data if cached and isinstance(cached.data, dict) else {}
-        quote_obj = quote_results.get(sym)
-        if quote_obj:
-            payload = {
-                "c": quote_obj.c,
-                "pc": quote_obj.pc,
-                "h": quote_obj.h,
-                "l": quote_obj.l,
-                "dp": quote_obj.dp,
-                "d": quote_obj.d,
-                "t": quote_obj.t,
-                "pre": quote_obj.pre,
-                "post": quote_obj.post,
-            }
-            metrics_payload = metrics_results.get(sym)
-            if metrics_payload:
-                payload.update({
-                    "week52High": metrics_payload.get("week52High"),
-                    "week52Low": metrics_payload.get("week52Low"),
-                    "metricsAsOf": now_ts,
-                })
-            else:
-                if cached_data:
-                    if "week52High" in cached_data:
-                        payload["week52High"] = cached_data.get("week52High")
-                    if "week52Low" in cached_data:
-                        payload["week52Low"] = cached_data.get("week52Low")
-                    if "metricsAsOf" in cached_data:
-                        payload["metricsAsOf"] = cached_data.get("metricsAsOf")
-            quotes[sym] = payload
-            CachedQuote.objects.update_or_create(symbol=sym, defaults={"data": payload})
-            if sym in rate_limited_set:
-                errors[sym] = rate_limit_error
-            elif sym in metrics_errors:
-                errors[sym] = f"{format_error(metrics_errors[sym])} (kept cached metrics)"
-            continue
-
-        if sym in fresh_cached:
-            payload = dict(fresh_cached.get(sym, {}))
-            metrics_payload = metrics_results.get(sym)
-            if metrics_payload:
-                payload.update({
-                    "week52High": metrics_payload.get("week52High"),
-                    "week52Low": metrics_payload.get("week52Low"),
-                    "metricsAsOf": now_ts,
-                })
-                if cached:
-                    CachedQuote.objects.filter(symbol=sym).update(data=payload)
-            quotes[sym] = payload
-            if sym in rate_limited_set:
-                errors[sym] = rate_limit_error
-            elif sym in metrics_errors:
-                errors[sym] = f"{format_error(metrics_errors[sym])} (kept cached metrics)"
-            continue
-
-        if cached_data:
-            quotes[sym] = cached_data
-            if sym in rate_limited_set:
-                errors[sym] = rate_limit_error
-            elif sym in quote_errors:
-                errors[sym] = f"{format_error(quote_errors[sym])} (using cached)"
-        elif sym in quote_errors:
-            errors[sym] = format_error(quote_errors[sym])
-        elif sym in rate_limited_set:
-            errors[sym] = rate_limit_error
-
-    status = compute_us_market_status()
-    if rate_limit_info is None:
-        rate_limit_info = _rate_limit_snapshot()
-        rate_limit_info.update({"requested": total_requested, "granted": 0, "skipped": len(rate_limited_symbols)})
-    else:
-        rate_limit_info.setdefault("requested", total_requested)
-        rate_limit_info.setdefault("granted", total_requested - len(rate_limited_symbols))
-        rate_limit_info.setdefault("skipped", len(rate_limited_symbols))
+        quotes = screen_quotes(
+            sort=params.get("sort") or "-dp",
+            limit=_optional_int(params.get("limit")) or 20,
+            min_price=_optional_float(params.get("minPrice")),
+            max_price=_optional_float(params.get("maxPrice")),
+            min_change_pct=_optional_float(params.get("minChangePct")),
+            max_change_pct=_optional_float(params.get("maxChangePct")),
+            sector=_optional_int(params.get("sector")),
+        )
+    except ValueError as exc:
+        return _json_error(str(exc))
+    return JsonResponse({"ok": True, "quotes": quotes})
 
-    payload = {
+
+@require_GET
+def api_movers(request: HttpRequest) -> JsonResponse:
+    movers = top_movers(
+        limit=_optional_int(request.GET.get("limit")) or 5,
+        sector=_optional_int(request.GET.get("sector")),
+    )
+    return JsonResponse({"ok": True, **movers})
+
+
+def _time_range(request: HttpRequest, now: int) -> Tuple[int, int]:
+    """[from, to) in epoch seconds; `to` defaults to now and `from` to a day before `to`."""
+    end = _optional_int(request.GET.get("to"))
+    if end is None:
+        end = now + 1
+    start = _optional_int(request.GET.get("from"))
+    if start is None:
+        start = end - 86400
+    return start, end
+
+
+@require_GET
+def api_quote_history(request: HttpRequest) -> JsonResponse:
+    symbol = (request.GET.get("symbol") or "").strip().upper()
+    if not symbol:
+        return _json_error("symbol is required")
+    now = int(timezone.now().timestamp())
+    start, end = _time_range(request, now)
+    ticks, cursor = tick_range(
+        symbol,
+        start,
+        end,
+        limit=_optional_int(request.GET.get("limit")) or 1000,
+        after=_optional_int(request.GET.get("after")),
+    )
+    return JsonResponse({"ok": True, "symbol": symbol, "from": start, "to": end, "ticks": ticks, "next": cursor})
+
+
+@require_GET
+def api_quote_bars(request: HttpRequest) -> JsonResponse:
+    symbol = (request.GET.get("symbol") or "").strip().upper()
+    if not symbol:
+        return _json_error("symbol is required")
+    now = int(timezone.now().timestamp())
+    start, end = _time_range(request, now)
+    resolution = request.GET.get("resolution") or ""
+    if resolution and resolution not in dict(RESOLUTIONS):
+        return _json_error(f"Unknown resolution '{resolution}'; use one of {', '.join(dict(RESOLUTIONS))}")
+    if not resolution:
+        points = max(1, _optional_int(request.GET.get("points")) or 300)
+        resolution = choose_resolution(start, end, points, now)
+    bars, cursor = bar_range(symbol, resolution, start, end, after=_optional_int(request.GET.get("after")))
+    return JsonResponse({
         "ok": True,
-        "asOf": now_ts,
-        "marketStatus": status,
-        "quotes": quotes,
-        "errors": errors,
-        "rateLimit": rate_limit_info,
-    }
-    return JsonResponse(payload)
+        "symbol": symbol,
+        "resolution": resolution,
+        "from": start,
+        "to": end,
+        "bars": bars,
+        "next": cursor,
+    })
 
 
 @require_GET
-def api_market_status(request: HttpRequest) -> JsonResponse:
-    return JsonResponse({"ok": True, "status": compute_us_market_status()})
+def api_diagnostics(request: HttpRequest) -> JsonResponse:
+    per_symbol = request.GET.get("symbols") in ("1", "true", "yes")
+    return JsonResponse({
+        "ok": True,
+        "singleflight": singleflight_stats(),
+        "connectionPool": connection_pool_stats(),
+        "schedule": schedule_stats(),
+        "refreshAges": refresh_age_stats(tracked_symbols(), timezone.now(), per_symbol=per_symbol),
+        "planner": planner_stats(),
+        "quota": quota_stats(),
+        "circuits": circuit_stats(),
+        "concurrency": concurrency_stats(),
+        "executor": executor_stats(),
+        "quoteCache": quote_cache_stats(),
+        "quoteTable": quote_table_stats(),
+    })
 
 
 @require_http_methods(["GET", "POST", "PUT"])
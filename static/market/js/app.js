@@ -4,6 +4,7 @@
  * - Quotes fetching with timeout, retry and caching in localStorage
  * - Heatmap rendering with progress bars and colored tiles
  * - Auto refresh with countdown and last-refresh timestamp
+ * - Live quote updates over Server-Sent Events when the server offers them, polling as fallback
  * - Connection status indicator and error handling
  * - Manage purchased lots via modal CRUD
  */
@@ -27,6 +28,7 @@
   const RATE_LIMIT_WINDOW_MS = 60 * 1000;
   const QUOTE_BATCH_SIZE = 15;
   const QUOTE_BATCH_DELAY_MS = 400; // spread requests to respect quotas
+  const QUOTE_STREAM_MAX_FAILURES = 3; // consecutive stream errors before falling back to polling
 
   // Elements
   const heatmapEl = document.getElementById('heatmap');
@@ -217,6 +219,52 @@
     }
   }
 
+  // /api/quotes in NDJSON mode: calls onQuote(symbol, quote, error) per line as it arrives and
+  // resolves to a response shaped like the buffered JSON one (quotes collected from the lines)
+  const QUOTE_NDJSON_SUPPORTED = !!(window.ReadableStream && window.TextDecoder);
+  async function streamQuotes(body, onQuote){
+    trackRequest();
+    const controller = new AbortController();
+    const id = setTimeout(() => controller.abort(), (cfg.timeout || 10) * 1000);
+    const headers = { 'Content-Type': 'application/json', 'Accept': 'application/x-ndjson', 'X-Requested-With': 'XMLHttpRequest', 'X-CSRFToken': cfg.csrftoken || '' };
+    try {
+      const res = await fetch('/api/quotes', { method: 'POST', credentials: 'same-origin', headers, body: JSON.stringify(Object.assign({}, body, { stream: true })), signal: controller.signal });
+      if (!res.ok || !res.body) {
+        let payload = {};
+        try { payload = await res.json(); } catch(e) {}
+        const err = new Error(payload.error || res.statusText);
+        err.status = res.status; err.code = payload.code;
+        throw err;
+      }
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      const quotes = {};
+      let buffered = '';
+      let summary = null;
+      const handle = (line) => {
+        if (!line.trim()) return;
+        const msg = JSON.parse(line);
+        if (msg.done) { summary = msg; return; }
+        if (msg.quote) quotes[msg.symbol] = msg.quote;
+        onQuote(msg.symbol, msg.quote, msg.error);
+      };
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        lines.forEach(handle);
+      }
+      handle(buffered + decoder.decode());
+      if (!summary) throw new Error('Quote stream ended early');
+      if (summary.ok === false) throw new Error(summary.error || 'Quote stream failed');
+      return Object.assign({}, summary, { quotes });
+    } finally {
+      clearTimeout(id);
+    }
+  }
+
   function setConn(status, message){
     connEl.classList.remove('connected','error','warning');
     if (status === 'connected'){
@@ -543,6 +591,7 @@
     startCountdownTimer();
     refreshTimer = setTimeout(() => {
       refreshTimer = null;
+      if (quoteStreamLive()) { scheduleAutoRefresh(s); return; }
       doRefresh({ source: 'auto' }).finally(() => scheduleAutoRefresh(s));
     }, s * 1000);
   }
@@ -580,6 +629,18 @@
 
   
 
+  // Per-symbol cursor from the last /api/quotes response; lets later polls ask only for changes
+  const quoteCursors = {};
+  function chunkSince(chunk, previousQuotes){
+    let since = Infinity;
+    for (const sym of chunk){
+      const cursor = quoteCursors[sym];
+      if (!cursor || !previousQuotes[sym]) return null;
+      since = Math.min(since, cursor);
+    }
+    return Number.isFinite(since) ? since : null;
+  }
+
   async function doRefresh(opts = {}){
       const source = opts.source || 'manual';
       if (source !== 'auto') restartAutoRefreshCountdown();
@@ -593,13 +654,33 @@
       let latestMarketStatus = null;
       let lastRateLimit = null;
       let batches = 0;
+      const previousQuotes = loadLS(LS.quotes, { data: {} }).data || {};
+      // Repaint at most once per frame while streamed quotes arrive
+      let progressFrame = null;
+      const scheduleProgressRender = () => {
+        if (progressFrame !== null) return;
+        progressFrame = requestAnimationFrame(() => {
+          progressFrame = null;
+          renderHeatmap(loadLS(LS.sectors, {data:[]}).data, tickers, Object.assign({}, previousQuotes, aggregatedQuotes));
+        });
+      };
       try {
         if (symbols.length){
           for (let offset = 0; offset < symbols.length; offset += batchSize){
             const chunk = symbols.slice(offset, offset + batchSize);
-            const res = await apiFetch('/api/quotes', { method: 'POST', body: JSON.stringify({ symbols: chunk }) });
+            const body = { symbols: chunk };
+            const since = chunkSince(chunk, previousQuotes);
+            if (since) body.since = since;
+            const res = QUOTE_NDJSON_SUPPORTED
+              ? await streamQuotes(body, (sym, quote) => { if (quote) { aggregatedQuotes[sym] = quote; scheduleProgressRender(); } })
+              : await apiFetch('/api/quotes', { method: 'POST', body: JSON.stringify(body) });
             batches += 1;
+            if (res.since != null){
+              // Delta response: unchanged quotes were left out, keep the ones we already have
+              chunk.forEach(sym => { if (previousQuotes[sym]) aggregatedQuotes[sym] = previousQuotes[sym]; });
+            }
             Object.assign(aggregatedQuotes, res.quotes || {});
+            if (res.cursor) chunk.forEach(sym => { quoteCursors[sym] = res.cursor; });
             Object.assign(aggregatedErrors, res.errors || {});
             if (res.marketStatus) {
               latestMarketStatus = res.marketStatus;
@@ -613,6 +694,7 @@
             }
           }
         }
+        if (progressFrame !== null) cancelAnimationFrame(progressFrame);
         let quotesToUse = aggregatedQuotes;
         const fetchedCount = Object.keys(aggregatedQuotes).length;
         if (fetchedCount){
@@ -665,8 +747,69 @@
       }
     }
 
+  // Live updates: the server pushes a snapshot, then only the quotes that changed
+  let quoteStream = null;
+  let quoteStreamFailures = 0;
+  function quoteStreamLive(){
+    return !!quoteStream && quoteStream.readyState === EventSource.OPEN;
+  }
+  // Version of the last streamed quote applied per symbol; overlapping deltas may repeat one
+  const streamVersions = {};
+  function applyStreamQuotes(quotes, versions){
+    const fresh = {};
+    Object.entries(quotes || {}).forEach(([sym, quote]) => {
+      const version = versions && versions[sym];
+      if (version && streamVersions[sym] === version) return;
+      if (version) streamVersions[sym] = version;
+      fresh[sym] = quote;
+    });
+    if (Object.keys(quotes || {}).length && !Object.keys(fresh).length) return;
+    const merged = Object.assign({}, loadLS(LS.quotes, { data: {} }).data || {}, fresh);
+    saveLS(LS.quotes, { ts: Date.now(), data: merged });
+    renderHeatmap(loadLS(LS.sectors, {data:[]}).data, loadLS(LS.tickers, {data:[]}).data || [], merged);
+    lastRefreshEl.textContent = `Last: ${new Date().toLocaleTimeString()}`;
+  }
+  function stopQuoteStream(){
+    if (quoteStream) { quoteStream.close(); quoteStream = null; }
+  }
+  function startQuoteStream(){
+    if (!cfg.quoteStream || !window.EventSource) return false;
+    stopQuoteStream();
+    quoteStreamFailures = 0;
+    const es = new EventSource('/api/quotes/stream');
+    const onQuotes = (ev) => {
+      try {
+        const payload = JSON.parse(ev.data);
+        applyStreamQuotes(payload.quotes, payload.versions);
+      } catch (e) { console.warn('stream payload error', e); }
+    };
+    es.addEventListener('snapshot', onQuotes);
+    es.addEventListener('quotes', onQuotes);
+    es.addEventListener('status', (ev) => {
+      try { updateMarketStatus(JSON.parse(ev.data)); } catch (_) {}
+    });
+    es.onopen = () => {
+      quoteStreamFailures = 0;
+      clearError();
+      setConn('connected', 'Live ✅');
+    };
+    es.onerror = () => {
+      // EventSource reconnects by itself (the server ends each stream periodically); give up on repeated failures
+      quoteStreamFailures += 1;
+      if (es.readyState === EventSource.CLOSED || quoteStreamFailures >= QUOTE_STREAM_MAX_FAILURES){
+        console.warn('[stream] falling back to polling');
+        stopQuoteStream();
+        doRefresh({ source: 'auto' });
+      }
+    };
+    quoteStream = es;
+    return true;
+  }
+
 function updateMarketStatus(status){
-    if (!status) return; marketStatusEl.textContent = `Market: ${status.session}${status.isOpen ? ' (Open)' : ''}`;
+    if (!status) return;
+    const note = status.holiday ? ` (${status.holiday})` : (status.earlyClose ? ' (early close 13:00 ET)' : '');
+    marketStatusEl.textContent = `Market: ${status.session}${status.isOpen ? ' (Open)' : ''}${note}`;
   }
   function applyServerPreferences(prefs){
     if (!prefs || typeof prefs !== 'object') return;
@@ -1050,6 +1193,7 @@ function updateMarketStatus(status){
 
   // Initial load and first refresh (skips API call if cache is fresh)
   loadInitial().then(() => {
+    if (startQuoteStream()) return;
     const cached = getCachedQuotesState();
     if (shouldSkipInitialRefresh(cached)) { applyCachedRefreshState(cached); return; }
     return doRefresh();